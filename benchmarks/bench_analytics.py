@@ -0,0 +1,112 @@
+# Benchmark del motor analítico en memoria (NumPy): carga inicial, memoria y latencia de
+# fetch_totals + fetch_totals_by_exam_type con los filtros que no cubren las tablas de
+# agregados (autoescuela, nombre), con SQLite y con el motor; y coste de sincronizar el
+# motor tras importar un periodo nuevo.
+#
+# Uso: python benchmarks/bench_analytics.py [--rows 500000] [--periods 12]
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "driving_exams"))
+
+from dgt_synth import SyntheticSpec, write_dataset  # noqa: E402
+from services.analytics_engine import NUMPY_AVAILABLE, AnalyticsEngine  # noqa: E402
+from services.csv_importer import iter_exam_batches  # noqa: E402
+from services.database import Database  # noqa: E402
+
+
+# Combinaciones de filtros que llegan a exam_results (ningún agregado las cubre). Las
+# búsquedas con `%` y `_` comprueban que el motor les da el sentido de LIKE, como SQLite.
+def filter_sets(db: Database) -> dict[str, dict[str, Any]]:
+    year = db.distinct_years()[0]
+    school = db.distinct_values("school_code")[0]
+    return {
+        "school": {"school_code": school},
+        "school + year": {"school_code": school, "year": year},
+        "name (3 chars)": {"school_name_contains": "pen"},
+        "name (exact)": {"school_name_contains": db.distinct_values("school_name")[0]},
+        "name + province": {"school_name_contains": "1", "province": db.distinct_values("province")[0]},
+        "name + exam type": {"school_name_contains": "12", "exam_type": db.distinct_values("exam_type")[0]},
+        "name '%'": {"school_name_contains": "%"},
+        "name '_'": {"school_name_contains": "_"},
+        "name 'p_n%1'": {"school_name_contains": "p_n%1"},
+        "name '1_3'": {"school_name_contains": "1_3"},
+    }
+
+
+# Ms por consulta (mediana de `repeat`) de los totales de la vista y su resultado.
+def time_totals(db: Database, filters: dict[str, Any], repeat: int) -> tuple[float, Any]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = (db.fetch_totals(filters), db.fetch_totals_by_exam_type(filters))
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(timings), result
+
+
+# Importa un dataset sintético (todos los periodos salvo el último), carga el motor, compara
+# latencias y resultados con SQLite e importa el último periodo para medir la
+# sincronización. Termina con error si algún resultado del motor no coincide.
+def main() -> int:
+    parser = argparse.ArgumentParser(description="NumPy analytics engine benchmark (load, memory, ms per query).")
+    parser.add_argument("--rows", type=int, default=500_000, help="Total rows across all periods.")
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query (median is kept).")
+    args = parser.parse_args()
+    if not NUMPY_AVAILABLE:
+        print("NumPy is not installed.", file=sys.stderr)
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_dataset(Path(tmp) / "data", args.rows, args.periods, spec=SyntheticSpec())
+        db = Database(Path(tmp) / "analytics.db", cache_entries=0)
+        try:
+            with db.bulk_load():
+                for path in paths[:-1]:
+                    db.import_exam_batches(iter_exam_batches(path), source_file=str(path))
+
+            engine = AnalyticsEngine()
+            start = time.perf_counter()
+            engine.sync(db)
+            load_s = time.perf_counter() - start
+            print(
+                f"{'load':>16}: {engine.rows} rows in {load_s:.2f} s ({engine.rows / load_s:,.0f} rows/s),"
+                f" {engine.nbytes / 1e6:.1f} MB ({engine.nbytes / engine.rows:.1f} bytes/row)"
+            )
+
+            fast = db.reader(cache_entries=0)
+            fast.set_analytics(engine)
+            mismatches = 0
+            try:
+                for name, filters in filter_sets(db).items():
+                    sql_ms, expected = time_totals(db, filters, args.repeat)
+                    numpy_ms, result = time_totals(fast, filters, args.repeat)
+                    check = "" if result == expected else "  MISMATCH"
+                    mismatches += result != expected
+                    print(
+                        f"{name:>16}: {db.count_rows(filters):>8} rows | SQLite {sql_ms:8.2f} ms"
+                        f" | NumPy {numpy_ms:7.2f} ms | x{sql_ms / numpy_ms:6.1f}{check}"
+                    )
+
+                db.import_exam_batches(iter_exam_batches(paths[-1]), source_file=str(paths[-1]))
+                before = engine.rows
+                start = time.perf_counter()
+                fast.fetch_totals({"school_code": db.distinct_values("school_code")[0]})
+                sync_ms = (time.perf_counter() - start) * 1000.0
+                print(f"{'sync':>16}: +{engine.rows - before} rows (one period) in {sync_ms:.1f} ms")
+            finally:
+                fast.close()
+        finally:
+            db.close()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
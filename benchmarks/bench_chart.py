@@ -0,0 +1,109 @@
+# Benchmark de la gráfica por tipo de examen: coste de plot_exam_type_totals + repintado
+# cuando solo cambian los valores (barras actualizadas en su sitio) frente a cuando cambian
+# los tipos de examen (reconstrucción completa), y de una ráfaga de filtrados seguidos.
+#
+# Uso: python benchmarks/bench_chart.py [--updates 200]
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "driving_exams"))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtWidgets  # noqa: E402
+
+from services.charts import ExamsChartCanvas  # noqa: E402
+
+# Tipos de examen de la DGT.
+EXAM_TYPES = ["CIRCULACION", "DESTREZA", "TEORICO"]
+
+
+# Totales aleatorios por tipo de examen, como los de fetch_totals_by_exam_type.
+def random_totals(rnd: random.Random, exam_types: list[str]) -> list[dict[str, Any]]:
+    return [
+        {"exam_type": exam_type, "passed": rnd.randint(0, 50_000), "failed": rnd.randint(0, 30_000)}
+        for exam_type in exam_types
+    ]
+
+
+# Ejecuta `updates` llamadas con los datos de `make_rows` y repinta tras cada una;
+# devuelve los ms por actualización.
+def time_updates(
+    app: QtWidgets.QApplication,
+    canvas: ExamsChartCanvas,
+    make_rows: Callable[[int], list[dict[str, Any]]],
+    updates: int,
+) -> float:
+    start = time.perf_counter()
+    for i in range(updates):
+        canvas.plot_exam_type_totals(make_rows(i))
+        canvas.repaint()
+        app.processEvents()
+    return (time.perf_counter() - start) * 1000.0 / updates
+
+
+# Ejecuta ráfagas de `burst` llamadas sin procesar eventos entre ellas (filtrado rápido) y
+# devuelve los ms por ráfaga, incluido el repintado final.
+def time_bursts(
+    app: QtWidgets.QApplication,
+    canvas: ExamsChartCanvas,
+    make_rows: Callable[[int], list[dict[str, Any]]],
+    bursts: int,
+    burst: int,
+) -> float:
+    start = time.perf_counter()
+    for b in range(bursts):
+        for i in range(burst):
+            canvas.plot_exam_type_totals(make_rows(b * burst + i))
+        app.processEvents()
+        canvas.repaint()
+    return (time.perf_counter() - start) * 1000.0 / bursts
+
+
+# Compara actualizaciones en su sitio y reconstrucciones completas.
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Exam type chart refresh benchmark (ms per update).")
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--burst", type=int, default=10, help="Updates per burst of rapid filtering.")
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv[:1])
+    canvas = ExamsChartCanvas()
+    canvas.resize(800, 500)
+    canvas.show()
+    rnd = random.Random(1)
+
+    # Mismos tipos de examen en cada llamada: se actualizan las alturas.
+    def same_types(_: int) -> list[dict[str, Any]]:
+        return random_totals(rnd, EXAM_TYPES)
+
+    # Los tipos alternan en cada llamada: se reconstruye el eje completo.
+    def changing_types(i: int) -> list[dict[str, Any]]:
+        return random_totals(rnd, EXAM_TYPES if i % 2 else EXAM_TYPES[:2])
+
+    canvas.plot_exam_type_totals(same_types(0))
+    app.processEvents()
+    results = {
+        "in place": time_updates(app, canvas, same_types, args.updates),
+        "rebuild": time_updates(app, canvas, changing_types, args.updates),
+    }
+    for name, ms in results.items():
+        print(f"{name:>16}: {ms:.2f} ms/update")
+    bursts = max(1, args.updates // args.burst)
+    for name, make_rows in (("burst in place", same_types), ("burst rebuild", changing_types)):
+        ms = time_bursts(app, canvas, make_rows, bursts, args.burst)
+        print(f"{name:>16}: {ms:.2f} ms per burst of {args.burst}")
+    print(f"{'speedup':>16}: x{results['rebuild'] / results['in place']:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
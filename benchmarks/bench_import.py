@@ -0,0 +1,76 @@
+# Benchmark de carga en SQLite: filas/s de la importación fila a fila (executemany sobre
+# exam_results) frente a la carga vía staging, con y sin índices aplazados (bulk_load).
+#
+# Uso: python benchmarks/bench_import.py [--rows 500000] [--files 4]
+from __future__ import annotations
+
+import argparse
+import contextlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "driving_exams"))
+
+from dgt_synth import SyntheticSpec, write_period_file  # noqa: E402
+from services.csv_importer import iter_exam_batches  # noqa: E402
+from services.database import Database  # noqa: E402
+
+
+# Importa los lotes (uno por fichero) en una base de datos nueva y devuelve
+# (filas leídas, filas insertadas, segundos).
+def time_load(
+    db_path: Path,
+    files: list[list[list[tuple]]],
+    staged: bool,
+    defer_indexes: bool,
+) -> tuple[int, int, float]:
+    db = Database(db_path, cache_entries=0)
+    try:
+        start = time.perf_counter()
+        rows = inserted = 0
+        with db.bulk_load() if defer_indexes else contextlib.nullcontext():
+            for batches in files:
+                stats = db.import_exam_batches(batches, staged=staged)
+                rows += stats.rows_read
+                inserted += stats.inserted
+        return rows, inserted, time.perf_counter() - start
+    finally:
+        db.close()
+
+
+# Genera los ficheros sintéticos (un año distinto por fichero) y compara los modos de carga.
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SQLite import benchmark (rows/s).")
+    parser.add_argument("--rows", type=int, default=500_000, help="Total rows across all files.")
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--schools", type=int, default=20_000, help="Distinct schools (fewer -> more duplicates).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec = SyntheticSpec(schools=args.schools)
+        files = []
+        for i in range(args.files):
+            path = Path(tmp) / f"synthetic_{i}.txt"
+            write_period_file(path, 2000 + i, 1, args.rows // args.files, spec)
+            files.append(list(iter_exam_batches(path)))
+
+        results = {}
+        modes = (
+            ("executemany", False, False),
+            ("staged", True, False),
+            ("staged + bulk_load", True, True),
+        )
+        for name, staged, defer_indexes in modes:
+            rows, inserted, seconds = time_load(Path(tmp) / f"{name}.db", files, staged, defer_indexes)
+            results[name] = rows / seconds
+            print(f"{name:>20}: {rows} rows ({inserted} new) in {seconds:.2f}s ({rows / seconds:,.0f} rows/s)")
+
+    for name in ("staged", "staged + bulk_load"):
+        print(f"{'speedup ' + name:>20}: x{results[name] / results['executemany']:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
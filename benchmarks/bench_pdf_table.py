@@ -0,0 +1,123 @@
+# Benchmark de la tabla del reporte PDF: filas/s de export_pdf_report (texto recortado
+# cacheado y rejilla en un path por página) frente al dibujo celda a celda de referencia
+# (setFont, fontMetrics, elidedText y drawRect por cada celda).
+#
+# Uso: python benchmarks/bench_pdf_table.py [--rows 50000]
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "driving_exams"))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QRect, Qt  # noqa: E402
+from PyQt6.QtGui import QFont, QGuiApplication, QPainter, QPdfWriter  # noqa: E402
+
+from dgt_synth import SyntheticSpec, write_period_file  # noqa: E402
+from services.csv_importer import read_exam_file  # noqa: E402
+from services.database import ROW_COLUMNS  # noqa: E402
+from services.reports import export_pdf_report  # noqa: E402
+
+
+# Dibujo de referencia: misma geometría que el reporte, pero cada celda fija la fuente,
+# pide las métricas, recorta el texto y dibuja su rectángulo.
+def legacy_table_pdf(pdf_path: Path, headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> int:
+    writer = QPdfWriter(str(pdf_path))
+    writer.setResolution(300)
+    painter = QPainter(writer)
+    page_w, page_h = writer.width(), writer.height()
+    margin = int(page_w * 0.06)
+    content_w = page_w - 2 * margin
+    small_font = QFont("Helvetica", 9)
+    body_font = QFont("Helvetica", 11)
+    align = int(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
+    col_w = max(25, content_w // len(headers))
+    xs = [margin + col * col_w for col in range(len(headers))]
+    pad_x = max(8, int(page_w * 0.003))
+    pad_y = max(6, int(page_w * 0.002))
+    painter.setFont(small_font)
+    row_h = max(30, painter.fontMetrics().lineSpacing() + pad_y * 2)
+
+    # Dibuja una fila celda a celda.
+    def draw_row(values: Sequence[Any], y_pos: int, font: QFont) -> None:
+        painter.setFont(font)
+        metrics = painter.fontMetrics()
+        for col, text in enumerate(values):
+            rect = QRect(xs[col], y_pos, col_w, row_h)
+            painter.drawRect(rect)
+            text_rect = rect.adjusted(pad_x, pad_y, -pad_x, -pad_y)
+            elided = metrics.elidedText(str(text), Qt.TextElideMode.ElideRight, text_rect.width())
+            painter.drawText(text_rect, align, elided)
+
+    y = margin
+    draw_row(headers, y, body_font)
+    y += row_h
+    for row in rows:
+        if y + row_h > page_h - margin:
+            writer.newPage()
+            y = margin
+            draw_row(headers, y, body_font)
+            y += row_h
+        draw_row(row, y, small_font)
+        y += row_h
+    painter.end()
+    return len(rows)
+
+
+# Reporte actual con solo la tabla.
+def report_table_pdf(pdf_path: Path, headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> int:
+    return export_pdf_report(
+        pdf_path=pdf_path,
+        filters={},
+        totals={"passed": 0, "failed": 0},
+        table_headers=headers,
+        table_rows=rows,
+        chart_image=None,
+        include_table=True,
+        include_chart=False,
+    )
+
+
+# Genera el PDF con `render` y devuelve (filas, segundos, bytes del fichero).
+def time_render(
+    render: Callable[[Path, Sequence[str], Sequence[Sequence[Any]]], int],
+    pdf_path: Path,
+    rows: Sequence[Sequence[Any]],
+) -> tuple[int, float, int]:
+    start = time.perf_counter()
+    count = render(pdf_path, ROW_COLUMNS, rows)
+    return count, time.perf_counter() - start, pdf_path.stat().st_size
+
+
+# Genera filas sintéticas con el orden de columnas de la tabla y compara ambos renderizados.
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PDF table rendering benchmark (rows/s).")
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    _app = QGuiApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as tmp:
+        source = write_period_file(Path(tmp) / "synthetic.txt", 2024, 1, args.rows, SyntheticSpec(schools=2_000))
+        rows = [[getattr(r, column) for column in ROW_COLUMNS] for r in read_exam_file(source).rows]
+
+        results = {}
+        for name, render in (("per-cell (reference)", legacy_table_pdf), ("export_pdf_report", report_table_pdf)):
+            count, seconds, size = time_render(render, Path(tmp) / "table.pdf", rows)
+            results[name] = count / seconds
+            print(f"{name:>22}: {count} rows in {seconds:.2f}s ({count / seconds:,.0f} rows/s, {size / 1e6:.1f} MB)")
+
+    speedup = results["export_pdf_report"] / results["per-cell (reference)"]
+    print(f"{'speedup':>22}: x{speedup:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+# Microbenchmark: filas/s del parser compilado frente a ExamRow.from_csv_row + as_db_tuple.
+#
+# Uso: python benchmarks/bench_row_parser.py [--rows 1000000]
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "driving_exams"))
+
+from dgt_synth import SyntheticSpec, write_period_file  # noqa: E402
+from services.csv_importer import ExamRow, _read_header, compile_row_parser  # noqa: E402
+
+
+# Parsea el fichero completo con la función de fila dada y devuelve (filas, segundos).
+def time_parse(path: Path, make_parser: Callable[[dict[str, int]], Callable[[list[str]], tuple]]) -> tuple[int, float]:
+    start = time.perf_counter()
+    count = 0
+    with path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f, delimiter=";")
+        idx = _read_header(reader)
+        assert idx is not None
+        parse = make_parser(idx)
+        for row in reader:
+            parse(row)
+            count += 1
+    return count, time.perf_counter() - start
+
+
+# Parser de referencia: objeto ExamRow por fila y copia a tupla.
+def legacy_parser(idx: dict[str, int]) -> Callable[[list[str]], tuple]:
+    return lambda row: ExamRow.from_csv_row(row, idx).as_db_tuple()
+
+
+# Genera el fichero sintético y compara ambos parsers.
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Row parser microbenchmark (rows/s).")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic.txt"
+        write_period_file(path, 2024, 1, args.rows, SyntheticSpec(schools=900))
+
+        results = {}
+        for name, make_parser in (("ExamRow.from_csv_row", legacy_parser), ("compile_row_parser", compile_row_parser)):
+            rows, seconds = time_parse(path, make_parser)
+            results[name] = rows / seconds
+            print(f"{name:>22}: {rows} rows in {seconds:.2f}s ({rows / seconds:,.0f} rows/s)")
+
+    speedup = results["compile_row_parser"] / results["ExamRow.from_csv_row"]
+    print(f"{'speedup':>22}: x{speedup:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+# Benchmark de memoria de las filas de la tabla: bytes por fila de las páginas por columnas
+# (RowPage: array('i') y etiquetas internadas) frente a un dict por fila, y coste de
+# ResultsTableModel.data() (texto y alineación de cada celda) frente al modelo de
+# referencia con un dict por fila.
+#
+# Uso: python benchmarks/bench_row_store.py [--rows 500000] [--paint-rows 20000]
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "driving_exams"))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtCore, QtGui  # noqa: E402
+
+from dgt_synth import SyntheticSpec, write_dataset  # noqa: E402
+from services.csv_importer import iter_exam_batches  # noqa: E402
+from main import TABLE_PAGE_SIZE, ResultsTableModel  # noqa: E402
+from services.database import Database, row_sort_key, rows_order  # noqa: E402
+from services.row_store import RowPage  # noqa: E402
+
+
+# Mide la memoria que retiene el resultado de `build`; devuelve (resultado, bytes).
+def retained_bytes(build: Callable[[], Any]) -> tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+# Todas las filas en páginas por columnas, leídas como lo hace la tabla (paginación por
+# clave, ordenada por periodo para que cada página la sirva un índice).
+def load_pages(db: Database) -> list[RowPage]:
+    order = rows_order("year", descending=True)
+    pages: list[RowPage] = []
+    after = None
+    while True:
+        page = db.fetch_rows_page({}, after=after, limit=TABLE_PAGE_SIZE, order=order)
+        pages.append(page)
+        if len(page) < TABLE_PAGE_SIZE:
+            return pages
+        after = row_sort_key(page, len(page) - 1, order)
+
+
+# Modelo de referencia: guarda cada página como una lista de dicts y calcula texto y
+# alineación desde el dict de la fila en cada llamada (str() e isinstance).
+class DictTableModel(ResultsTableModel):
+    # Guarda la página convertida a dicts.
+    def _cache_page(self, page_index: int, rows: Any) -> None:
+        super()._cache_page(page_index, list(rows.dicts()) if isinstance(rows, RowPage) else rows)
+
+    # Devuelve el texto/alineación de una celda a partir del dict de su fila.
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        rows, offset = self._locate(index.row())
+        row = rows[offset] if offset < len(rows) else {}
+        _, key = self._columns[index.column()]
+        value = row.get(key)
+
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return "" if value is None else str(value)
+
+        if role == QtCore.Qt.ItemDataRole.TextAlignmentRole:
+            if isinstance(value, int):
+                return int(QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter)
+            return int(QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter)
+
+        return None
+
+
+# Carga `rows` filas en el modelo y mide data() (texto y alineación) en todas sus celdas;
+# devuelve ns por celda.
+def time_paint(model: ResultsTableModel, rows: int) -> float:
+    model.set_filters({})
+    while model.rowCount() < rows and model.canFetchMore(QtCore.QModelIndex()):
+        model.fetchMore(QtCore.QModelIndex())
+    indexes = [model.index(r, c) for r in range(min(rows, model.rowCount())) for c in range(model.columnCount())]
+    display = QtCore.Qt.ItemDataRole.DisplayRole
+    alignment = QtCore.Qt.ItemDataRole.TextAlignmentRole
+    start = time.perf_counter()
+    for index in indexes:
+        model.data(index, display)
+        model.data(index, alignment)
+    return (time.perf_counter() - start) * 1e9 / len(indexes)
+
+
+# Importa un dataset sintético y compara memoria y coste de pintado de ambas representaciones.
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Table row storage benchmark (bytes per row, ns per cell).")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument("--paint-rows", type=int, default=20_000, help="Rows painted in the data() benchmark.")
+    args = parser.parse_args()
+
+    _app = QtGui.QGuiApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_dataset(Path(tmp) / "data", args.rows, args.periods, spec=SyntheticSpec())
+        db = Database(Path(tmp) / "rows.db", cache_entries=0)
+        try:
+            with db.bulk_load():
+                for path in paths:
+                    db.import_exam_batches(iter_exam_batches(path), source_file=str(path))
+
+            dicts, dict_bytes = retained_bytes(lambda: list(db.iter_rows({})))
+            rows = len(dicts)
+            del dicts
+            pages, page_bytes = retained_bytes(lambda: load_pages(db))
+
+            print(f"{'dict per row':>14}: {dict_bytes / 1e6:8.1f} MB ({dict_bytes / rows:6.1f} bytes/row, {rows} rows)")
+            print(f"{'RowPage':>14}: {page_bytes / 1e6:8.1f} MB ({page_bytes / rows:6.1f} bytes/row, {len(pages)} pages)")
+            print(f"{'memory':>14}: x{dict_bytes / page_bytes:.1f} smaller")
+
+            max_pages = args.paint_rows // TABLE_PAGE_SIZE + 1
+            timings = {}
+            for name, model_class in (("dict per row", DictTableModel), ("RowPage", ResultsTableModel)):
+                timings[name] = time_paint(model_class(db, max_cached_pages=max_pages), args.paint_rows)
+                print(f"{name + ' data()':>14}: {timings[name]:6.1f} ns/cell (text + alignment)")
+            print(f"{'data()':>14}: x{timings['dict per row'] / timings['RowPage']:.2f} faster")
+        finally:
+            db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
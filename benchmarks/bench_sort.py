@@ -0,0 +1,103 @@
+# Benchmark de la ordenación por columna de la tabla: ms de la primera página y de la
+# siguiente (fetch_rows_page con rows_order) para cada columna y dirección, con filtros de
+# distinta selectividad (y del orden por defecto), frente a ordenar en Python todas las filas que cumplen los filtros
+# (lo que haría un proxy de ordenación sobre el modelo).
+#
+# Uso: python benchmarks/bench_sort.py [--rows 500000] [--periods 12]
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "driving_exams"))
+
+from dgt_synth import SyntheticSpec, write_dataset  # noqa: E402
+from services.csv_importer import iter_exam_batches  # noqa: E402
+from services.database import ROW_COLUMNS, Database, row_sort_key, rows_order  # noqa: E402
+
+# Filas por página de la tabla principal (como TABLE_PAGE_SIZE en main.py).
+PAGE_SIZE = 256
+
+
+# Combinaciones de filtros de más a menos filas.
+def filter_sets(db: Database) -> dict[str, dict[str, Any]]:
+    year = db.distinct_years()[0]
+    month = db.distinct_months(year)[-1]
+    province = db.distinct_values("province")[0]
+    return {
+        "all": {},
+        "exam type": {"exam_type": db.distinct_values("exam_type")[0]},
+        "province": {"province": province},
+        "period": {"year": year, "month": month},
+        "school": {"school_code": db.distinct_values("school_code")[0]},
+    }
+
+
+# Ms de la primera página y de la siguiente al ordenar por `column` (None: orden por defecto).
+def time_pages(db: Database, filters: dict[str, Any], column: str | None, descending: bool) -> tuple[float, float]:
+    order = rows_order(column, descending)
+    start = time.perf_counter()
+    page = db.fetch_rows_page(filters, limit=PAGE_SIZE, order=order)
+    first = (time.perf_counter() - start) * 1000.0
+    if len(page) < PAGE_SIZE:
+        return first, 0.0
+    start = time.perf_counter()
+    db.fetch_rows_page(filters, after=row_sort_key(page, len(page) - 1, order), limit=PAGE_SIZE, order=order)
+    return first, (time.perf_counter() - start) * 1000.0
+
+
+# Ms de cargar todas las filas que cumplen los filtros y ordenarlas en Python por el texto
+# de la columna.
+def time_python_sort(db: Database, filters: dict[str, Any], column: str) -> float:
+    start = time.perf_counter()
+    rows = list(db.iter_rows(filters))
+    rows.sort(key=lambda r: str(r[column]))
+    return (time.perf_counter() - start) * 1000.0
+
+
+# Importa un dataset sintético y mide cada columna ordenable con cada filtro.
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Table sort latency benchmark (ms per page).")
+    parser.add_argument("--rows", type=int, default=500_000, help="Total rows across all periods.")
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument("--schools", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_dataset(Path(tmp) / "data", args.rows, args.periods, spec=SyntheticSpec(schools=args.schools))
+        db = Database(Path(tmp) / "sort.db", cache_entries=0)
+        try:
+            with db.bulk_load():
+                for path in paths:
+                    db.import_exam_batches(iter_exam_batches(path), source_file=str(path))
+
+            for name, filters in filter_sets(db).items():
+                timings = [
+                    (column, descending, *time_pages(db, filters, column, descending))
+                    for column in ROW_COLUMNS
+                    for descending in (False, True)
+                ]
+                default_first, default_next = time_pages(db, filters, None, False)
+                firsts = [t[2] for t in timings]
+                nexts = [t[3] for t in timings]
+                slowest = max(timings, key=lambda t: max(t[2], t[3]))
+                python_ms = time_python_sort(db, filters, "num_passed")
+                print(
+                    f"{name:>10}: {db.count_rows(filters):>8} rows | first page p50 {statistics.median(firsts):6.2f} ms"
+                    f" max {max(firsts):6.2f} ms | next page p50 {statistics.median(nexts):6.2f} ms"
+                    f" max {max(nexts):6.2f} ms (slowest: {slowest[0]} {'desc' if slowest[1] else 'asc'})"
+                    f" | default order {default_first:6.2f}/{default_next:6.2f} ms"
+                    f" | sort in Python {python_ms:8.1f} ms"
+                )
+        finally:
+            db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
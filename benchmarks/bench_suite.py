@@ -0,0 +1,260 @@
+# Suite de benchmarks reproducible sobre un dataset sintético de la DGT: lectura de ficheros,
+# importación, consultas de la ventana principal (filas, totales, combos de filtros) y
+# exportación PDF. Guarda tiempo, throughput y pico de memoria de cada paso en JSON para
+# comparar ejecuciones.
+#
+# Uso: python benchmarks/bench_suite.py [--rows 1000000] [--periods 12] [--output result.json]
+#                                       [--compare baseline.json]
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "driving_exams"))
+
+from dgt_synth import SyntheticSpec, write_dataset  # noqa: E402
+from services.csv_importer import read_exam_file  # noqa: E402
+from services.database import ROW_COLUMNS, Database  # noqa: E402
+
+# Campos de los combos que rellena refresh_filters (además de años y meses).
+FILTER_FIELDS = ("province", "exam_center", "exam_type", "permit")
+
+
+@dataclass(frozen=True, slots=True)
+# Resultado de un paso: duración, elementos procesados y picos de memoria (bytes asignados
+# por Python durante el paso y RSS máximo del proceso hasta ese momento).
+class StepResult:
+    name: str
+    seconds: float
+    items: int
+    unit: str
+    items_per_second: float
+    peak_python_bytes: int | None
+    max_rss_bytes: int | None
+    skipped: str | None = None
+
+
+# RSS máximo del proceso en bytes (ru_maxrss está en KiB en Linux y en bytes en macOS).
+def _max_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(rss if sys.platform == "darwin" else rss * 1024)
+
+
+# Ejecuta y mide los pasos de la suite.
+class Suite:
+    # Guarda si se traza la memoria de Python (tracemalloc ralentiza los pasos).
+    def __init__(self, trace_memory: bool = True) -> None:
+        self.trace_memory = trace_memory
+        self.steps: list[StepResult] = []
+
+    # Ejecuta `func` (que devuelve el número de elementos procesados) y registra el paso.
+    def run(self, name: str, unit: str, func: Callable[[], int]) -> int:
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            items = func()
+            seconds = time.perf_counter() - start
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else None
+            if self.trace_memory:
+                tracemalloc.stop()
+        self.steps.append(
+            StepResult(
+                name=name,
+                seconds=seconds,
+                items=items,
+                unit=unit,
+                items_per_second=items / seconds if seconds > 0 else 0.0,
+                peak_python_bytes=peak,
+                max_rss_bytes=_max_rss_bytes(),
+            )
+        )
+        print(f"{name:>40}: {seconds:8.3f}s  {items:>10} {unit}", file=sys.stderr)
+        return items
+
+    # Registra un paso que no se pudo ejecutar y el motivo.
+    def skip(self, name: str, unit: str, reason: str) -> None:
+        self.steps.append(StepResult(name, 0.0, 0, unit, 0.0, None, None, skipped=reason))
+        print(f"{name:>40}: skipped ({reason})", file=sys.stderr)
+
+
+# Lee todos los ficheros con read_exam_file; devuelve las filas leídas.
+def _read_files(paths: list[Path]) -> int:
+    return sum(len(read_exam_file(path).rows) for path in paths)
+
+
+# Importa fichero a fichero con import_exam_rows (como la importación desde la GUI).
+def _import_files(db: Database, paths: list[Path]) -> int:
+    rows = 0
+    for path in paths:
+        result = read_exam_file(path)
+        db.import_exam_rows(result.rows, source_file=path.name)
+        rows += len(result.rows)
+    return rows
+
+
+# Filtros representativos: sin filtros, una provincia, un periodo y una combinación estrecha.
+def _filter_sets(db: Database) -> dict[str, dict[str, Any]]:
+    year = db.distinct_years()[0]
+    month = db.distinct_months(year)[-1]
+    province = db.distinct_values("province")[0]
+    exam_type = db.distinct_values("exam_type")[0]
+    return {
+        "all": {},
+        "province": {"province": province},
+        "period": {"year": year, "month": month},
+        "narrow": {"year": year, "month": month, "province": province, "exam_type": exam_type},
+    }
+
+
+# Ejecuta una consulta de totales; cuenta como un elemento.
+def _count_query(query: Callable[[dict[str, Any]], Any], filters: dict[str, Any]) -> int:
+    query(filters)
+    return 1
+
+
+# Consultas de refresh_filters: años, meses del último año y valores de cada combo.
+def _refresh_filters(db: Database) -> int:
+    years = db.distinct_years()
+    count = len(years) + len(db.distinct_months(years[0] if years else None))
+    for field in FILTER_FIELDS:
+        count += len(db.distinct_values(field))
+    return count
+
+
+# Exporta a PDF las primeras `limit` filas leídas del cursor de detalle (como hace la
+# ventana principal); requiere PyQt6.
+def _export_pdf(db: Database, pdf_path: Path, limit: int) -> int:
+    from PyQt6.QtGui import QGuiApplication
+
+    from services.reports import export_pdf_report
+
+    _app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    rows = ([row[c] for c in ROW_COLUMNS] for row in itertools.islice(db.iter_rows({}), limit))
+    return export_pdf_report(
+        pdf_path=pdf_path,
+        filters={},
+        totals=db.fetch_totals({}),
+        table_headers=list(ROW_COLUMNS),
+        table_rows=rows,
+        chart_image=None,
+        include_table=True,
+        include_chart=False,
+    )
+
+
+# Ejecuta todos los pasos sobre los ficheros `paths` y una base de datos nueva en `work_dir`.
+def run_suite(paths: list[Path], work_dir: Path, export_rows: int, trace_memory: bool) -> list[StepResult]:
+    suite = Suite(trace_memory=trace_memory)
+    suite.run("read_exam_file", "rows", lambda: _read_files(paths))
+
+    db = Database(work_dir / "bench.db", cache_entries=0)
+    try:
+        suite.run("import_exam_rows", "rows", lambda: _import_files(db, paths))
+        filter_sets = _filter_sets(db)
+        for label in ("all", "province"):
+            suite.run(f"fetch_rows[{label}]", "rows", lambda f=filter_sets[label]: len(db.fetch_rows(f)))
+        for label, filters in filter_sets.items():
+            suite.run(f"fetch_totals[{label}]", "queries", lambda f=filters: _count_query(db.fetch_totals, f))
+            suite.run(
+                f"fetch_totals_by_exam_type[{label}]",
+                "groups",
+                lambda f=filters: len(db.fetch_totals_by_exam_type(f)),
+            )
+        suite.run("refresh_filters", "values", lambda: _refresh_filters(db))
+
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        try:
+            import PyQt6.QtGui  # noqa: F401
+        except ImportError:
+            suite.skip("export_pdf_report", "rows", "PyQt6 is not installed")
+        else:
+            suite.run("export_pdf_report", "rows", lambda: _export_pdf(db, work_dir / "report.pdf", export_rows))
+    finally:
+        db.close()
+    return suite.steps
+
+
+# Imprime la relación de tiempos frente a una ejecución anterior (>1 es más lento).
+def print_comparison(steps: list[StepResult], baseline_path: Path) -> None:
+    baseline = {step["name"]: step for step in json.loads(baseline_path.read_text(encoding="utf-8"))["steps"]}
+    print(f"{'step':>40}  {'old s':>8}  {'new s':>8}  ratio", file=sys.stderr)
+    for step in steps:
+        old = baseline.get(step.name)
+        if old is None or step.skipped or old.get("skipped") or old["seconds"] <= 0:
+            continue
+        ratio = step.seconds / old["seconds"]
+        print(f"{step.name:>40}  {old['seconds']:8.3f}  {step.seconds:8.3f}  {ratio:.2f}x", file=sys.stderr)
+
+
+# Punto de entrada de la línea de comandos.
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Reproducible benchmark suite on a synthetic DGT dataset.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Total rows across all files.")
+    parser.add_argument("--periods", type=int, default=12, help="Monthly files to generate.")
+    parser.add_argument("--schools", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", type=Path, help="Reuse existing DGT files instead of generating them.")
+    parser.add_argument("--export-rows", type=int, default=20_000, help="Rows in the PDF export step.")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip Python memory tracing (faster).")
+    parser.add_argument("--output", type=Path, help="Write the JSON result here instead of stdout.")
+    parser.add_argument("--compare", type=Path, help="Previous JSON result to compare against.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        if args.data_dir:
+            paths = sorted(p for p in args.data_dir.iterdir() if p.suffix.lower() in (".txt", ".csv"))
+        else:
+            spec = SyntheticSpec(schools=args.schools, seed=args.seed)
+            paths = write_dataset(work_dir / "data", args.rows, args.periods, spec=spec)
+        steps = run_suite(paths, work_dir, args.export_rows, trace_memory=not args.no_tracemalloc)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "files": len(paths),
+            "rows": None if args.data_dir else args.rows,
+            "periods": None if args.data_dir else args.periods,
+            "schools": None if args.data_dir else args.schools,
+            "seed": None if args.data_dir else args.seed,
+            "tracemalloc": not args.no_tracemalloc,
+        },
+        "steps": [asdict(step) for step in steps],
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.compare:
+        print_comparison(steps, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
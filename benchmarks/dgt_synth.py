@@ -0,0 +1,169 @@
+# Generador de ficheros sintéticos con el formato de la DGT (separados por ';', columnas de
+# REQUIRED_COLUMNS): un fichero por periodo (año/mes), con provincias, centros de examen y
+# autoescuelas configurables. Es determinista para una misma semilla.
+#
+# Uso: python benchmarks/dgt_synth.py OUT_DIR [--rows 1000000] [--periods 12] [--schools 10000]
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "driving_exams"))
+
+from services.csv_importer import REQUIRED_COLUMNS  # noqa: E402
+
+
+# Valores de las columnas de texto (provincias reales, con tildes como en los ficheros).
+PROVINCES = [
+    "A Coruña", "Álava", "Albacete", "Alicante", "Almería", "Asturias", "Ávila", "Badajoz",
+    "Barcelona", "Burgos", "Cáceres", "Cádiz", "Cantabria", "Castellón", "Ceuta", "Ciudad Real",
+    "Córdoba", "Cuenca", "Girona", "Granada", "Guadalajara", "Guipúzcoa", "Huelva", "Huesca",
+    "Illes Balears", "Jaén", "La Rioja", "Las Palmas", "León", "Lleida", "Lugo", "Madrid",
+    "Málaga", "Melilla", "Murcia", "Navarra", "Ourense", "Palencia", "Pontevedra", "Salamanca",
+    "Santa Cruz de Tenerife", "Segovia", "Sevilla", "Soria", "Tarragona", "Teruel", "Toledo",
+    "Valencia", "Valladolid", "Vizcaya", "Zamora", "Zaragoza",
+]
+EXAM_TYPES = ["TEORICO", "CIRCULACION", "DESTREZA"]
+PERMITS = ["B", "A2", "A1", "AM", "C", "C1", "D", "BE", "CE", "D1"]
+_NAME_WORDS = [
+    "PEÑÓN", "SOL", "CÉSAR", "ÁGUILA", "GIRALDA", "MONTAÑA", "CIUDAD", "RÁPIDA", "VOLANTE",
+    "CAMIÓN", "NORTE", "SUR", "LEVANTE", "PONIENTE", "MARÍA", "JOSÉ", "ESPAÑA", "PLAZA",
+]
+
+
+@dataclass(frozen=True, slots=True)
+# Forma del dataset: número de provincias y autoescuelas y centros de examen por provincia.
+class SyntheticSpec:
+    provinces: int = len(PROVINCES)
+    centers_per_province: int = 3
+    schools: int = 10_000
+    seed: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+# Autoescuela sintética: provincia, centro de examen, código y nombre.
+class _School:
+    province: str
+    exam_center: str
+    code: str
+    name: str
+
+
+# Crea las autoescuelas del dataset; las provincias grandes (las primeras tras barajar)
+# reciben más autoescuelas.
+def _make_schools(spec: SyntheticSpec) -> list[_School]:
+    rnd = random.Random(spec.seed)
+    provinces = PROVINCES[: max(1, min(spec.provinces, len(PROVINCES)))]
+    weights = [1.0 / (rank + 1) ** 0.7 for rank in range(len(provinces))]
+    shuffled = rnd.sample(provinces, len(provinces))
+    schools = []
+    for i in range(spec.schools):
+        province = rnd.choices(shuffled, weights)[0]
+        center = f"{province} {rnd.randrange(spec.centers_per_province) + 1}"
+        word = rnd.choice(_NAME_WORDS)
+        schools.append(_School(province, center, f"{province[:2].upper()}{i:05d}", f"AUTOESCUELA {word} {i}"))
+    return schools
+
+
+# Escribe un fichero de un periodo con `rows` filas únicas (autoescuela, sección, tipo de
+# examen y permiso). Las combinaciones se recorren en un orden barajado y reproducible.
+def write_period_file(
+    path: Path,
+    year: int,
+    month: int,
+    rows: int,
+    spec: SyntheticSpec = SyntheticSpec(),
+    encoding: str = "utf-8",
+    schools: list[_School] | None = None,
+) -> Path:
+    schools = schools or _make_schools(spec)
+    rnd = random.Random(spec.seed * 1_000_003 + year * 100 + month)
+    per_section = len(schools) * len(EXAM_TYPES) * len(PERMITS)
+    offset = rnd.randrange(per_section)
+    # Paso primo con el tamaño: recorre todas las combinaciones sin repetir, en otro orden.
+    stride = 7919 if per_section % 7919 else 1
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding=encoding, newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(REQUIRED_COLUMNS)
+        for k in range(rows):
+            section, combo = divmod(k, per_section)
+            combo = (combo * stride + offset) % per_section
+            school = schools[combo % len(schools)]
+            exam_type = EXAM_TYPES[(combo // len(schools)) % len(EXAM_TYPES)]
+            permit = PERMITS[combo // (len(schools) * len(EXAM_TYPES))]
+            passes = [int(rnd.expovariate(1 / w)) for w in (6.0, 3.0, 1.5, 0.5)]
+            writer.writerow(
+                [
+                    school.province,
+                    school.exam_center,
+                    school.code,
+                    school.name,
+                    section,
+                    month,
+                    year,
+                    exam_type,
+                    permit,
+                    sum(passes),
+                    *passes,
+                    int(rnd.expovariate(1 / 3.0)),
+                ]
+            )
+    return path
+
+
+# Escribe `rows` filas repartidas en `periods` ficheros mensuales consecutivos a partir de
+# `start` (año, mes); devuelve las rutas en orden.
+def write_dataset(
+    out_dir: Path,
+    rows: int,
+    periods: int = 12,
+    start: tuple[int, int] = (2023, 1),
+    spec: SyntheticSpec = SyntheticSpec(),
+    encoding: str = "utf-8",
+) -> list[Path]:
+    if rows < 1 or periods < 1:
+        raise ValueError("rows and periods must be positive")
+    schools = _make_schools(spec)
+    year, month = start
+    paths = []
+    for i in range(periods):
+        count = rows // periods + (1 if i < rows % periods else 0)
+        path = Path(out_dir) / f"dgt_{year}_{month:02d}.txt"
+        paths.append(write_period_file(path, year, month, count, spec, encoding, schools))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return paths
+
+
+# Punto de entrada de la línea de comandos.
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Write synthetic DGT exam files.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Total rows across all files.")
+    parser.add_argument("--periods", type=int, default=12, help="Monthly files to write.")
+    parser.add_argument("--start", default="2023-01", help="First period as YYYY-MM.")
+    parser.add_argument("--provinces", type=int, default=len(PROVINCES))
+    parser.add_argument("--centers", type=int, default=3, help="Exam centers per province.")
+    parser.add_argument("--schools", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--encoding", default="utf-8", help="utf-8, utf-8-sig, cp1252 or latin-1.")
+    args = parser.parse_args()
+
+    year, month = (int(part) for part in args.start.split("-"))
+    spec = SyntheticSpec(
+        provinces=args.provinces,
+        centers_per_province=args.centers,
+        schools=args.schools,
+        seed=args.seed,
+    )
+    paths = write_dataset(args.out_dir, args.rows, args.periods, (year, month), spec, args.encoding)
+    print(f"Wrote {args.rows} rows in {len(paths)} file(s) to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,11 @@
 # Permite ejecutar la aplicación con `python -m driving_exams`.
-from driving_exams.main import main
+import sys
+from pathlib import Path
+
+# Los módulos importan `services`, `ui`, `main` y `cli` desde el directorio del paquete.
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cli import main  # noqa: E402
 
 # Ejecuta la app cuando este módulo es el punto de entrada.
 if __name__ == "__main__":
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import dataclasses
+import glob
+import json
+import os
+import sqlite3
+import sys
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any, TextIO
+
+from services.csv_importer import DEFAULT_BATCH_SIZE
+from services.database import DEFAULT_DB_PATH, ROW_COLUMNS, Database, DatabaseError, rows_order
+
+
+# Extensiones de los ficheros de la DGT al importar un directorio completo.
+_IMPORT_SUFFIXES = (".txt", ".csv")
+
+# Opciones de filtro de los subcomandos de consulta y la clave de filtro de Database.
+_FILTER_OPTIONS = (
+    ("year", "year", int),
+    ("month", "month", int),
+    ("province", "province", str),
+    ("exam-center", "exam_center", str),
+    ("school-code", "school_code", str),
+    ("exam-type", "exam_type", str),
+    ("permit", "permit", str),
+    ("school-name", "school_name_contains", str),
+)
+
+
+# Expande directorios y patrones glob (útil en shells que no los expanden, p. ej. Windows).
+def _expand_paths(patterns: Sequence[str]) -> list[Path]:
+    paths: list[Path] = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            paths.extend(Path(p) for p in sorted(glob.glob(pattern)))
+            continue
+        path = Path(pattern)
+        if path.is_dir():
+            paths.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in _IMPORT_SUFFIXES))
+        else:
+            paths.append(path)
+    return paths
+
+
+# Construye el dict de filtros de Database a partir de las opciones de la línea de comandos.
+def _filters_from_args(args: argparse.Namespace) -> dict[str, Any]:
+    filters: dict[str, Any] = {}
+    for _, key, _ in _FILTER_OPTIONS:
+        value = getattr(args, key)
+        if value is not None and value != "":
+            filters[key] = value
+    return filters
+
+
+@contextlib.contextmanager
+# Abre el fichero de salida (o usa stdout) para escribir texto.
+def _open_output(path: Path | None) -> Iterator[TextIO]:
+    if path is None:
+        yield sys.stdout
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        yield f
+
+
+# Abre la base de datos en solo lectura y sin caché para una consulta puntual.
+def _open_read_only(db_path: Path) -> Database:
+    if not db_path.exists():
+        raise DatabaseError(f"Database not found: {db_path}")
+    return Database(db_path, read_only=True, cache_entries=0)
+
+
+# Escribe las filas como JSON (un array que se va escribiendo fila a fila) o CSV.
+def _write_rows(out: TextIO, fmt: str, columns: Sequence[str], rows: Iterator[dict[str, Any]]) -> int:
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([row[c] for c in columns])
+            count += 1
+        return count
+
+    out.write("[")
+    for row in rows:
+        out.write(",\n " if count else "\n ")
+        out.write(json.dumps({c: row[c] for c in columns}, ensure_ascii=False))
+        count += 1
+    out.write("\n]\n" if count else "]\n")
+    return count
+
+
+# Subcomando `query`: escribe las filas de detalle que cumplen los filtros.
+def _cmd_query(args: argparse.Namespace) -> int:
+    filters = _filters_from_args(args)
+    try:
+        db = _open_read_only(args.db)
+    except (DatabaseError, sqlite3.Error) as exc:
+        print(f"Could not open database: {exc}", file=sys.stderr)
+        return 1
+    try:
+        rows: Iterator[dict[str, Any]] = db.iter_rows(filters, order=rows_order(args.sort, args.descending))
+        if args.limit is not None:
+            rows = (row for _, row in zip(range(args.limit), rows))
+        with _open_output(args.output) as out:
+            _write_rows(out, args.format, ROW_COLUMNS, rows)
+    except BrokenPipeError:
+        # La salida se cortó (p. ej. `| head`): se descarta el resto sin traza de error.
+        sys.stdout = open(os.devnull, "w")  # noqa: SIM115
+    finally:
+        db.close()
+    return 0
+
+
+# Subcomando `totals`: escribe aprobados, suspensos y tasa de aprobados, en total y por
+# tipo de examen.
+def _cmd_totals(args: argparse.Namespace) -> int:
+    filters = _filters_from_args(args)
+    try:
+        db = _open_read_only(args.db)
+    except (DatabaseError, sqlite3.Error) as exc:
+        print(f"Could not open database: {exc}", file=sys.stderr)
+        return 1
+    try:
+        totals = db.fetch_totals(filters)
+        by_exam_type = db.fetch_totals_by_exam_type(filters)
+        row_count = db.count_rows(filters)
+    finally:
+        db.close()
+
+    groups = [
+        {"exam_type": "ALL", **totals},
+        *({"exam_type": g["exam_type"], "passed": g["passed"] or 0, "failed": g["failed"] or 0} for g in by_exam_type),
+    ]
+    for group in groups:
+        attempted = group["passed"] + group["failed"]
+        group["pass_rate"] = round(group["passed"] / attempted * 100.0, 2) if attempted else 0.0
+
+    with _open_output(args.output) as out:
+        if args.format == "csv":
+            _write_rows(out, "csv", ("exam_type", "passed", "failed", "pass_rate"), iter(groups))
+        else:
+            result = {"filters": filters, "rows": row_count, **groups[0], "by_exam_type": groups[1:]}
+            del result["exam_type"]
+            out.write(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
+    return 0
+
+
+# Subcomando `import`: importa ficheros en paralelo e imprime el rendimiento por fichero
+# (o, con --format json, un resumen JSON al terminar).
+def _cmd_import(args: argparse.Namespace) -> int:
+    from services.bulk_import import bulk_import, format_result
+
+    paths = _expand_paths(args.files)
+    if not paths:
+        print("No files to import.", file=sys.stderr)
+        return 1
+
+    db = Database(args.db)
+    try:
+        results = bulk_import(
+            db,
+            paths,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            on_result=(lambda r: print(format_result(r), flush=True)) if args.format == "text" else None,
+            staged=not args.no_staging,
+            defer_indexes=args.defer_indexes,
+        )
+    finally:
+        db.close()
+
+    ok = [r for r in results if r.ok]
+    rows = sum(r.rows_read for r in ok)
+    inserted = sum(r.inserted for r in ok)
+    if args.format == "json":
+        summary = {"files": [dataclasses.asdict(r) for r in results], "rows_read": rows, "inserted": inserted}
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print(f"Imported {len(ok)}/{len(results)} file(s): {rows} rows read, {inserted} inserted.")
+    return 0 if len(ok) == len(results) else 1
+
+
+# Subcomando `advise`: mide las combinaciones de filtros, propone índices y (con --apply)
+# los crea, ejecuta ANALYZE y muestra la latencia antes/después.
+def _cmd_advise(args: argparse.Namespace) -> int:
+    from services.index_advisor import advise, drop_advised_indexes, format_report
+
+    db = Database(args.db, cache_entries=0)
+    try:
+        if args.drop:
+            names = drop_advised_indexes(db)
+            print(f"Dropped {len(names)} advised index(es).")
+            return 0
+        report = advise(
+            db,
+            max_filters=args.max_filters,
+            repeat=args.repeat,
+            apply=args.apply,
+            max_indexes=args.max_indexes,
+        )
+    finally:
+        db.close()
+
+    for line in format_report(report):
+        print(line)
+    return 0
+
+
+# Construye el parser de argumentos de la línea de comandos.
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m driving_exams",
+        description="Driving exams statistics. Without a command, the desktop app is started.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time every database call and SQL statement (Debug menu and status bar readout).",
+    )
+    parser.add_argument("--profile-dump", type=Path, help="Write the query timings to this JSON file on exit.")
+    parser.add_argument(
+        "--slow-ms",
+        type=float,
+        default=100.0,
+        help="Statements at least this slow are kept with their query plan (default: 100).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("sqlite", "numpy"),
+        default="sqlite",
+        help="Backend for totals the rollup tables cannot answer (school filters): SQLite, or an in-memory "
+        "NumPy copy of the results loaded at startup (needs NumPy).",
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="SQLite database path.")
+    commands = parser.add_subparsers(dest="command")
+
+    import_parser = commands.add_parser("import", parents=[common], help="Import DGT files in parallel.")
+    import_parser.add_argument("files", nargs="+", help="Files, directories or glob patterns.")
+    import_parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: all cores).")
+    import_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per batch.")
+    import_parser.add_argument(
+        "--no-staging",
+        action="store_true",
+        help="Insert batches row by row instead of loading each file through a staging table.",
+    )
+    import_parser.add_argument(
+        "--defer-indexes",
+        action="store_true",
+        help="Drop secondary indexes during the import and rebuild them (and the rollups) at the end.",
+    )
+    import_parser.add_argument("--format", choices=("text", "json"), default="text", help="Output format.")
+    import_parser.set_defaults(handler=_cmd_import)
+
+    filters = argparse.ArgumentParser(add_help=False)
+    for option, key, kind in _FILTER_OPTIONS:
+        filters.add_argument(f"--{option}", dest=key, type=kind)
+    filters.add_argument("--format", choices=("json", "csv"), default="json", help="Output format.")
+    filters.add_argument("--output", type=Path, help="Write to this file instead of stdout.")
+
+    query_parser = commands.add_parser(
+        "query",
+        parents=[common, filters],
+        help="Write the detail rows matching the filters (no GUI).",
+    )
+    query_parser.add_argument("--limit", type=int, help="Maximum number of rows.")
+    query_parser.add_argument("--sort", choices=ROW_COLUMNS, help="Sort the rows by this column.")
+    query_parser.add_argument("--descending", action="store_true", help="Sort in descending order.")
+    query_parser.set_defaults(handler=_cmd_query)
+
+    totals_parser = commands.add_parser(
+        "totals",
+        parents=[common, filters],
+        help="Write passed/failed totals, overall and by exam type (no GUI).",
+    )
+    totals_parser.set_defaults(handler=_cmd_totals)
+
+    advise_parser = commands.add_parser(
+        "advise",
+        parents=[common],
+        help="Time the filter combinations and recommend (or create) indexes.",
+    )
+    advise_parser.add_argument("--max-filters", type=int, default=2, help="Filters per combination.")
+    advise_parser.add_argument("--repeat", type=int, default=3, help="Timed runs per combination (best is kept).")
+    advise_parser.add_argument("--max-indexes", type=int, default=6, help="Maximum indexes to recommend.")
+    advise_parser.add_argument("--apply", action="store_true", help="Create the indexes, run ANALYZE and re-time.")
+    advise_parser.add_argument("--drop", action="store_true", help="Drop the indexes created by --apply.")
+    advise_parser.set_defaults(handler=_cmd_advise)
+    return parser
+
+
+# Punto de entrada: ejecuta un subcomando o, sin argumentos, la aplicación de escritorio.
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        from main import main as gui_main
+
+        profiler = None
+        if args.profile or args.profile_dump:
+            from services.instrumentation import QueryProfiler
+
+            profiler = QueryProfiler(slow_ms=args.slow_ms)
+        analytics = None
+        if args.engine == "numpy":
+            from services.analytics_engine import AnalyticsEngine
+
+            try:
+                analytics = AnalyticsEngine()
+            except DatabaseError as exc:
+                print(f"Could not start the NumPy engine: {exc}", file=sys.stderr)
+                return 1
+        return gui_main(profiler=profiler, profile_dump=args.profile_dump, analytics=analytics)
+    return args.handler(args)
@@ -1,24 +1,64 @@
 from __future__ import annotations
 
 import sys
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from PyQt6 import QtCore, QtWidgets
+from PyQt6 import QtCore, QtGui, QtWidgets
 
 from services.charts import ExamsChartCanvas
-from services.csv_importer import read_exam_file
-from services.database import Database, DatabaseError
-from services.reports import export_pdf_report
+from services.database import (
+    DEFAULT_DB_PATH,
+    NUMERIC_ROW_COLUMNS,
+    ROW_PAGE_COLUMNS,
+    Database,
+    ImportStats,
+    ViewResult,
+    row_sort_key,
+    rows_order,
+)
+from services.file_import import FileImporter
+from services.instrumentation import QueryProfiler
+from services.query_executor import QueryExecutor
+from services.report_export import PdfExportRequest, ReportExporter
+from services.row_store import RowPage
+from services.view_snapshot import ViewSnapshot, load_snapshot, save_snapshot, snapshot_path
 from ui.main_window_ui import Ui_MainWindow
 
+if TYPE_CHECKING:
+    from services.analytics_engine import AnalyticsEngine
 
-# Modelo Qt para mostrar los resultados en un QTableView.
+# Filas por página de la tabla principal.
+TABLE_PAGE_SIZE = 256
+
+# Intervalo (ms) de actualización del resumen de instrumentación en la barra de estado.
+PROFILE_REFRESH_MS = 1000
+
+
+# Modelo Qt paginado: carga páginas de SQLite bajo demanda (canFetchMore/fetchMore) con
+# paginación por clave y solo mantiene en memoria una ventana acotada de páginas, guardadas
+# por columnas (RowPage). Ordenar por una columna cambia el ORDER BY de la consulta (ver
+# rows_order), no las filas cargadas. Con un QueryExecutor (set_executor) las páginas se
+# leen en su hilo y las celdas de una página aún no recibida se muestran vacías.
 class ResultsTableModel(QtCore.QAbstractTableModel):
     # Inicializa el modelo y define las columnas visibles.
-    def __init__(self, rows: list[dict[str, Any]] | None = None) -> None:
+    def __init__(self, db: Database, page_size: int = TABLE_PAGE_SIZE, max_cached_pages: int = 16) -> None:
         super().__init__()
-        self._rows: list[dict[str, Any]] = rows or []
+        self._db = db
+        self._page_size = page_size
+        self._max_cached_pages = max_cached_pages
+        self._filters: dict[str, Any] = {}
+        self._order = rows_order()
+        self._pages: OrderedDict[int, RowPage] = OrderedDict()
+        self._page_keys: list[tuple[Any, ...] | None] = []
+        self._loaded = 0
+        self._exhausted = True
+        self._executor: QueryExecutor | None = None
+        # Páginas pedidas al ejecutor y aún sin respuesta; las respuestas de otra generación
+        # (filtros u orden anteriores) se descartan.
+        self._pending: set[int] = set()
+        self._generation = 0
         self._columns: list[tuple[str, str]] = [
             ("Year", "year"),
             ("Month", "month"),
@@ -36,18 +76,141 @@ class ResultsTableModel(QtCore.QAbstractTableModel):
             ("Passed 3rd/4th", "num_passed_3rd_or_4th"),
             ("Passed 5+", "num_passed_5plus"),
         ]
-
-    # Sustituye las filas del modelo y notifica a la vista.
-    def set_rows(self, rows: list[dict[str, Any]]) -> None:
+        # Posición de cada columna visible en las páginas y su alineación (fija por columna).
+        self._positions = [ROW_PAGE_COLUMNS.index(key) for _, key in self._columns]
+        left = QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter
+        right = QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter
+        self._alignments = [int(right if key in NUMERIC_ROW_COLUMNS else left) for _, key in self._columns]
+
+    # Lee las páginas con el hilo de consultas de `executor` en lugar de en el hilo de la UI.
+    def set_executor(self, executor: QueryExecutor) -> None:
+        self._executor = executor
+        executor.page_ready.connect(self._on_page_ready)
+        executor.page_failed.connect(self._on_page_failed)
+
+    # Cambia los filtros y descarta las páginas cargadas; la primera página puede venir ya
+    # consultada en el orden actual (p. ej. desde el hilo de consultas) o se pide aquí.
+    def set_filters(self, filters: dict[str, Any], first_page: RowPage | None = None) -> None:
         self.beginResetModel()
-        self._rows = rows
+        self._filters = dict(filters)
+        self._generation += 1
+        self._pending.clear()
+        self._pages.clear()
+        self._page_keys = [None]
+        self._loaded = 0
+        self._exhausted = False
+        self._append_page(notify=False, rows=first_page)
         self.endResetModel()
 
-    # Devuelve el número de filas del modelo.
+    # Ordena por una columna (columna negativa: orden por defecto) y vuelve a cargar desde
+    # la primera página con el nuevo ORDER BY.
+    def sort(self, column: int, order: QtCore.Qt.SortOrder = QtCore.Qt.SortOrder.AscendingOrder) -> None:
+        if column < 0 or column >= len(self._columns):
+            new_order = rows_order()
+        else:
+            new_order = rows_order(self._columns[column][1], order == QtCore.Qt.SortOrder.DescendingOrder)
+        if new_order == self._order:
+            return
+        self._order = new_order
+        if self._page_keys:
+            self.set_filters(self._filters)
+
+    # Devuelve el orden actual de las filas (columna, descendente).
+    def order(self) -> tuple[tuple[str, bool], ...]:
+        return self._order
+
+    # Devuelve el número de filas cargadas hasta ahora.
     def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # noqa: N802
         if parent.isValid():
             return 0
-        return len(self._rows)
+        return self._loaded
+
+    # Indica si quedan páginas por cargar (y la siguiente no está ya pedida).
+    def canFetchMore(self, parent: QtCore.QModelIndex) -> bool:  # noqa: N802
+        return not parent.isValid() and not self._exhausted and len(self._page_keys) - 1 not in self._pending
+
+    # Carga la siguiente página cuando la vista llega al final.
+    def fetchMore(self, parent: QtCore.QModelIndex) -> None:  # noqa: N802
+        if not self.canFetchMore(parent):
+            return
+        self._append_page(notify=True)
+
+    # Añade la siguiente página (pidiéndola si no se recibe) y registra la clave de inicio
+    # de la posterior.
+    def _append_page(self, notify: bool, rows: RowPage | None = None) -> None:
+        page_index = len(self._page_keys) - 1
+        if rows is None:
+            rows = self._fetch_page(page_index)
+            if rows is None:
+                return
+        if len(rows) < self._page_size:
+            self._exhausted = True
+        else:
+            self._page_keys.append(row_sort_key(rows, len(rows) - 1, self._order))
+        if not len(rows):
+            return
+
+        self._cache_page(page_index, rows)
+        first = self._loaded
+        if notify:
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(rows) - 1)
+        self._loaded += len(rows)
+        if notify:
+            self.endInsertRows()
+
+    # Guarda una página en la caché LRU y expulsa las más antiguas.
+    def _cache_page(self, page_index: int, rows: RowPage) -> None:
+        self._pages[page_index] = rows
+        self._pages.move_to_end(page_index)
+        while len(self._pages) > self._max_cached_pages:
+            self._pages.popitem(last=False)
+
+    # Lee la página `page_index` y la devuelve o, con ejecutor, la pide a su hilo (la
+    # respuesta llega a _on_page_ready) y devuelve None.
+    def _fetch_page(self, page_index: int) -> RowPage | None:
+        after = self._page_keys[page_index]
+        if self._executor is None:
+            return self._db.fetch_rows_page(self._filters, after=after, limit=self._page_size, order=self._order)
+        if page_index not in self._pending:
+            self._pending.add(page_index)
+            self._executor.fetch_page(
+                (self._generation, page_index), self._filters, after, self._order, self._page_size
+            )
+        return None
+
+    # Recibe una página pedida al ejecutor: la siguiente se añade al final; una expulsada
+    # de la caché vuelve a ella y se repintan sus filas.
+    def _on_page_ready(self, token: tuple[int, int], rows: RowPage) -> None:
+        generation, page_index = token
+        if generation != self._generation or page_index not in self._pending:
+            return
+        self._pending.discard(page_index)
+        first = page_index * self._page_size
+        if first >= self._loaded:
+            self._append_page(notify=True, rows=rows)
+            return
+        self._cache_page(page_index, rows)
+        last = min(first + self._page_size, self._loaded) - 1
+        self.dataChanged.emit(self.index(first, 0), self.index(last, len(self._columns) - 1))
+
+    # Olvida una página pedida que falló; se vuelve a pedir cuando la vista la necesite.
+    def _on_page_failed(self, token: tuple[int, int], _message: str) -> None:
+        generation, page_index = token
+        if generation == self._generation:
+            self._pending.discard(page_index)
+
+    # Devuelve la página de la fila `row` y su posición en ella. Si la página fue expulsada
+    # de la caché, la vuelve a leer o, con ejecutor, la pide y devuelve None.
+    def _locate(self, row: int) -> tuple[RowPage | None, int]:
+        page_index, offset = divmod(row, self._page_size)
+        rows = self._pages.get(page_index)
+        if rows is None:
+            rows = self._fetch_page(page_index)
+            if rows is not None:
+                self._cache_page(page_index, rows)
+        else:
+            self._pages.move_to_end(page_index)
+        return rows, offset
 
     # Devuelve el número de columnas del modelo.
     def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # noqa: N802
@@ -72,35 +235,44 @@ class ResultsTableModel(QtCore.QAbstractTableModel):
     def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole) -> Any:  # noqa: N802
         if not index.isValid():
             return None
-        row = self._rows[index.row()]
-        _, key = self._columns[index.column()]
-        value = row.get(key)
-
         if role == QtCore.Qt.ItemDataRole.DisplayRole:
-            return "" if value is None else str(value)
+            page, offset = self._locate(index.row())
+            if page is None or offset >= len(page):
+                return ""
+            return page.text(offset, self._positions[index.column()])
 
         if role == QtCore.Qt.ItemDataRole.TextAlignmentRole:
-            if isinstance(value, int):
-                return int(QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter)
-            return int(QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter)
+            return self._alignments[index.column()]
 
         return None
 
-    # Exporta la tabla como cabeceras + filas (texto) para reportes.
-    def export_table(self) -> tuple[list[str], list[list[str]]]:
-        headers = [title for title, _ in self._columns]
-        rows: list[list[str]] = []
-        for row in self._rows:
-            rows.append([str(row.get(key, "")) for _, key in self._columns])
-        return headers, rows
+    # Devuelve los filtros de las filas mostradas.
+    def filters(self) -> dict[str, Any]:
+        return dict(self._filters)
+
+    # Devuelve las columnas visibles (título, clave de fila) para los reportes.
+    def export_columns(self) -> tuple[tuple[str, str], ...]:
+        return tuple(self._columns)
 
 
 # Ventana principal: filtros, tabla, gráfica y exportación.
 class MainWindow(QtWidgets.QMainWindow):
-    # Construye la UI, inicializa modelos y carga datos iniciales.
-    def __init__(self, db: Database) -> None:
+    # Construye la UI e inicializa modelos; los datos se cargan cuando el bucle de eventos
+    # ya ha pintado la ventana (ver _initial_load), mostrando entretanto el snapshot de la
+    # última sesión si lo hay. Si `db` tiene profiler, añade el menú de depuración y el
+    # resumen de tiempos; `profile_dump` es el fichero donde se guardan las medidas al cerrar.
+    # `analytics` solo lo usa el lector del hilo de consultas: sincronizarlo desde `db` (p. ej.
+    # al contar filas para la tabla) bloquearía el hilo de la UI.
+    def __init__(
+        self,
+        db: Database,
+        profile_dump: Path | None = None,
+        analytics: AnalyticsEngine | None = None,
+    ) -> None:
         super().__init__()
         self._db = db
+        self._profile_dump = profile_dump
+        self._analytics = analytics
 
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
@@ -108,27 +280,161 @@ class MainWindow(QtWidgets.QMainWindow):
         self._chart = ExamsChartCanvas(self.ui.chartContainer)
         self.ui.chartContainerLayout.addWidget(self._chart)
 
-        self._table_model = ResultsTableModel([])
-        self._table_proxy = QtCore.QSortFilterProxyModel(self)
-        self._table_proxy.setSourceModel(self._table_model)
-        self._table_proxy.setSortCaseSensitivity(QtCore.Qt.CaseSensitivity.CaseInsensitive)
-        self.ui.tableView.setModel(self._table_proxy)
-        self.ui.tableView.sortByColumn(0, QtCore.Qt.SortOrder.DescendingOrder)
+        # El orden lo fija la consulta SQL (ResultsTableModel.sort): ordenar en un proxy
+        # obligaría a cargar todas las filas. Sin indicador se usa el orden por defecto.
+        self._table_model = ResultsTableModel(db)
+        self.ui.tableView.setModel(self._table_model)
+        self.ui.tableView.horizontalHeader().setSortIndicator(-1, QtCore.Qt.SortOrder.AscendingOrder)
+        self.ui.tableView.setSortingEnabled(True)
 
-        self._current_rows: list[dict[str, Any]] = []
         self._last_totals: dict[str, int] = {"passed": 0, "failed": 0}
+        self._last_row_count = 0
+        self._last_view: ViewSnapshot | None = None
+        self._snapshot_path = snapshot_path(db.db_path)
+
+        self._queries = QueryExecutor(
+            db.db_path,
+            page_size=TABLE_PAGE_SIZE,
+            parent=self,
+            pool=db.pool,
+            profiler=db.profiler,
+            analytics=analytics,
+        )
+        self._queries.finished.connect(self._on_view_ready)
+        self._queries.failed.connect(self._on_view_failed)
+        self._table_model.set_executor(self._queries)
+
+        self._exporter = ReportExporter(db, parent=self)
+        self._exporter.progress.connect(self._on_export_progress)
+        self._exporter.finished.connect(self._on_export_finished)
+        self._exporter.failed.connect(self._on_export_failed)
+        self._exporter.cancelled.connect(self._on_export_cancelled)
+        self._export_progress: QtWidgets.QProgressDialog | None = None
+
+        self._importer = FileImporter(db, parent=self)
+        self._importer.progress.connect(self._on_import_progress)
+        self._importer.finished.connect(self._on_import_finished)
+        self._importer.failed.connect(self._on_import_failed)
 
         self._wire_signals()
+        if db.profiler is not None:
+            self._setup_debug_tools(db.profiler)
+
+        self._snapshot = load_snapshot(self._snapshot_path)
+        if self._snapshot is not None:
+            self._chart.plot_exam_type_totals(self._snapshot.by_exam_type)
+            self._show_totals(self._snapshot.row_count, self._snapshot.totals, "last session, loading...")
+        else:
+            self.statusBar().showMessage("Loading...")
+        QtCore.QTimer.singleShot(0, self._initial_load)
+
+    # Carga inicial, ya con la ventana visible: valores de los filtros, selección del
+    # snapshot (si sus valores siguen existiendo) y consulta en segundo plano. Los totales
+    # del snapshot siguen en la barra de estado hasta que llega el resultado. Con motor
+    # analítico, su carga se encola detrás de esa primera consulta.
+    def _initial_load(self) -> None:
         self.refresh_filters()
-        self.apply_filters()
+        if self._snapshot is None:
+            self.apply_filters()
+        else:
+            self._restore_filters(self._snapshot.filters)
+            self._queries.submit(self.current_filters(), self._table_model.order())
+        if self._analytics is not None:
+            self._queries.load_analytics()
+
+    # Selecciona en la UI los filtros de un snapshot; los valores que ya no existen se ignoran.
+    def _restore_filters(self, filters: dict[str, Any]) -> None:
+        for key, combo in [
+            ("year", self.ui.yearCombo),
+            ("month", self.ui.monthCombo),
+            ("province", self.ui.provinceCombo),
+            ("exam_center", self.ui.centerCombo),
+            ("exam_type", self.ui.examTypeCombo),
+            ("permit", self.ui.permitCombo),
+        ]:
+            idx = combo.findData(filters.get(key))
+            if key in filters and idx >= 0:
+                combo.setCurrentIndex(idx)
+        self.ui.schoolCodeLineEdit.setText(str(filters.get("school_code", "")))
+        self.ui.schoolNameLineEdit.setText(str(filters.get("school_name_contains", "")))
 
-    # Cierra la base de datos al cerrar la ventana.
+    # Cierra la base de datos al cerrar la ventana, guarda el snapshot de la última vista (y
+    # las medidas, si se pidió).
     def closeEvent(self, event) -> None:  # noqa: N802
         try:
+            self._queries.shutdown()
+            self._exporter.shutdown()
+            self._importer.shutdown()
+            self._save_snapshot()
+            if self._db.profiler is not None and self._profile_dump is not None:
+                self._db.profiler.dump(self._profile_dump)
             self._db.close()
         finally:
             super().closeEvent(event)
 
+    # Guarda la última vista recibida; un error de escritura no debe impedir cerrar.
+    def _save_snapshot(self) -> None:
+        if self._last_view is None:
+            return
+        try:
+            save_snapshot(self._snapshot_path, self._last_view)
+        except OSError:
+            pass
+
+    # Añade el menú Debug (estadísticas, volcado y reinicio de medidas) y un resumen de
+    # latencias en la barra de estado que se actualiza periódicamente.
+    def _setup_debug_tools(self, profiler: QueryProfiler) -> None:
+        self._profile_label = QtWidgets.QLabel(profiler.summary_line())
+        self.statusBar().addPermanentWidget(self._profile_label)
+        self._profile_timer = QtCore.QTimer(self)
+        self._profile_timer.setInterval(PROFILE_REFRESH_MS)
+        self._profile_timer.timeout.connect(lambda: self._profile_label.setText(profiler.summary_line()))
+        self._profile_timer.start()
+
+        menu = self.menuBar().addMenu("&Debug")
+        menu.addAction("Query statistics...").triggered.connect(self.show_query_stats)
+        menu.addAction("Dump query trace...").triggered.connect(self.dump_query_trace)
+        menu.addAction("Reset query statistics").triggered.connect(profiler.reset)
+
+    # Muestra los histogramas por método y por sentencia y las sentencias lentas con su plan.
+    def show_query_stats(self) -> None:
+        profiler = self._db.profiler
+        if profiler is None:
+            return
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle("Query statistics")
+        dialog.resize(1000, 600)
+        text = QtWidgets.QPlainTextEdit("\n".join(profiler.report_lines()), dialog)
+        text.setReadOnly(True)
+        text.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.NoWrap)
+        text.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close, dialog)
+        buttons.rejected.connect(dialog.reject)
+        layout = QtWidgets.QVBoxLayout(dialog)
+        layout.addWidget(text)
+        layout.addWidget(buttons)
+        dialog.exec()
+
+    # Guarda las medidas de instrumentación en un fichero JSON elegido por el usuario.
+    def dump_query_trace(self) -> None:
+        profiler = self._db.profiler
+        if profiler is None:
+            return
+        path_str, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self,
+            "Dump query trace",
+            str(Path.home() / "driving_exams_queries.json"),
+            "JSON files (*.json)",
+        )
+        if not path_str:
+            return
+        try:
+            profiler.dump(Path(path_str))
+        except OSError as exc:
+            QtWidgets.QMessageBox.critical(self, "Dump failed", str(exc))
+            return
+        self.statusBar().showMessage(f"Saved query trace: {path_str}")
+
     # Conecta señales/acciones de la UI con sus handlers.
     def _wire_signals(self) -> None:
         self.ui.actionImportCsv.triggered.connect(self.import_csv)
@@ -222,26 +528,44 @@ class MainWindow(QtWidgets.QMainWindow):
 
         return filters
 
-    # Aplica filtros: consulta DB, actualiza tabla, gráfica y barra de estado.
+    # Aplica filtros: lanza las consultas en segundo plano (sustituyendo a las anteriores).
     def apply_filters(self) -> None:
-        filters = self.current_filters()
-        self._current_rows = self._db.fetch_rows(filters)
-        self._table_model.set_rows(self._current_rows)
+        self._queries.submit(self.current_filters(), self._table_model.order())
+        self.statusBar().showMessage("Loading...")
 
-        totals = self._db.fetch_totals(filters)
+    # Actualiza tabla, gráfica y barra de estado con el resultado de la consulta. Si la
+    # tabla se reordenó mientras tanto, su primera página se vuelve a pedir con el orden nuevo.
+    def _on_view_ready(
+        self,
+        _request_id: int,
+        filters: dict[str, Any],
+        order: tuple[tuple[str, bool], ...],
+        view: ViewResult,
+    ) -> None:
+        same_order = tuple(order) == self._table_model.order()
+        self._table_model.set_filters(filters, first_page=view.rows if same_order else None)
+
+        totals = view.totals
         self._last_totals = totals
+        self._last_row_count = view.row_count
+        self._last_view = ViewSnapshot(
+            filters=filters, row_count=view.row_count, totals=totals, by_exam_type=view.by_exam_type
+        )
+        self._chart.plot_exam_type_totals(view.by_exam_type)
+        self._show_totals(view.row_count, totals)
 
-        chart_rows = self._db.fetch_totals_by_exam_type(filters)
-        self._chart.plot_exam_type_totals(chart_rows)
-
-        total_rows = len(self._current_rows)
+    # Muestra filas, aprobados, suspensos y tasa de aprobados en la barra de estado.
+    def _show_totals(self, row_count: int, totals: dict[str, int], note: str = "") -> None:
         passed = totals.get("passed", 0)
         failed = totals.get("failed", 0)
         attempted = passed + failed
         pass_rate = (passed / attempted * 100.0) if attempted else 0.0
-        self.statusBar().showMessage(
-            f"Rows: {total_rows} | Passed: {passed} | Failed: {failed} | Pass rate: {pass_rate:.1f}%"
-        )
+        message = f"Rows: {row_count} | Passed: {passed} | Failed: {failed} | Pass rate: {pass_rate:.1f}%"
+        self.statusBar().showMessage(f"{message} ({note})" if note else message)
+
+    # Muestra en la barra de estado el error de la última consulta.
+    def _on_view_failed(self, _request_id: int, message: str) -> None:
+        self.statusBar().showMessage(f"Query failed: {message}")
 
     # Resetea filtros/inputs a su estado inicial y recarga resultados.
     def clear_filters(self) -> None:
@@ -258,38 +582,52 @@ class MainWindow(QtWidgets.QMainWindow):
         self.ui.schoolNameLineEdit.clear()
         self.apply_filters()
 
-    # Importa un CSV/TXT, lo inserta en la DB y refresca la vista.
+    # Importa un CSV/TXT en segundo plano (ver FileImporter); al terminar se refresca la vista.
     def import_csv(self) -> None:
+        if self._importer.is_running():
+            QtWidgets.QMessageBox.information(self, "Import in progress", "Wait for the current import to finish.")
+            return
+
         path_str, _ = QtWidgets.QFileDialog.getOpenFileName(
             self,
             "Import DGT exam results",
             str(Path.home()),
             "CSV/TXT files (*.csv *.txt);;All files (*.*)",
         )
-        if not path_str:
+        if not path_str or not self._importer.start(path_str):
             return
+        self.ui.actionImportCsv.setEnabled(False)
+        self.statusBar().showMessage("Importing...")
 
-        try:
-            import_result = read_exam_file(path_str)
-            inserted = self._db.import_exam_rows(import_result.rows, source_file=path_str)
-        except (ValueError, DatabaseError) as exc:
-            QtWidgets.QMessageBox.critical(self, "Import failed", str(exc))
-            return
-        except Exception as exc:  # noqa: BLE001
-            QtWidgets.QMessageBox.critical(self, "Import failed", f"Unexpected error: {exc!r}")
-            return
+    # Muestra en la barra de estado las filas leídas por la importación en curso.
+    def _on_import_progress(self, rows_read: int) -> None:
+        self.statusBar().showMessage(f"Importing... {rows_read} rows")
 
-        periods_str = ", ".join(f"{y}-{m:02d}" for (y, m) in sorted(import_result.periods))
+    # Informa de la importación terminada y vuelve a cargar filtros y vista.
+    def _on_import_finished(self, stats: ImportStats, encoding: str) -> None:
+        self.ui.actionImportCsv.setEnabled(True)
+        periods_str = ", ".join(f"{y}-{m:02d}" for (y, m) in sorted(stats.periods))
         QtWidgets.QMessageBox.information(
             self,
             "Import completed",
-            f"Imported period(s): {periods_str}\nInserted rows: {inserted}",
+            f"Imported period(s): {periods_str}\nInserted rows: {stats.inserted}\nEncoding: {encoding}",
         )
         self.refresh_filters()
         self.apply_filters()
 
-    # Exporta un reporte PDF (tabla, gráfica o ambos).
+    # Muestra el error de la importación (no se ha guardado ninguna fila del fichero).
+    def _on_import_failed(self, message: str) -> None:
+        self.ui.actionImportCsv.setEnabled(True)
+        self.statusBar().clearMessage()
+        QtWidgets.QMessageBox.critical(self, "Import failed", message)
+
+    # Exporta un reporte PDF (tabla, gráfica o ambos) en segundo plano: las filas se leen
+    # con un cursor y se dibujan página a página mientras un diálogo muestra el progreso.
     def export_pdf(self, mode: str) -> None:
+        if self._exporter.is_running():
+            QtWidgets.QMessageBox.information(self, "Export in progress", "Wait for the current export to finish.")
+            return
+
         include_table = mode in ("table", "both")
         include_chart = mode in ("chart", "both")
 
@@ -308,38 +646,79 @@ class MainWindow(QtWidgets.QMainWindow):
         if not path_str:
             return
 
-        filters = self.current_filters()
-        chart_image = self._chart.grab().toImage() if include_chart else None
-        headers, rows = self._table_model.export_table()
-
-        try:
-            export_pdf_report(
-                pdf_path=Path(path_str),
-                filters=filters,
-                totals=self._last_totals,
-                table_headers=headers,
-                table_rows=rows if include_table else [],
-                chart_image=chart_image,
-                include_table=include_table,
-                include_chart=include_chart,
-            )
-        except Exception as exc:  # noqa: BLE001
-            QtWidgets.QMessageBox.critical(self, "Export failed", f"Unexpected error: {exc!r}")
+        request = PdfExportRequest(
+            pdf_path=Path(path_str),
+            filters=self._table_model.filters(),
+            order=self._table_model.order(),
+            totals=dict(self._last_totals),
+            columns=self._table_model.export_columns(),
+            chart_image=self._chart.grab().toImage() if include_chart else None,
+            include_table=include_table,
+            include_chart=include_chart,
+        )
+        if not self._exporter.start(request):
             return
 
-        QtWidgets.QMessageBox.information(self, "Export completed", f"Saved: {path_str}")
-
-
-# Punto de entrada: crea la app Qt, la DB y muestra la ventana principal.
-def main() -> int:
+        total = self._last_row_count if include_table else 0
+        dialog = QtWidgets.QProgressDialog("Exporting PDF report...", "Cancel", 0, total, self)
+        dialog.setWindowTitle("Export PDF report")
+        dialog.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.setMinimumDuration(500)
+        dialog.canceled.connect(self._exporter.cancel)
+        dialog.setValue(0)
+        self._export_progress = dialog
+
+    # Actualiza el diálogo de progreso con las filas dibujadas.
+    def _on_export_progress(self, rows: int) -> None:
+        dialog = self._export_progress
+        if dialog is None:
+            return
+        if dialog.maximum() and rows > dialog.maximum():
+            dialog.setMaximum(rows)
+        dialog.setValue(rows)
+        dialog.setLabelText(f"Exporting PDF report... {rows} rows")
+
+    # Cierra el diálogo de progreso sin emitir su señal de cancelación.
+    def _close_export_progress(self) -> None:
+        dialog, self._export_progress = self._export_progress, None
+        if dialog is None:
+            return
+        dialog.canceled.disconnect()
+        dialog.close()
+        dialog.deleteLater()
+
+    # Informa del PDF generado.
+    def _on_export_finished(self, path: str, rows: int) -> None:
+        self._close_export_progress()
+        QtWidgets.QMessageBox.information(self, "Export completed", f"Saved: {path}\nRows: {rows}")
+
+    # Muestra el error de la exportación.
+    def _on_export_failed(self, message: str) -> None:
+        self._close_export_progress()
+        QtWidgets.QMessageBox.critical(self, "Export failed", f"Unexpected error: {message}")
+
+    # Indica en la barra de estado que la exportación se canceló (el PDF parcial se borra).
+    def _on_export_cancelled(self) -> None:
+        self._close_export_progress()
+        self.statusBar().showMessage("PDF export cancelled.")
+
+
+# Punto de entrada: crea la app Qt, la DB y muestra la ventana principal. Con `profiler`
+# se instrumentan las consultas; `profile_dump` guarda sus medidas al cerrar; con
+# `analytics`, los totales que no cubren los agregados salen del motor en memoria.
+def main(
+    profiler: QueryProfiler | None = None,
+    profile_dump: Path | None = None,
+    analytics: AnalyticsEngine | None = None,
+) -> int:
     app = QtWidgets.QApplication(sys.argv)
     app.setApplicationName("Driving Exams Statistics")
 
-    base_dir = Path(__file__).resolve().parent
-    db_path = base_dir / "data" / "driving_exams.db"
-    db = Database(db_path)
+    db = Database(DEFAULT_DB_PATH, profiler=profiler)
 
-    window = MainWindow(db)
+    window = MainWindow(db, profile_dump=profile_dump, analytics=analytics)
     window.show()
     return app.exec()
 
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from itertools import chain
+from typing import TYPE_CHECKING, Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy es opcional
+    np = None
+
+from services.database import FACT_COLUMNS, DatabaseError, normalize_search_text
+
+if TYPE_CHECKING:
+    from services.database import Database
+
+
+# Indica si el motor analítico está disponible (NumPy instalado).
+NUMPY_AVAILABLE = np is not None
+
+# Filas que se leen de SQLite por lote al cargar el motor.
+LOAD_BATCH_SIZE = 100_000
+
+# Campos de etiqueta (ids de dim_values) que se cargan, codificados como diccionario por campo.
+ENGINE_LABEL_FIELDS = ("province", "exam_center", "school_code", "school_name", "exam_type", "permit")
+
+# Campos con índice invertido (filas por código): los filtros de autoescuela, que ninguna
+# tabla de agregados cubre y suelen seleccionar pocas filas.
+INDEXED_FIELDS = ("school_code", "school_name")
+
+# Fracción máxima de filas que puede seleccionar la búsqueda por nombre para resolverla con
+# el índice; por encima es más rápido evaluar la máscara sobre toda la columna.
+INDEX_MAX_FRACTION = 0.25
+
+
+# Diccionario de un campo de etiqueta: código denso (0..n-1) por etiqueta y tabla de
+# traducción id de dim_values -> código (-1 si el id aún no tiene código).
+class _LabelDictionary:
+    # Empieza vacío.
+    def __init__(self) -> None:
+        self.labels: list[str] = []
+        self.codes: dict[str, int] = {}
+        self._lookup = np.full(0, -1, dtype=np.int32)
+
+    # Traduce ids de dim_values a códigos densos, asignando código a los ids nuevos con su
+    # etiqueta en `labels_by_id`.
+    def encode(self, ids: np.ndarray, labels_by_id: dict[int, str]) -> np.ndarray:
+        if not len(ids):
+            return np.zeros(0, dtype=np.int32)
+        top = int(ids.max()) + 1
+        if top > len(self._lookup):
+            self._lookup = np.concatenate([self._lookup, np.full(top - len(self._lookup), -1, dtype=np.int32)])
+        for dim_id in np.unique(ids[self._lookup[ids] < 0]).tolist():
+            label = labels_by_id[dim_id]
+            code = self.codes.setdefault(label, len(self.labels))
+            if code == len(self.labels):
+                self.labels.append(label)
+            self._lookup[dim_id] = code
+        return self._lookup[ids]
+
+
+# Devuelve la comprobación "el nombre contiene `needle`" con la semántica de
+# `name LIKE '%needle%'` de _build_where: `%` equivale a cualquier texto y `_` a un carácter
+# (ambos lados ya vienen normalizados con normalize_search_text).
+def _like_contains(needle: str) -> Callable[[str], bool]:
+    if "%" not in needle and "_" not in needle:
+        return lambda name: needle in name
+    pattern = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in needle)
+    search = re.compile(pattern, re.DOTALL).search
+    return lambda name: search(name) is not None
+
+
+@dataclass(frozen=True, slots=True)
+# Índice invertido de un campo: posiciones de las filas agrupadas por código (las filas
+# con código c son rows[offsets[c]:offsets[c + 1]], en orden de fila).
+class _CodeIndex:
+    rows: np.ndarray
+    offsets: np.ndarray
+
+    # Filas que tienen alguno de los códigos `codes`.
+    def count(self, codes: np.ndarray) -> int:
+        return int((self.offsets[codes + 1] - self.offsets[codes]).sum())
+
+    # Posiciones de las filas que tienen alguno de los códigos `codes` (agrupadas por código).
+    def select(self, codes: np.ndarray) -> np.ndarray:
+        starts = self.offsets[codes]
+        lengths = self.offsets[codes + 1] - starts
+        if len(codes) == 1:
+            return self.rows[starts[0] : starts[0] + lengths[0]]
+        # Posición de cada fila seleccionada en `rows`: el inicio de su tramo más su orden
+        # dentro de él, sin recorrer los tramos en Python.
+        shifts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return self.rows[np.arange(len(shifts)) + shifts]
+
+
+# Construye el índice invertido de una columna de códigos (0..size-1).
+def _build_index(codes: np.ndarray, size: int) -> _CodeIndex:
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=size), out=offsets[1:])
+    return _CodeIndex(rows=np.argsort(codes, kind="stable").astype(np.int32), offsets=offsets)
+
+
+@dataclass(frozen=True, slots=True)
+# Estado cargado del motor: columnas NumPy de exam_results (etiquetas como códigos densos)
+# y las etiquetas de cada código. Es inmutable: cada sincronización publica uno nuevo.
+class _EngineState:
+    last_id: int
+    year: np.ndarray
+    month: np.ndarray
+    labels: dict[str, np.ndarray]
+    passed: np.ndarray
+    failed: np.ndarray
+    codes: dict[str, dict[str, int]]
+    indexes: dict[str, _CodeIndex]
+    exam_types: tuple[str, ...]
+    search_names: tuple[str, ...]
+
+    @property
+    # Filas cargadas.
+    def rows(self) -> int:
+        return len(self.year)
+
+
+# Estado de un motor sin filas.
+def _empty_state() -> _EngineState:
+    return _EngineState(
+        last_id=0,
+        year=np.zeros(0, dtype=np.int16),
+        month=np.zeros(0, dtype=np.int8),
+        labels={
+            field: np.zeros(0, dtype=np.intp if field == "exam_type" else np.int32) for field in ENGINE_LABEL_FIELDS
+        },
+        passed=np.zeros(0, dtype=np.int32),
+        failed=np.zeros(0, dtype=np.int32),
+        codes={field: {} for field in ENGINE_LABEL_FIELDS},
+        indexes={field: _build_index(np.zeros(0, dtype=np.int32), 0) for field in INDEXED_FIELDS},
+        exam_types=(),
+        search_names=(),
+    )
+
+
+# Motor analítico en memoria: carga exam_results una vez en columnas NumPy (las etiquetas
+# codificadas como diccionario por campo) y responde a los agregados con máscaras
+# vectorizadas y bincount, sin ir a SQLite. Acepta los mismos filtros que _build_where y
+# devuelve lo mismo que Database.count_rows/fetch_totals/fetch_totals_by_exam_type.
+# sync() añade solo las filas con id posterior a la última cargada (y recarga todo si se
+# borraron filas, p. ej. al deshacer una importación). Un Database con el motor asignado
+# lo usa para los filtros que no cubre ninguna tabla de agregados y lo sincroniza cuando
+# cambian sus datos. Es seguro entre hilos: las consultas leen el último estado publicado.
+class AnalyticsEngine:
+    # Crea el motor vacío (se carga en el primer sync). Falla si NumPy no está instalado.
+    def __init__(self) -> None:
+        if np is None:
+            raise DatabaseError("The NumPy analytics engine needs NumPy (pip install numpy).")
+        self._lock = threading.Lock()
+        self._dictionaries = {field: _LabelDictionary() for field in ENGINE_LABEL_FIELDS}
+        self._state = _empty_state()
+
+    @property
+    # Filas cargadas.
+    def rows(self) -> int:
+        return self._state.rows
+
+    @property
+    # Memoria de las columnas cargadas y sus índices, en bytes.
+    def nbytes(self) -> int:
+        state = self._state
+        columns = [state.year, state.month, state.passed, state.failed, *state.labels.values()]
+        columns.extend(array for index in state.indexes.values() for array in (index.rows, index.offsets))
+        return sum(column.nbytes for column in columns)
+
+    # Pone el motor al día con `db`: añade las filas nuevas o, si faltan filas ya cargadas,
+    # recarga la tabla entera. Devuelve las filas leídas. El recuento se comprueba siempre:
+    # un borrado por debajo del último id cargado (p. ej. al descartar una importación a
+    # medias) no cambia el id máximo.
+    def sync(self, db: "Database") -> int:
+        with self._lock:
+            state, dictionaries = self._state, self._dictionaries
+            max_id = db.max_fact_id()
+            if max_id < state.last_id or db.count_facts(state.last_id) != state.rows:
+                state = _empty_state()
+                dictionaries = {field: _LabelDictionary() for field in ENGINE_LABEL_FIELDS}
+            elif max_id == state.last_id:
+                return 0
+            self._state = self._append(state, dictionaries, db)
+            self._dictionaries = dictionaries
+            return self._state.rows - state.rows
+
+    # Lee las filas posteriores a state.last_id y devuelve el estado con ellas añadidas
+    # (los códigos nuevos se añaden a `dictionaries`).
+    def _append(
+        self,
+        state: _EngineState,
+        dictionaries: dict[str, _LabelDictionary],
+        db: "Database",
+    ) -> _EngineState:
+        batches = [self._decode_batch(batch) for batch in db.iter_fact_batches(state.last_id, LOAD_BATCH_SIZE)]
+        if not batches:
+            return state
+        labels_by_id = {field: {} for field in ENGINE_LABEL_FIELDS}
+        for dim_id, field, value in db.dimension_labels():
+            if field in labels_by_id:
+                labels_by_id[field][dim_id] = value
+
+        columns = {name: np.concatenate([b[name] for b in batches]) for name in FACT_COLUMNS}
+        # El tipo de examen va como intp: es la clave de bincount y así no se convierte en cada consulta.
+        labels = {
+            field: np.concatenate(
+                [
+                    state.labels[field],
+                    dictionaries[field]
+                    .encode(columns[f"{field}_id"], labels_by_id[field])
+                    .astype(np.intp if field == "exam_type" else np.int32),
+                ]
+            )
+            for field in ENGINE_LABEL_FIELDS
+        }
+        return _EngineState(
+            last_id=int(columns["id"][-1]),
+            year=np.concatenate([state.year, columns["year"].astype(np.int16)]),
+            month=np.concatenate([state.month, columns["month"].astype(np.int8)]),
+            labels=labels,
+            passed=np.concatenate([state.passed, columns["num_passed"].astype(np.int32)]),
+            failed=np.concatenate([state.failed, columns["num_failed"].astype(np.int32)]),
+            codes={field: dict(d.codes) for field, d in dictionaries.items()},
+            indexes={field: _build_index(labels[field], len(dictionaries[field].labels)) for field in INDEXED_FIELDS},
+            exam_types=tuple(dictionaries["exam_type"].labels),
+            search_names=tuple(normalize_search_text(name) for name in dictionaries["school_name"].labels),
+        )
+
+    @staticmethod
+    # Convierte un lote de tuplas (orden de FACT_COLUMNS) en una columna NumPy por campo.
+    def _decode_batch(batch: Sequence[tuple[int, ...]]) -> dict[str, np.ndarray]:
+        flat = np.fromiter(chain.from_iterable(batch), dtype=np.int64, count=len(batch) * len(FACT_COLUMNS))
+        matrix = flat.reshape(len(batch), len(FACT_COLUMNS))
+        return {name: matrix[:, i].copy() for i, name in enumerate(FACT_COLUMNS)}
+
+    @staticmethod
+    # Posiciones de las filas que cumplen los filtros (None: todas), con el mismo criterio
+    # que _build_where: valores vacíos se ignoran y una etiqueta desconocida no encuentra
+    # filas. Con filtro de autoescuela (o una búsqueda por nombre que selecciona pocas filas)
+    # se parte de las filas de su índice y el resto de condiciones solo se evalúan sobre
+    # ellas; si no, se combina una máscara por condición sobre las columnas completas.
+    def _selection(state: _EngineState, filters: dict[str, Any]) -> np.ndarray | None:
+        equal: dict[str, tuple[np.ndarray, int]] = {}
+        if year := filters.get("year"):
+            equal["year"] = (state.year, int(year))
+        if month := filters.get("month"):
+            equal["month"] = (state.month, int(month))
+        for key in ("province", "exam_center", "school_code", "exam_type", "permit"):
+            value = filters.get(key)
+            if value:
+                code = state.codes[key].get(str(value))
+                if code is None:
+                    return np.zeros(0, dtype=np.intp)
+                equal[key] = (state.labels[key], code)
+        matching: np.ndarray | None = None
+        if contains := filters.get("school_name_contains"):
+            contains_needle = _like_contains(normalize_search_text(str(contains)))
+            matching = np.fromiter(map(contains_needle, state.search_names), dtype=bool, count=len(state.search_names))
+
+        selection: np.ndarray | None = None
+        if "school_code" in equal:
+            _, code = equal.pop("school_code")
+            selection = state.indexes["school_code"].select(np.array([code]))
+        elif matching is not None:
+            index, names = state.indexes["school_name"], np.flatnonzero(matching)
+            if index.count(names) <= INDEX_MAX_FRACTION * state.rows:
+                selection, matching = index.select(names), None
+
+        if selection is None:
+            conditions = [column == value for column, value in equal.values()]
+            if matching is not None:
+                conditions.append(matching[state.labels["school_name"]])
+            if not conditions:
+                return None
+            mask = conditions[0]
+            for condition in conditions[1:]:
+                mask &= condition
+            return np.flatnonzero(mask)
+
+        for column, value in equal.values():
+            selection = selection[column.take(selection) == value]
+        if matching is not None:
+            selection = selection[matching[state.labels["school_name"].take(selection)]]
+        return selection
+
+    # Cuenta las filas que cumplen los filtros.
+    def count_rows(self, filters: dict[str, Any]) -> int:
+        state = self._state
+        selection = self._selection(state, filters)
+        return state.rows if selection is None else len(selection)
+
+    # Totales de aprobados/suspensos para los filtros.
+    def fetch_totals(self, filters: dict[str, Any]) -> dict[str, int]:
+        state = self._state
+        selection = self._selection(state, filters)
+        passed, failed = state.passed, state.failed
+        if selection is not None:
+            passed, failed = passed.take(selection), failed.take(selection)
+        return {"passed": int(passed.sum(dtype=np.int64)), "failed": int(failed.sum(dtype=np.int64))}
+
+    # Totales por tipo de examen (ordenados por tipo; solo los tipos con filas).
+    def fetch_totals_by_exam_type(self, filters: dict[str, Any]) -> list[dict[str, Any]]:
+        return [
+            {"exam_type": exam_type, "passed": passed, "failed": failed}
+            for exam_type, _, passed, failed in self._exam_type_groups(filters)
+        ]
+
+    # Filas, totales y totales por tipo de examen de los filtros con una sola máscara
+    # (los agregados de Database.fetch_view): (filas, totales, por tipo de examen).
+    def fetch_view_totals(self, filters: dict[str, Any]) -> tuple[int, dict[str, int], list[dict[str, Any]]]:
+        groups = self._exam_type_groups(filters)
+        by_exam_type = [{"exam_type": e, "passed": p, "failed": f} for e, _, p, f in groups]
+        totals = {"passed": sum(g[2] for g in groups), "failed": sum(g[3] for g in groups)}
+        return sum(g[1] for g in groups), totals, by_exam_type
+
+    # Grupos por tipo de examen (tipo, filas, aprobados, suspensos) con bincount sobre los
+    # códigos del tipo de las filas filtradas.
+    def _exam_type_groups(self, filters: dict[str, Any]) -> list[tuple[str, int, int, int]]:
+        state = self._state
+        selection = self._selection(state, filters)
+        codes = state.labels["exam_type"]
+        passed, failed = state.passed, state.failed
+        if selection is not None:
+            codes, passed, failed = codes.take(selection), passed.take(selection), failed.take(selection)
+        size = len(state.exam_types)
+        rows = np.bincount(codes, minlength=size)
+        passed_sums = np.bincount(codes, weights=passed, minlength=size)
+        failed_sums = np.bincount(codes, weights=failed, minlength=size)
+        return [
+            (exam_type, int(rows[code]), int(passed_sums[code]), int(failed_sums[code]))
+            for code, exam_type in sorted(enumerate(state.exam_types), key=lambda item: item[1])
+            if rows[code]
+        ]
+
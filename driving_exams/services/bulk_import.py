@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import queue
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import Queue
+from pathlib import Path
+
+from services.csv_importer import DEFAULT_BATCH_SIZE, detect_encoding, iter_exam_batches
+from services.database import Database, DatabaseError, ImportSession
+
+
+# Tipos de mensaje que los procesos de parseo envían al escritor.
+_BATCH = "batch"
+_DONE = "done"
+_FAILED = "failed"
+
+# Lotes en vuelo por proceso antes de que los productores esperen al escritor.
+_QUEUE_BATCHES_PER_WORKER = 4
+
+# Cola compartida con el escritor, asignada en cada proceso del pool.
+_queue: Queue | None = None
+
+
+# Resultado de importar un fichero: filas, tiempo, encoding y error (si lo hubo).
+@dataclass(frozen=True, slots=True)
+class FileImportResult:
+    path: str
+    rows_read: int
+    inserted: int
+    seconds: float
+    encoding: str | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds > 0 else 0.0
+
+
+# Inicializa un proceso del pool con la cola hacia el escritor.
+def _init_worker(batches: Queue) -> None:
+    global _queue
+    _queue = batches
+
+
+# Parsea un fichero en un proceso del pool y envía sus lotes al escritor.
+def _parse_file(file_id: int, path: str, batch_size: int) -> None:
+    assert _queue is not None
+    try:
+        encoding = detect_encoding(path)
+        for batch in iter_exam_batches(path, encoding=encoding, batch_size=batch_size):
+            _queue.put((_BATCH, file_id, batch))
+        _queue.put((_DONE, file_id, encoding))
+    except Exception as exc:  # noqa: BLE001
+        _queue.put((_FAILED, file_id, str(exc)))
+
+
+# Describe una línea de resultado para la salida de la consola.
+def format_result(result: FileImportResult) -> str:
+    if not result.ok:
+        return f"{result.path}: FAILED - {result.error}"
+    return (
+        f"{result.path}: {result.rows_read} rows, {result.inserted} inserted "
+        f"in {result.seconds:.2f}s ({result.rows_per_second:,.0f} rows/s, {result.encoding})"
+    )
+
+
+# Importa varios ficheros: los parsea en un pool de procesos y un único escritor
+# (este proceso) inserta los lotes en SQLite, con la misma protección de periodos duplicados.
+# `staged` carga cada fichero vía tabla de staging; `defer_indexes` aplaza índices
+# secundarios y agregados hasta el final (ver Database.bulk_load).
+def bulk_import(
+    db: Database,
+    paths: Sequence[str | Path],
+    *,
+    workers: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_result: Callable[[FileImportResult], None] | None = None,
+    staged: bool = True,
+    defer_indexes: bool = False,
+) -> list[FileImportResult]:
+    files = [str(p) for p in paths]
+    if not files:
+        return []
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+
+    batches: Queue = Queue(maxsize=workers * _QUEUE_BATCHES_PER_WORKER)
+    sessions: dict[int, ImportSession] = {}
+    started: dict[int, float] = {}
+    errors: dict[int, str] = {}
+    results: dict[int, FileImportResult] = {}
+
+    # Cierra un fichero (con éxito o error) y notifica su resultado.
+    def finish(file_id: int, encoding: str | None, error: str | None) -> None:
+        session = sessions.pop(file_id, None)
+        stats = None
+        if session is not None:
+            if error is None:
+                try:
+                    stats = session.finish()
+                except DatabaseError as exc:
+                    error = str(exc)
+            else:
+                session.abort()
+        elif error is None:
+            error = "No data rows found in the selected file."
+
+        elapsed = time.perf_counter() - started.get(file_id, time.perf_counter())
+        result = FileImportResult(
+            path=files[file_id],
+            rows_read=stats.rows_read if stats else 0,
+            inserted=stats.inserted if stats else 0,
+            seconds=elapsed,
+            encoding=encoding,
+            error=error,
+        )
+        results[file_id] = result
+        if on_result is not None:
+            on_result(result)
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(batches,))
+    futures: dict[int, Future] = {
+        file_id: pool.submit(_parse_file, file_id, path, batch_size) for file_id, path in enumerate(files)
+    }
+    with db.bulk_load() if defer_indexes else contextlib.nullcontext():
+        try:
+            while len(results) < len(files):
+                try:
+                    kind, file_id, payload = batches.get(timeout=0.5)
+                except queue.Empty:
+                    # Un proceso que muere sin avisar deja su fichero como fallido.
+                    for file_id, future in futures.items():
+                        if file_id not in results and future.done() and future.exception() is not None:
+                            finish(file_id, None, f"Parser process failed: {future.exception()!r}")
+                    continue
+
+                if file_id in results:
+                    continue
+                started.setdefault(file_id, time.perf_counter())
+
+                if kind == _BATCH:
+                    if file_id in errors:
+                        continue
+                    session = sessions.get(file_id)
+                    if session is None:
+                        session = sessions[file_id] = db.begin_import(source_file=files[file_id], staged=staged)
+                    try:
+                        session.add_batch(payload)
+                    except DatabaseError as exc:
+                        # Se descartan los lotes restantes hasta el mensaje final del productor.
+                        errors[file_id] = str(exc)
+                        sessions.pop(file_id).abort()
+                elif kind == _DONE:
+                    finish(file_id, payload, errors.get(file_id))
+                else:
+                    finish(file_id, None, payload)
+        finally:
+            for session in sessions.values():
+                session.abort()
+            pool.shutdown(wait=False, cancel_futures=True)
+            # Vacía la cola para que ningún productor quede bloqueado en put().
+            while True:
+                try:
+                    batches.get(timeout=0.1)
+                except queue.Empty:
+                    if all(future.done() for future in futures.values()):
+                        break
+            pool.shutdown(wait=True)
+
+    return [results[file_id] for file_id in range(len(files))]
@@ -2,11 +2,23 @@ from __future__ import annotations
 
 from typing import Any
 
+from matplotlib.artist import Artist
+from matplotlib.backend_bases import DrawEvent
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.container import BarContainer
 from matplotlib.figure import Figure
 
+# Margen sobre la barra más alta al fijar el eje Y.
+Y_HEADROOM = 1.1
 
-# Canvas de Matplotlib embebido en Qt para mostrar gráficas de resultados.
+# Fracción mínima del eje Y que debe ocupar la barra más alta para conservar la escala
+# (por debajo las barras se verían demasiado bajas y se reescala).
+MIN_Y_FILL = 0.3
+
+
+# Canvas de Matplotlib embebido en Qt para mostrar gráficas de resultados. Las barras y la
+# leyenda son artistas animados: el fondo (ejes, rejilla, etiquetas) se guarda tras cada
+# dibujo completo y, si cambian solo los valores, se repintan sobre él con blitting.
 class ExamsChartCanvas(FigureCanvas):
     # Inicializa la figura y el eje principal de la gráfica.
     def __init__(self, parent=None) -> None:
@@ -14,29 +26,95 @@ class ExamsChartCanvas(FigureCanvas):
         self._ax = self._figure.add_subplot(111)
         super().__init__(self._figure)
         self.setParent(parent)
+        self._labels: tuple[str, ...] | None = None
+        self._passed_bars: BarContainer | None = None
+        self._failed_bars: BarContainer | None = None
+        self._animated: list[Artist] = []
+        self._background: Any = None
+        self.mpl_connect("draw_event", self._on_draw)
 
-    # Dibuja una gráfica apilada (aprobados/suspensos) por tipo de examen.
+    # Dibuja una gráfica apilada (aprobados/suspensos) por tipo de examen. Si los tipos de
+    # examen no cambian se actualiza la altura de las barras en su sitio y, si además caben
+    # en la escala actual, solo se repintan las barras (blitting). Si no, se pide un dibujo
+    # completo con draw_idle, que agrupa varias actualizaciones seguidas en uno.
     def plot_exam_type_totals(self, rows: list[dict[str, Any]]) -> None:
-        self._ax.clear()
-
         if not rows:
-            self._ax.text(0.5, 0.5, "No data", ha="center", va="center")
-            self._ax.set_xticks([])
-            self._ax.set_yticks([])
-            self.draw()
+            self._show_no_data()
+            self._request_draw()
             return
 
-        labels = [str(r.get("exam_type", "")) for r in rows]
+        labels = tuple(str(r.get("exam_type", "")) for r in rows)
         passed = [int(r.get("passed", 0) or 0) for r in rows]
         failed = [int(r.get("failed", 0) or 0) for r in rows]
+        peak = max(p + f for p, f in zip(passed, failed))
+
+        if labels != self._labels or self._passed_bars is None or self._failed_bars is None:
+            self._rebuild(labels, passed, failed, peak)
+            self._request_draw()
+            return
+
+        for bar, p in zip(self._passed_bars, passed):
+            bar.set_height(p)
+        for bar, p, f in zip(self._failed_bars, passed, failed):
+            bar.set_y(p)
+            bar.set_height(f)
+
+        top = self._ax.get_ylim()[1]
+        if top * MIN_Y_FILL <= peak <= top:
+            self._blit()
+            return
+        self._ax.set_ylim(0, peak * Y_HEADROOM or 1)
+        self._request_draw()
 
+    # Recrea ejes, barras, etiquetas y leyenda para un nuevo conjunto de tipos de examen.
+    def _rebuild(self, labels: tuple[str, ...], passed: list[int], failed: list[int], peak: int) -> None:
+        self._ax.clear()
         x = list(range(len(labels)))
-        self._ax.bar(x, passed, label="Passed")
-        self._ax.bar(x, failed, bottom=passed, label="Failed")
+        self._passed_bars = self._ax.bar(x, passed, label="Passed")
+        self._failed_bars = self._ax.bar(x, failed, bottom=passed, label="Failed")
+        self._labels = labels
 
         self._ax.set_title("Totals by exam type")
         self._ax.set_ylabel("Candidates")
         self._ax.set_xticks(x)
         self._ax.set_xticklabels(labels, rotation=30, ha="right")
-        self._ax.legend()
-        self.draw()
+        self._ax.set_ylim(0, peak * Y_HEADROOM or 1)
+        legend = self._ax.legend()
+
+        self._animated = [*self._passed_bars, *self._failed_bars, legend]
+        for artist in self._animated:
+            artist.set_animated(True)
+
+    # Vacía la gráfica y muestra el aviso de que no hay datos.
+    def _show_no_data(self) -> None:
+        if self._labels == ():
+            return
+        self._ax.clear()
+        self._ax.text(0.5, 0.5, "No data", ha="center", va="center")
+        self._ax.set_xticks([])
+        self._ax.set_yticks([])
+        self._labels = ()
+        self._passed_bars = self._failed_bars = None
+        self._animated = []
+
+    # Descarta el fondo guardado y programa un dibujo completo.
+    def _request_draw(self) -> None:
+        self._background = None
+        self.draw_idle()
+
+    # Tras un dibujo completo guarda el fondo de los ejes y dibuja encima los artistas animados.
+    def _on_draw(self, _event: DrawEvent) -> None:
+        self._background = self.copy_from_bbox(self._ax.bbox)
+        for artist in self._animated:
+            self._ax.draw_artist(artist)
+
+    # Repinta solo los artistas animados sobre el fondo guardado (si hay un dibujo completo
+    # pendiente, ese dibujo ya mostrará los valores nuevos).
+    def _blit(self) -> None:
+        if self._background is None:
+            self.draw_idle()
+            return
+        self.restore_region(self._background)
+        for artist in self._animated:
+            self._ax.draw_artist(artist)
+        self.blit(self._ax.bbox)
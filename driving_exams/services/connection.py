@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+
+# PRAGMAs que se leen de la conexión para informar de la configuración efectiva.
+REPORTED_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "busy_timeout",
+    "page_size",
+    "foreign_keys",
+)
+
+
+@dataclass(frozen=True, slots=True)
+# Ajustes de las conexiones SQLite. `cache_size_kib` y `mmap_size` son por conexión;
+# `cached_statements` es el tamaño de la caché de sentencias preparadas de sqlite3.
+class ConnectionSettings:
+    journal_mode: str = "wal"
+    synchronous: str = "normal"
+    cache_size_kib: int = 64 * 1024
+    mmap_size: int = 256 * 1024 * 1024
+    temp_store: str = "memory"
+    busy_timeout_ms: int = 5_000
+    cached_statements: int = 256
+
+    # Sentencias PRAGMA a aplicar al abrir una conexión (el modo de diario solo lo fija
+    # el escritor: en WAL queda guardado en el fichero).
+    def pragma_statements(self, read_only: bool = False) -> list[str]:
+        statements = [
+            f"PRAGMA cache_size = -{int(self.cache_size_kib)}",
+            f"PRAGMA mmap_size = {int(self.mmap_size)}",
+            f"PRAGMA temp_store = {self.temp_store}",
+            f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}",
+        ]
+        if not read_only:
+            statements = [
+                f"PRAGMA journal_mode = {self.journal_mode}",
+                f"PRAGMA synchronous = {self.synchronous}",
+                "PRAGMA foreign_keys = ON",
+                *statements,
+            ]
+        return statements
+
+
+# Abre una conexión configurada. Las de solo lectura pueden usarse, cerrarse o
+# interrumpirse desde otro hilo.
+def open_connection(
+    db_path: Path,
+    settings: ConnectionSettings | None = None,
+    read_only: bool = False,
+) -> sqlite3.Connection:
+    settings = settings or ConnectionSettings()
+    if read_only:
+        uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=settings.cached_statements,
+        )
+    else:
+        conn = sqlite3.connect(db_path, cached_statements=settings.cached_statements)
+    conn.row_factory = sqlite3.Row
+    for statement in settings.pragma_statements(read_only=read_only):
+        conn.execute(statement).fetchall()
+    return conn
+
+
+# Devuelve los valores efectivos de los PRAGMAs de una conexión (para benchmarks/diagnóstico).
+def read_pragmas(conn: sqlite3.Connection) -> dict[str, Any]:
+    return {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in REPORTED_PRAGMAS}
+
+
+# Conexiones de una base de datos: un único escritor y un pool acotado de lectores de
+# solo lectura. En WAL los lectores ven el último commit mientras el escritor importa.
+class ConnectionPool:
+    # Guarda la configuración; las conexiones se abren al primer uso.
+    def __init__(
+        self,
+        db_path: Path,
+        settings: ConnectionSettings | None = None,
+        max_readers: int = 4,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.settings = settings or ConnectionSettings()
+        self.max_readers = max_readers
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_readers)
+        self._writer: sqlite3.Connection | None = None
+        self._idle: list[sqlite3.Connection] = []
+        self._borrowed: set[sqlite3.Connection] = set()
+
+    # Devuelve la conexión de escritura (la abre y configura la primera vez).
+    def writer(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._writer is None:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._writer = open_connection(self.db_path, self.settings)
+            return self._writer
+
+    # Toma un lector libre (o abre uno nuevo); espera si ya hay `max_readers` prestados.
+    def acquire_reader(self, timeout: float | None = None) -> sqlite3.Connection:
+        if not self._slots.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimeoutError("No read-only connection available.")
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = open_connection(self.db_path, self.settings, read_only=True)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._borrowed.add(conn)
+        return conn
+
+    # Devuelve un lector al pool (tras cerrar el pool la conexión ya está cerrada y se ignora).
+    def release_reader(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            if conn not in self._borrowed:
+                return
+            self._borrowed.discard(conn)
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.append(conn)
+        self._slots.release()
+
+    @contextmanager
+    # Presta un lector durante el bloque `with`.
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire_reader()
+        try:
+            yield conn
+        finally:
+            self.release_reader(conn)
+
+    # Informa de los ajustes pedidos y de los PRAGMAs efectivos de `conn` (por defecto, el escritor).
+    def pragma_report(self, conn: sqlite3.Connection | None = None) -> dict[str, Any]:
+        return {
+            "settings": asdict(self.settings),
+            "max_readers": self.max_readers,
+            "effective": read_pragmas(conn or self.writer()),
+        }
+
+    # Cierra el escritor y todos los lectores (también los prestados).
+    def close(self) -> None:
+        with self._lock:
+            connections = [*self._idle, *self._borrowed]
+            if self._writer is not None:
+                connections.append(self._writer)
+            self._idle.clear()
+            self._borrowed.clear()
+            self._writer = None
+        for conn in connections:
+            conn.close()
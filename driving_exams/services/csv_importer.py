@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import codecs
 import csv
+import re
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
 
 
@@ -23,6 +28,19 @@ REQUIRED_COLUMNS = [
     "NUM_NO_APTOS",
 ]
 
+# Número de filas por lote en la importación por streaming.
+DEFAULT_BATCH_SIZE = 5_000
+
+# Posiciones del mes y el año dentro de la tupla de inserción (ver ExamRow.as_db_tuple).
+DB_MONTH_INDEX = 5
+DB_YEAR_INDEX = 6
+
+# Tamaño de bloque al inspeccionar los bytes del fichero.
+_SNIFF_CHUNK_SIZE = 1 << 20
+
+# Bytes sin carácter asignado en cp1252 (el codec de Python falla con ellos).
+_CP1252_UNDEFINED = re.compile(rb"[\x81\x8d\x8f\x90\x9d]")
+
 
 # Convierte un valor de texto a entero, devolviendo 0 si está vacío.
 def _to_int(value: str) -> int:
@@ -77,6 +95,11 @@ class ExamRow:
             num_failed=_to_int(g("NUM_NO_APTOS")),
         )
 
+    @staticmethod
+    # Construye la vista ExamRow de una tupla de inserción (mismo orden de campos).
+    def from_db_tuple(values: tuple[object, ...]) -> "ExamRow":
+        return ExamRow(*values)  # type: ignore[arg-type]
+
     # Devuelve la tupla lista para inserción en la base de datos.
     def as_db_tuple(self) -> tuple[object, ...]:
         return (
@@ -103,45 +126,155 @@ class ExamRow:
 class CsvImportResult:
     rows: list[ExamRow]
     periods: set[tuple[int, int]]  # (year, month)
+    encoding: str
+
+
+# Lee la cabecera, valida las columnas y devuelve el índice columna -> posición.
+def _read_header(reader: Iterator[list[str]]) -> dict[str, int] | None:
+    try:
+        header_raw = next(reader)
+    except StopIteration:
+        return None
+
+    header = [h.strip().lstrip("\ufeff") for h in header_raw]
+    idx = {name: i for i, name in enumerate(header)}
+    missing = [col for col in REQUIRED_COLUMNS if col not in idx]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    return idx
+
+
+# Indica si una fila CSV está vacía (sin celdas o solo con espacios).
+def _is_blank(row: list[str]) -> bool:
+    return not row or all((cell or "").strip() == "" for cell in row)
+
+
+# Compila un parser para una cabecera: las posiciones de columna se calculan una vez y
+# cada fila se convierte directamente en la tupla de inserción, sin objetos intermedios.
+# Las filas cortas o con enteros vacíos pasan por ExamRow.from_csv_row (mismas reglas).
+def compile_row_parser(idx: dict[str, int]) -> Callable[[list[str]], tuple[object, ...]]:
+    positions = [idx[col] for col in REQUIRED_COLUMNS]
+    width = max(positions) + 1
+    get = itemgetter(*positions)
+
+    # Convierte una fila CSV en la tupla de inserción (orden de ExamRow.as_db_tuple).
+    def parse(row: list[str]) -> tuple[object, ...]:
+        if len(row) >= width:
+            (
+                province, exam_center, school_code, school_name, section_code, month, year, exam_type, permit,
+                passed, passed_1st, passed_2nd, passed_3rd_or_4th, passed_5plus, failed,
+            ) = get(row)
+            try:
+                return (
+                    province.strip(),
+                    exam_center.strip(),
+                    school_code.strip(),
+                    school_name.strip(),
+                    section_code.strip(),
+                    int(month),
+                    int(year),
+                    exam_type.strip(),
+                    permit.strip(),
+                    int(passed),
+                    int(passed_1st),
+                    int(passed_2nd),
+                    int(passed_3rd_or_4th),
+                    int(passed_5plus),
+                    int(failed),
+                )
+            except ValueError:
+                pass
+        return ExamRow.from_csv_row(row, idx).as_db_tuple()
+
+    return parse
+
+
+# Genera las tuplas de inserción de las filas de datos (omite filas vacías).
+def _iter_db_tuples(reader: Iterator[list[str]], idx: dict[str, int]) -> Iterator[tuple[object, ...]]:
+    parse = compile_row_parser(idx)
+    for row in reader:
+        if not row or (not row[0].strip() and _is_blank(row)):
+            continue
+        yield parse(row)
 
 
 # Lee el archivo con un encoding específico y devuelve filas parseadas.
 def _read_with_encoding(path: Path, encoding: str) -> list[ExamRow]:
     with path.open("r", encoding=encoding, newline="") as f:
         reader = csv.reader(f, delimiter=";")
-        try:
-            header_raw = next(reader)
-        except StopIteration:
+        idx = _read_header(reader)
+        if idx is None:
             return []
+        return [ExamRow.from_db_tuple(values) for values in _iter_db_tuples(reader, idx)]
 
-        header = [h.strip().lstrip("\ufeff") for h in header_raw]
-        idx = {name: i for i, name in enumerate(header)}
-        missing = [col for col in REQUIRED_COLUMNS if col not in idx]
-        if missing:
-            raise ValueError(f"Missing required column(s): {', '.join(missing)}")
 
-        rows: list[ExamRow] = []
-        for row in reader:
-            if not row or all((cell or "").strip() == "" for cell in row):
-                continue
-            rows.append(ExamRow.from_csv_row(row, idx))
-        return rows
+# Detecta el encoding leyendo los bytes una sola vez: valida UTF-8 con un decodificador
+# incremental y busca a la vez bytes no definidos en cp1252; latin-1 nunca falla.
+def detect_encoding(path: str | Path) -> str:
+    file_path = Path(path)
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    utf8_ok = True
+    cp1252_ok = True
 
+    with file_path.open("rb") as f:
+        while chunk := f.read(_SNIFF_CHUNK_SIZE):
+            if utf8_ok:
+                try:
+                    utf8.decode(chunk)
+                except UnicodeDecodeError:
+                    utf8_ok = False
+            if cp1252_ok and _CP1252_UNDEFINED.search(chunk):
+                cp1252_ok = False
+            if not utf8_ok and not cp1252_ok:
+                break
+        else:
+            if utf8_ok:
+                try:
+                    utf8.decode(b"", final=True)
+                except UnicodeDecodeError:
+                    utf8_ok = False
 
-# Lee un fichero CSV/TXT de la DGT probando varios encodings y valida columnas.
+    if utf8_ok:
+        return "utf-8-sig"
+    if cp1252_ok:
+        return "cp1252"
+    return "latin-1"
+
+
+# Lee un fichero CSV/TXT de la DGT (detectando su encoding) y valida columnas.
 def read_exam_file(path: str | Path) -> CsvImportResult:
     file_path = Path(path)
     if not file_path.exists():
         raise ValueError(f"File not found: {file_path}")
 
-    last_error: Exception | None = None
-    for encoding in ("utf-8-sig", "cp1252", "latin-1"):
-        try:
-            rows = _read_with_encoding(file_path, encoding=encoding)
-            periods = {(r.year, r.month) for r in rows}
-            return CsvImportResult(rows=rows, periods=periods)
-        except UnicodeDecodeError as exc:
-            last_error = exc
-            continue
+    encoding = detect_encoding(file_path)
+    rows = _read_with_encoding(file_path, encoding=encoding)
+    periods = {(r.year, r.month) for r in rows}
+    return CsvImportResult(rows=rows, periods=periods, encoding=encoding)
+
+
+# Genera lotes de tuplas listas para inserción directamente desde el csv.reader.
+# La memoria queda acotada por el tamaño del lote, no por el tamaño del fichero.
+def iter_exam_batches(
+    path: str | Path,
+    *,
+    encoding: str | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[list[tuple[object, ...]]]:
+    file_path = Path(path)
+    if not file_path.exists():
+        raise ValueError(f"File not found: {file_path}")
+    if batch_size <= 0:
+        raise ValueError(f"Invalid batch size: {batch_size}")
+    if encoding is None:
+        encoding = detect_encoding(file_path)
+
+    with file_path.open("r", encoding=encoding, newline="") as f:
+        reader = csv.reader(f, delimiter=";")
+        idx = _read_header(reader)
+        if idx is None:
+            return
 
-    raise ValueError(f"Could not decode file: {file_path}. Last error: {last_error!r}")
+        rows = _iter_db_tuples(reader, idx)
+        while batch := list(islice(rows, batch_size)):
+            yield batch
@@ -1,11 +1,30 @@
 from __future__ import annotations
 
+import functools
 import sqlite3
+import time
+import unicodedata
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from itertools import count, islice
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from services.csv_importer import ExamRow
+from services.connection import ConnectionPool, ConnectionSettings
+from services.csv_importer import DB_MONTH_INDEX, DB_YEAR_INDEX, DEFAULT_BATCH_SIZE, ExamRow
+from services.instrumentation import CallRecord, QueryProfiler, StatementRecord
+from services.query_cache import QueryCache
+from services.row_store import RowPage
+
+if TYPE_CHECKING:
+    from services.analytics_engine import AnalyticsEngine
+
+
+# Ruta por defecto de la base de datos (creada en el primer arranque).
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "driving_exams.db"
 
 
 # Error específico de la capa de base de datos.
@@ -13,6 +32,8 @@ class DatabaseError(RuntimeError):
     pass
 
 
+# Los campos de texto repetidos de exam_results se guardan como ids enteros de dim_values
+# (etiquetas internadas); las etiquetas solo se recuperan para las filas que se muestran.
 SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS imported_periods (
   year INTEGER NOT NULL,
@@ -20,37 +41,264 @@ CREATE TABLE IF NOT EXISTS imported_periods (
   imported_at TEXT NOT NULL,
   source_file TEXT,
   row_count INTEGER NOT NULL,
+  complete INTEGER NOT NULL DEFAULT 1,
   PRIMARY KEY (year, month)
 );
 
+CREATE TABLE IF NOT EXISTS dim_values (
+  id INTEGER PRIMARY KEY,
+  field TEXT NOT NULL,
+  value TEXT NOT NULL,
+  in_use INTEGER NOT NULL DEFAULT 0,
+  UNIQUE (field, value)
+);
+
+CREATE TABLE IF NOT EXISTS dim_periods (
+  year INTEGER NOT NULL,
+  month INTEGER NOT NULL,
+  PRIMARY KEY (year, month)
+) WITHOUT ROWID;
+
 CREATE TABLE IF NOT EXISTS exam_results (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
-  province TEXT NOT NULL,
-  exam_center TEXT NOT NULL,
-  school_code TEXT NOT NULL,
-  school_name TEXT NOT NULL,
-  section_code TEXT NOT NULL,
+  province_id INTEGER NOT NULL,
+  exam_center_id INTEGER NOT NULL,
+  school_code_id INTEGER NOT NULL,
+  school_name_id INTEGER NOT NULL,
+  section_code_id INTEGER NOT NULL,
   month INTEGER NOT NULL,
   year INTEGER NOT NULL,
-  exam_type TEXT NOT NULL,
-  permit TEXT NOT NULL,
+  exam_type_id INTEGER NOT NULL,
+  permit_id INTEGER NOT NULL,
   num_passed INTEGER NOT NULL,
   num_passed_1st INTEGER NOT NULL,
   num_passed_2nd INTEGER NOT NULL,
   num_passed_3rd_or_4th INTEGER NOT NULL,
   num_passed_5plus INTEGER NOT NULL,
   num_failed INTEGER NOT NULL,
-  UNIQUE (province, exam_center, school_code, section_code, month, year, exam_type, permit)
+  UNIQUE (province_id, exam_center_id, school_code_id, section_code_id, month, year, exam_type_id, permit_id)
     ON CONFLICT IGNORE
 );
 
 CREATE INDEX IF NOT EXISTS idx_exam_results_period ON exam_results (year, month);
 CREATE INDEX IF NOT EXISTS idx_exam_results_filters ON exam_results (
-  year, month, province, exam_center, exam_type, permit, school_code
+  year, month, province_id, exam_center_id, exam_type_id, permit_id, school_code_id
 );
+CREATE INDEX IF NOT EXISTS idx_exam_results_school_name ON exam_results (school_name_id);
+CREATE INDEX IF NOT EXISTS idx_exam_results_sort_province ON exam_results (province_id);
+CREATE INDEX IF NOT EXISTS idx_exam_results_sort_exam_center ON exam_results (exam_center_id);
+-- El resto de columnas ordenables tiene índice solo tras una carga masiva (ver
+-- BULK_SORT_INDEXES_SQL). Los recuentos por número de intento se ordenan filtrando primero
+-- (ver _sort_index): sus índices frenaban la importación sin apenas uso. Se eliminan en las
+-- bases que los tengan.
+DROP INDEX IF EXISTS idx_exam_results_sort_num_passed_1st;
+DROP INDEX IF EXISTS idx_exam_results_sort_num_passed_2nd;
+DROP INDEX IF EXISTS idx_exam_results_sort_num_passed_3rd_or_4th;
+DROP INDEX IF EXISTS idx_exam_results_sort_num_passed_5plus;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS school_name_search USING fts5(name, tokenize = 'trigram');
+
+CREATE TABLE IF NOT EXISTS exam_rollup (
+  year INTEGER NOT NULL,
+  month INTEGER NOT NULL,
+  province_id INTEGER NOT NULL,
+  exam_center_id INTEGER NOT NULL,
+  exam_type_id INTEGER NOT NULL,
+  permit_id INTEGER NOT NULL,
+  num_passed INTEGER NOT NULL,
+  num_failed INTEGER NOT NULL,
+  row_count INTEGER NOT NULL,
+  PRIMARY KEY (year, month, province_id, exam_center_id, exam_type_id, permit_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS exam_rollup_type (
+  year INTEGER NOT NULL,
+  month INTEGER NOT NULL,
+  exam_type_id INTEGER NOT NULL,
+  num_passed INTEGER NOT NULL,
+  num_failed INTEGER NOT NULL,
+  row_count INTEGER NOT NULL,
+  PRIMARY KEY (year, month, exam_type_id)
+) WITHOUT ROWID;
 """
 
 
+# Campos de texto codificados como ids de dim_values y su posición en la tupla de inserción.
+DIMENSION_FIELDS = ("province", "exam_center", "school_code", "school_name", "section_code", "exam_type", "permit")
+DIMENSION_POSITIONS = {
+    "province": 0,
+    "exam_center": 1,
+    "school_code": 2,
+    "school_name": 3,
+    "section_code": 4,
+    "exam_type": 7,
+    "permit": 8,
+}
+
+
+INSERT_EXAM_RESULT_SQL = """
+INSERT OR IGNORE INTO exam_results (
+  province_id, exam_center_id, school_code_id, school_name_id, section_code_id,
+  month, year, exam_type_id, permit_id,
+  num_passed, num_passed_1st, num_passed_2nd, num_passed_3rd_or_4th, num_passed_5plus,
+  num_failed
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+# Columnas de una tabla de etiquetas en texto (esquema anterior o tabla de staging).
+LABEL_COLUMNS = (
+    "province TEXT, exam_center TEXT, school_code TEXT, school_name TEXT, section_code TEXT, "
+    "month INTEGER, year INTEGER, exam_type TEXT, permit TEXT, "
+    "num_passed INTEGER, num_passed_1st INTEGER, num_passed_2nd INTEGER, num_passed_3rd_or_4th INTEGER, "
+    "num_passed_5plus INTEGER, num_failed INTEGER"
+)
+
+# Clave única de una fila de examen (la misma que el UNIQUE de exam_results).
+EXAM_KEY_COLUMNS = ("province", "exam_center", "school_code", "section_code", "month", "year", "exam_type", "permit")
+
+# Índices de orden de las columnas que la tabla ordena con menos frecuencia: cada uno
+# encarece la importación fila a fila y agranda el fichero, así que solo se crean al
+# reconstruir los índices tras una carga masiva (bulk_load, --defer-indexes).
+# Sin ellos, esas columnas se ordenan filtrando primero (ver _sort_index).
+BULK_SORT_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS idx_exam_results_sort_month ON exam_results (month);
+CREATE INDEX IF NOT EXISTS idx_exam_results_sort_school_code ON exam_results (school_code_id);
+CREATE INDEX IF NOT EXISTS idx_exam_results_sort_section_code ON exam_results (section_code_id);
+CREATE INDEX IF NOT EXISTS idx_exam_results_sort_exam_type ON exam_results (exam_type_id);
+CREATE INDEX IF NOT EXISTS idx_exam_results_sort_permit ON exam_results (permit_id);
+CREATE INDEX IF NOT EXISTS idx_exam_results_sort_num_passed ON exam_results (num_passed);
+CREATE INDEX IF NOT EXISTS idx_exam_results_sort_num_failed ON exam_results (num_failed);
+"""
+
+# Índices secundarios de exam_results que se pueden aplazar en una carga masiva.
+SECONDARY_INDEXES = (
+    "idx_exam_results_period",
+    "idx_exam_results_filters",
+    "idx_exam_results_school_name",
+    "idx_exam_results_sort_month",
+    "idx_exam_results_sort_province",
+    "idx_exam_results_sort_exam_center",
+    "idx_exam_results_sort_school_code",
+    "idx_exam_results_sort_section_code",
+    "idx_exam_results_sort_exam_type",
+    "idx_exam_results_sort_permit",
+    "idx_exam_results_sort_num_passed",
+    "idx_exam_results_sort_num_failed",
+)
+
+
+# Sentencias que internan en dim_values las etiquetas de una tabla con columnas de texto.
+def _intern_labels_sql(source: str, in_use: int = 0) -> list[str]:
+    return [
+        f"INSERT OR IGNORE INTO dim_values (field, value, in_use) "
+        f"SELECT DISTINCT '{field}', {field}, {int(in_use)} FROM {source}"  # noqa: S608
+        for field in DIMENSION_FIELDS
+    ]
+
+
+# Inserta en exam_results las filas de una tabla con columnas de texto, traduciendo las
+# etiquetas (ya internadas) a ids. `with_id` conserva la columna id del origen. CROSS JOIN
+# fija el origen como bucle exterior (sin estadísticas el planificador recorrería dim_values).
+def _encoded_insert_sql(source: str, with_id: bool = False, where: str = "") -> str:
+    id_column = "id, " if with_id else ""
+    id_value = "s.id, " if with_id else ""
+    joins = "".join(
+        f"CROSS JOIN dim_values d_{field} ON d_{field}.field = '{field}' AND d_{field}.value = s.{field}\n"
+        for field in DIMENSION_FIELDS
+    )
+    return f"""
+INSERT INTO exam_results (
+  {id_column}province_id, exam_center_id, school_code_id, school_name_id, section_code_id,
+  month, year, exam_type_id, permit_id,
+  num_passed, num_passed_1st, num_passed_2nd, num_passed_3rd_or_4th, num_passed_5plus,
+  num_failed
+)
+SELECT
+  {id_value}d_province.id, d_exam_center.id, d_school_code.id, d_school_name.id, d_section_code.id,
+  s.month, s.year, d_exam_type.id, d_permit.id,
+  s.num_passed, s.num_passed_1st, s.num_passed_2nd, s.num_passed_3rd_or_4th, s.num_passed_5plus,
+  s.num_failed
+FROM {source} s
+{joins}{where}
+"""  # noqa: S608
+
+
+# Migra una base de datos del esquema anterior (exam_results con columnas de texto) al
+# esquema codificado, conservando los ids. Agregados y dimensiones se recalculan después.
+LEGACY_MIGRATION_SQL = (
+    """
+ALTER TABLE exam_results RENAME TO exam_results_legacy;
+DROP INDEX IF EXISTS idx_exam_results_period;
+DROP INDEX IF EXISTS idx_exam_results_filters;
+DROP INDEX IF EXISTS idx_exam_results_rows_order;
+DROP INDEX IF EXISTS idx_exam_results_school_name;
+DROP TABLE IF EXISTS exam_rollup;
+DROP TABLE IF EXISTS exam_rollup_type;
+DROP TABLE IF EXISTS dim_periods;
+DROP TABLE IF EXISTS dim_values;
+"""
+    + SCHEMA_SQL
+    + "".join(f"{sql};\n" for sql in _intern_labels_sql("exam_results_legacy", in_use=1))
+    + _encoded_insert_sql("exam_results_legacy", with_id=True)
+    + """;
+DROP TABLE exam_results_legacy;
+"""
+)
+
+
+# Tablas de agregados (de menor a mayor) con las dimensiones por las que se pueden filtrar.
+# Los filtros por autoescuela (código o nombre) solo se pueden responder con exam_results.
+ROLLUPS: list[tuple[str, frozenset[str]]] = [
+    ("exam_rollup_type", frozenset({"year", "month", "exam_type"})),
+    ("exam_rollup", frozenset({"year", "month", "province", "exam_center", "exam_type", "permit"})),
+]
+
+# Recalcula los agregados de un periodo a partir de las filas de exam_results.
+ROLLUP_REFRESH_SQL = [
+    "DELETE FROM exam_rollup WHERE year = :year AND month = :month",
+    """
+    INSERT INTO exam_rollup (
+      year, month, province_id, exam_center_id, exam_type_id, permit_id, num_passed, num_failed, row_count
+    )
+    SELECT year, month, province_id, exam_center_id, exam_type_id, permit_id,
+           SUM(num_passed), SUM(num_failed), COUNT(*)
+    FROM exam_results
+    WHERE year = :year AND month = :month
+    GROUP BY province_id, exam_center_id, exam_type_id, permit_id
+    """,
+    "DELETE FROM exam_rollup_type WHERE year = :year AND month = :month",
+    """
+    INSERT INTO exam_rollup_type (year, month, exam_type_id, num_passed, num_failed, row_count)
+    SELECT year, month, exam_type_id, SUM(num_passed), SUM(num_failed), SUM(row_count)
+    FROM exam_rollup
+    WHERE year = :year AND month = :month
+    GROUP BY exam_type_id
+    """,
+]
+
+# Publica en las dimensiones el periodo y las etiquetas usadas por un periodo importado
+# (las etiquetas de importaciones abortadas quedan con in_use = 0 y no salen en los combos).
+DIMENSION_REFRESH_SQL = [
+    """
+    INSERT OR IGNORE INTO dim_periods (year, month)
+    SELECT DISTINCT year, month FROM exam_rollup WHERE year = :year AND month = :month
+    """,
+    """
+    UPDATE dim_values SET in_use = 1
+    WHERE in_use = 0 AND id IN (
+      SELECT province_id FROM exam_rollup WHERE year = :year AND month = :month
+      UNION SELECT exam_center_id FROM exam_rollup WHERE year = :year AND month = :month
+      UNION SELECT exam_type_id FROM exam_rollup WHERE year = :year AND month = :month
+      UNION SELECT permit_id FROM exam_rollup WHERE year = :year AND month = :month
+      UNION SELECT school_code_id FROM exam_results WHERE year = :year AND month = :month
+      UNION SELECT school_name_id FROM exam_results WHERE year = :year AND month = :month
+      UNION SELECT section_code_id FROM exam_results WHERE year = :year AND month = :month
+    )
+    """,
+]
+
+
 ALLOWED_DISTINCT_FIELDS = {
     "province": "province",
     "exam_center": "exam_center",
@@ -62,11 +310,279 @@ ALLOWED_DISTINCT_FIELDS = {
 }
 
 
+# Columnas de detalle que se muestran en la tabla principal.
+ROW_COLUMNS = [
+    "year",
+    "month",
+    "province",
+    "exam_center",
+    "school_code",
+    "school_name",
+    "section_code",
+    "exam_type",
+    "permit",
+    "num_passed",
+    "num_failed",
+    "num_passed_1st",
+    "num_passed_2nd",
+    "num_passed_3rd_or_4th",
+    "num_passed_5plus",
+]
+
+# Columnas de las páginas de filas (RowPage) que devuelven las consultas de detalle.
+ROW_PAGE_COLUMNS = ("id", *ROW_COLUMNS)
+
+# Columnas de exam_results que lee el motor analítico (ver Database.iter_fact_batches):
+# las etiquetas como ids de dim_values.
+FACT_COLUMNS = (
+    "id",
+    "year",
+    "month",
+    *(f"{field}_id" for field in ("province", "exam_center", "school_code", "school_name", "exam_type", "permit")),
+    "num_passed",
+    "num_failed",
+)
+
+# Columnas de detalle numéricas (el resto son etiquetas de dim_values).
+NUMERIC_ROW_COLUMNS = frozenset(column for column in ROW_COLUMNS if column not in DIMENSION_POSITIONS)
+
+# Expresión SQL de cada columna de detalle en la consulta de filas (etiquetas unidas desde
+# dim_values, solo para las filas que se devuelven).
+ROW_EXPRESSIONS: dict[str, str] = {
+    "id": "r.id",
+    **{column: f"d_{column}.value" if column in DIMENSION_POSITIONS else f"r.{column}" for column in ROW_COLUMNS},
+}
+_ROWS_FROM = "exam_results r " + " ".join(
+    f"JOIN dim_values d_{field} ON d_{field}.id = r.{field}_id" for field in DIMENSION_FIELDS
+)
+
+# Orden de la tabla principal como (columna, descendente); `id` desempata para que la
+# paginación por clave (keyset) sea estable.
+ROWS_ORDER: list[tuple[str, bool]] = [
+    ("year", True),
+    ("month", True),
+    ("province", False),
+    ("exam_center", False),
+    ("school_name", False),
+    ("exam_type", False),
+    ("permit", False),
+    ("id", False),
+]
+
+# Columnas por las que se puede ordenar la tabla y orden completo de cada una: `id` desempata
+# (el año, por mes) para que cada orden lo sirva un índice en el orden de la clave.
+SORT_ORDERS: dict[str, tuple[str, ...]] = {
+    column: ("year", "month", "id") if column == "year" else (column, "id") for column in ROW_COLUMNS
+}
+
+# Recuentos por número de intento: ordenables, pero sin índice propio (se ordenan las filas
+# que cumplen los filtros).
+UNINDEXED_SORT_COLUMNS = ("num_passed_1st", "num_passed_2nd", "num_passed_3rd_or_4th", "num_passed_5plus")
+
+# Índice de exam_results que recorre las filas en el orden de cada columna ordenable (las
+# etiquetas, por id; ver _rows_from_sorted_by). Año y nombre reutilizan los de filtrado.
+SORT_INDEXES: dict[str, str] = {
+    "year": "idx_exam_results_period",
+    "school_name": "idx_exam_results_school_name",
+    **{
+        column: f"idx_exam_results_sort_{column}"
+        for column in ROW_COLUMNS
+        if column not in ("year", "school_name", *UNINDEXED_SORT_COLUMNS)
+    },
+}
+
+
+# Devuelve el orden de la tabla (columna, descendente) para ordenar por `column`; sin
+# columna, el orden por defecto. Solo admite columnas de SORT_ORDERS.
+def rows_order(column: str | None = None, descending: bool = False) -> tuple[tuple[str, bool], ...]:
+    if column is None:
+        return tuple(ROWS_ORDER)
+    if column not in SORT_ORDERS:
+        raise DatabaseError(f"Cannot sort by column: {column}")
+    return tuple((c, descending) for c in SORT_ORDERS[column])
+
+
 # Devuelve la fecha/hora actual en UTC en formato ISO-8601 (con sufijo Z).
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
+# Agrupa un iterable en listas de tamaño fijo (la última puede ser menor).
+def _chunked(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+# Resultado de una importación: filas insertadas/leídas y filas por periodo (año, mes).
+@dataclass(frozen=True, slots=True)
+class ImportStats:
+    inserted: int
+    rows_read: int
+    period_rows: dict[tuple[int, int], int]
+
+    @property
+    def periods(self) -> set[tuple[int, int]]:
+        return set(self.period_rows)
+
+
+# Importación por lotes: cada lote se confirma en su propia transacción y los
+# periodos se reservan al verse por primera vez para mantener la protección de duplicados.
+# Con `staged`, los lotes van a una tabla temporal sin índices y se pasan a exam_results
+# en bloque (internado, deduplicado e INSERT ... SELECT) al terminar.
+class ImportSession:
+    # Prepara la sesión sobre la conexión de la base de datos.
+    def __init__(
+        self,
+        db: "Database",
+        source_file: str | None = None,
+        progress: Callable[[int], None] | None = None,
+        staged: bool = False,
+    ) -> None:
+        self._db = db
+        self._source_file = source_file
+        self._progress = progress
+        self._staged = staged
+        self._staging: str | None = None
+        self._period_rows: Counter[tuple[int, int]] = Counter()
+        self._inserted = 0
+        self._rows_read = 0
+        self._closed = False
+
+    # Inserta un lote de tuplas (orden de ExamRow.as_db_tuple) en una transacción.
+    def add_batch(self, batch: Sequence[tuple[object, ...]]) -> None:
+        if self._closed:
+            raise DatabaseError("Import session already closed.")
+        if not batch:
+            return
+
+        counts = Counter((int(t[DB_YEAR_INDEX]), int(t[DB_MONTH_INDEX])) for t in batch)
+        new_periods = [p for p in counts if p not in self._period_rows]
+        if new_periods:
+            self._db._claim_periods(new_periods)
+
+        conn = self._db._conn
+        if self._staged and self._staging is None:
+            self._staging = self._db._create_staging_table()
+        try:
+            with conn:
+                # Los periodos nuevos quedan registrados como incompletos en la misma transacción
+                # que sus primeras filas (finish los completa): si el proceso muere, el siguiente
+                # arranque sabe qué filas descartar (ver initialize_schema).
+                self._mark_started(new_periods)
+                if self._staged:
+                    conn.executemany(f"INSERT INTO {self._staging} VALUES ({', '.join('?' * 15)})", batch)
+                else:
+                    cur = conn.executemany(INSERT_EXAM_RESULT_SQL, self._db._encode_batch(batch))
+        except BaseException:
+            self._db._release_periods(new_periods)
+            if not self._staged:
+                self._db._forget_dimension_ids()
+            raise
+        for period in new_periods:
+            self._period_rows[period] = 0
+        if not self._staged:
+            self._db._bump_generation()
+            self._inserted += cur.rowcount
+
+        self._period_rows.update(counts)
+        self._rows_read += len(batch)
+        if self._progress is not None:
+            self._progress(self._rows_read)
+
+    # Registra en imported_periods, como incompletos, los periodos que empieza la sesión. Otra
+    # conexión puede haberlos registrado después de _claim_periods: se tratan como importados.
+    def _mark_started(self, periods: Sequence[tuple[int, int]]) -> None:
+        if not periods:
+            return
+        imported_at = _utc_now_iso()
+        try:
+            self._db._conn.executemany(
+                """
+                INSERT INTO imported_periods (year, month, imported_at, source_file, row_count, complete)
+                VALUES (?, ?, ?, ?, 0, 0)
+                """,
+                [(year, month, imported_at, self._source_file) for year, month in periods],
+            )
+        except sqlite3.IntegrityError as exc:
+            period_str = ", ".join(f"{y}-{m:02d}" for (y, m) in sorted(periods))
+            raise DatabaseError(f"Period(s) already imported: {period_str}") from exc
+
+    # Completa los periodos importados en imported_periods y cierra la sesión.
+    def finish(self) -> ImportStats:
+        if self._closed:
+            raise DatabaseError("Import session already closed.")
+        if not self._rows_read:
+            self.abort()
+            raise DatabaseError("No data rows found in the selected file.")
+
+        conn = self._db._conn
+        imported_at = _utc_now_iso()
+        try:
+            with conn:
+                if self._staging is not None:
+                    self._inserted = self._db._load_staging_table(self._staging)
+                self._db._refresh_rollups(self._period_rows)
+                cur = conn.executemany(
+                    """
+                    UPDATE imported_periods SET imported_at = ?, row_count = ?, complete = 1
+                    WHERE year = ? AND month = ? AND NOT complete
+                    """,
+                    [
+                        (imported_at, int(count), year, month)
+                        for (year, month), count in sorted(self._period_rows.items())
+                    ],
+                )
+                if cur.rowcount != len(self._period_rows):
+                    # Otra conexión la dio por interrumpida al abrir la base de datos.
+                    raise DatabaseError("Import was discarded as interrupted by another connection.")
+        except DatabaseError:
+            self.abort()
+            raise
+        self._db._bump_generation()
+        self._close()
+        return ImportStats(
+            inserted=int(self._inserted),
+            rows_read=self._rows_read,
+            period_rows=dict(self._period_rows),
+        )
+
+    # Deshace la importación: borra las filas de los periodos reservados por la sesión y su
+    # registro como incompletos.
+    def abort(self) -> None:
+        if self._closed:
+            return
+        conn = self._db._conn
+        if conn.in_transaction:
+            conn.rollback()
+            self._db._forget_dimension_ids()
+        if self._period_rows:
+            periods = list(self._period_rows)
+            with conn:
+                conn.executemany("DELETE FROM imported_periods WHERE year = ? AND month = ? AND NOT complete", periods)
+                # Con staging las filas solo llegan a exam_results al confirmar finish().
+                if not self._staged:
+                    conn.executemany("DELETE FROM exam_results WHERE year = ? AND month = ?", periods)
+                    self._db._refresh_rollups(self._period_rows)
+        self._db._bump_generation()
+        self._close()
+
+    # Libera los periodos reservados por la sesión y su tabla de staging.
+    def _close(self) -> None:
+        self._closed = True
+        self._db._release_periods(self._period_rows)
+        if self._staging is not None:
+            self._db._conn.execute(f"DROP TABLE IF EXISTS {self._staging}")
+            self._staging = None
+
+
+# Normaliza un texto para la búsqueda por nombre: sin tildes ni diacríticos (ñ -> n) y sin
+# distinguir mayúsculas.
+def normalize_search_text(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
 # Construye la cláusula WHERE y parámetros SQL a partir de filtros de la UI.
 def _build_where(filters: dict[str, Any]) -> tuple[str, list[Any]]:
     clauses: list[str] = []
@@ -79,42 +595,650 @@ def _build_where(filters: dict[str, Any]) -> tuple[str, list[Any]]:
         clauses.append("month = ?")
         params.append(int(month))
 
+    # Las etiquetas se traducen a su id con una subconsulta constante (sin id: ninguna fila).
     for key in ("province", "exam_center", "school_code", "exam_type", "permit"):
         value = filters.get(key)
         if value:
-            clauses.append(f"{key} = ?")
+            clauses.append(f"{key}_id = (SELECT id FROM dim_values WHERE field = '{key}' AND value = ?)")
             params.append(str(value))
 
+    # El índice de trigramas resuelve LIKE con 3 o más caracteres; con menos, FTS5 recorre
+    # la tabla de nombres (una fila por autoescuela, no por resultado).
     if contains := filters.get("school_name_contains"):
-        clauses.append("school_name LIKE ?")
-        params.append(f"%{contains}%")
+        clauses.append("school_name_id IN (SELECT rowid FROM school_name_search WHERE name LIKE ?)")
+        params.append(f"%{normalize_search_text(str(contains))}%")
 
     where = " AND ".join(clauses)
     return where, params
 
 
+# Normaliza un dict de filtros (como lo interpreta _build_where) para usarlo como clave.
+def _normalize_filters(filters: dict[str, Any]) -> tuple[tuple[str, Any], ...]:
+    items: list[tuple[str, Any]] = []
+    for key, value in filters.items():
+        if not value:
+            continue
+        items.append((key, int(value) if key in ("year", "month") else str(value)))
+    return tuple(sorted(items))
+
+
+# Decorador: memoriza el resultado de una consulta (por tipo, filtros y argumentos) en la
+# caché LRU de la instancia. Los resultados cacheados se comparten: no deben modificarse.
+def _cached_query(kind: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorator(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def wrapper(self: "Database", filters: dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+            cache = self._cache
+            if not cache.enabled:
+                return method(self, filters, *args, **kwargs)
+            cache.set_generation(self._data_generation())
+            key = (
+                kind,
+                _normalize_filters(filters),
+                tuple(tuple(a) if isinstance(a, list) else a for a in args),
+                tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in kwargs.items())),
+            )
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = method(self, filters, *args, **kwargs)
+            cache.put(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+# Sentencias que se anotan como máximo por llamada instrumentada.
+MAX_TRACED_STATEMENTS = 256
+
+
+# Decorador: con un profiler activo (ver Database.set_profiler) mide la llamada: duración,
+# filas devueltas y, con `trace_statements`, cada sentencia SQL que lanza. Las llamadas
+# anidadas cuentan dentro de la exterior.
+def _profiled(trace_statements: bool = True) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorator(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def wrapper(self: "Database", *args: Any, **kwargs: Any) -> Any:
+            if self.profiler is None or self._profiling:
+                return method(self, *args, **kwargs)
+            return self._profile_call(method.__name__, trace_statements, lambda: method(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+# Filas que devuelve una llamada instrumentada (las insertadas, en las importaciones).
+def _result_rows(result: Any) -> int:
+    if isinstance(result, ViewResult):
+        return len(result.rows)
+    if isinstance(result, ImportStats):
+        return result.inserted
+    if isinstance(result, (list, RowPage)):
+        return len(result)
+    return 0 if result is None else 1
+
+
+# Elige la tabla más pequeña capaz de responder agregados con estos filtros y la
+# expresión que cuenta filas de detalle en ella.
+def _aggregate_source(filters: dict[str, Any]) -> tuple[str, str]:
+    keys = {key for key, value in filters.items() if value}
+    for table, dimensions in ROLLUPS:
+        if keys <= dimensions:
+            return table, "SUM(row_count)"
+    return "exam_results", "COUNT(*)"
+
+
+# Construye la condición "fila posterior a `key`" para un orden con direcciones mixtas:
+# a <= ? AND ((a < ?) OR (a = ? AND b > ?) OR ...). `expressions` da la expresión SQL de
+# cada columna (por defecto ROW_EXPRESSIONS) y `bounds` cuántas columnas llevan cota propia.
+def _keyset_condition(
+    order: Sequence[tuple[str, bool]],
+    key: Sequence[Any],
+    expressions: dict[str, str] = ROW_EXPRESSIONS,
+    bounds: int = 1,
+) -> tuple[str, list[Any]]:
+    if len(key) != len(order):
+        raise DatabaseError("Invalid pagination key.")
+    branches: list[str] = []
+    params: list[Any] = []
+    for i, (column, descending) in enumerate(order):
+        parts = [f"{expressions[prev]} = ?" for prev, _ in order[:i]]
+        parts.append(f"{expressions[column]} {'<' if descending else '>'} ?")
+        branches.append("(" + " AND ".join(parts) + ")")
+        params.extend(key[: i + 1])
+    # Cota redundante sobre la primera columna: permite al planificador saltar por índice.
+    first, first_desc = order[0]
+    conditions = [f"{expressions[first]} {'<=' if first_desc else '>='} ?"]
+    bound_params = [key[0]]
+    # Y sobre las siguientes (con las anteriores iguales a la clave): los bucles que solo
+    # leen esas columnas descartan los grupos anteriores sin leer sus filas.
+    for i, (column, descending) in enumerate(order[1:bounds], start=1):
+        parts = [f"{expressions[prev]} = ?" for prev, _ in order[:i]]
+        parts.append(f"{expressions[column]} {'>' if descending else '<'} ?")
+        conditions.append("NOT (" + " AND ".join(parts) + ")")
+        bound_params.extend(key[: i + 1])
+    return " AND ".join(conditions) + " AND (" + " OR ".join(branches) + ")", [*bound_params, *params]
+
+
+# Devuelve la clave de paginación (valores de las columnas de `order`) de la fila `row` de
+# una página de detalle.
+def row_sort_key(page: RowPage, row: int, order: Sequence[tuple[str, bool]] = ROWS_ORDER) -> tuple[Any, ...]:
+    return page.key(row, (column for column, _ in order))
+
+
+# FROM de la consulta de detalle ordenada por la etiqueta de `field`: su dim_values va
+# primero (CROSS JOIN fija el orden de los bucles) y se recorre por (field, value), de modo
+# que `index` (el de exam_results por ese id) entrega las filas ya en el orden pedido.
+def _rows_from_sorted_by(field: str, index: str) -> str:
+    joins = " ".join(
+        f"JOIN dim_values d_{other} ON d_{other}.id = r.{other}_id" for other in DIMENSION_FIELDS if other != field
+    )
+    return f"dim_values d_{field} CROSS JOIN exam_results r INDEXED BY {index} ON r.{field}_id = d_{field}.id {joins}"
+
+
+# Índice que sirve el orden por defecto: sus primeras columnas son las del orden (año, mes,
+# provincia, centro) y las etiquetas de provincia y centro se recorren en dim_values.
+DEFAULT_ORDER_INDEX = "idx_exam_results_filters"
+
+# Columnas del orden por defecto que recorren los bucles de _rows_from_default_order, y
+# expresiones con las que se ordena (el periodo, el del bucle de periodos).
+_DEFAULT_ORDER_LOOPS = ("year", "month", "province", "exam_center")
+_DEFAULT_ORDER_EXPRESSIONS = {**ROW_EXPRESSIONS, "year": "p.period_year", "month": "p.period_month"}
+
+
+# FROM de la consulta de detalle en el orden por defecto: bucles sobre los periodos (de
+# imported_periods, que registra también los que se están importando), las provincias y los
+# centros, estos dos por etiqueta, y `index` entrega las filas de cada combinación; solo se
+# ordenan entre sí las de un mismo centro y periodo. Las columnas del periodo se renombran
+# para que los filtros (`year = ?`) sigan refiriéndose a exam_results.
+def _rows_from_default_order(index: str) -> str:
+    joins = " ".join(
+        f"JOIN dim_values d_{other} ON d_{other}.id = r.{other}_id"
+        for other in DIMENSION_FIELDS
+        if other not in ("province", "exam_center")
+    )
+    return (
+        "(SELECT year AS period_year, month AS period_month FROM imported_periods) p "
+        "CROSS JOIN dim_values d_province CROSS JOIN dim_values d_exam_center "
+        f"CROSS JOIN exam_results r INDEXED BY {index} "
+        "ON r.year = p.period_year AND r.month = p.period_month "
+        f"AND r.province_id = d_province.id AND r.exam_center_id = d_exam_center.id {joins}"
+    )
+
+
+# Construye la consulta de detalle a partir de un WHERE ya construido, con orden (por
+# defecto ROWS_ORDER), clave de paginación y límite opcionales. Con `sort_index` (el de
+# SORT_INDEXES para la primera columna de `order`, o DEFAULT_ORDER_INDEX con el orden por
+# defecto) las filas se leen recorriendo ese índice; sin él, el planificador elige índice
+# por los filtros y ordena las que cumplen (si el orden no usa etiquetas, la página se
+# elige antes de unir las de sus filas). `columns` son las columnas del resultado.
+def _rows_query(
+    where: str,
+    params: list[Any],
+    after: Sequence[Any] | None = None,
+    limit: int | None = None,
+    order: Sequence[tuple[str, bool]] = ROWS_ORDER,
+    sort_index: str | None = None,
+    columns: Sequence[str] = ROW_PAGE_COLUMNS,
+) -> tuple[str, list[Any]]:
+    params = list(params)
+    default_order = sort_index is not None and tuple(order) == tuple(ROWS_ORDER)
+    expressions = _DEFAULT_ORDER_EXPRESSIONS if default_order else ROW_EXPRESSIONS
+    if after is not None:
+        bounds = len(_DEFAULT_ORDER_LOOPS) if default_order else 1
+        keyset, keyset_params = _keyset_condition(order, after, expressions, bounds)
+        where = f"{where} AND {keyset}" if where else keyset
+        params += keyset_params
+
+    rows_from = _ROWS_FROM
+    first = order[0][0]
+    if sort_index is not None and default_order:
+        rows_from = _rows_from_default_order(sort_index)
+        loops = "d_province.field = 'province' AND d_exam_center.field = 'exam_center'"
+        where = f"{loops} AND {where}" if where else loops
+    elif sort_index is not None and first in DIMENSION_POSITIONS:
+        rows_from = _rows_from_sorted_by(first, sort_index)
+        dimension = f"d_{first}.field = '{first}'"
+        where = f"{dimension} AND {where}" if where else dimension
+    elif sort_index is not None:
+        rows_from = rows_from.replace("exam_results r ", f"exam_results r INDEXED BY {sort_index} ", 1)
+
+    selected = ", ".join(f"{ROW_EXPRESSIONS[c]} AS {c}" for c in columns)
+    order_by = " ORDER BY " + ", ".join(f"{expressions[c]} {'DESC' if d else 'ASC'}" for c, d in order)
+    if sort_index is None and limit is not None:
+        # Ordenar con las etiquetas ya unidas arrastra sus siete búsquedas por cada fila que
+        # cumple; así se ordenan solo los ids (uniendo solo las etiquetas del orden) y se
+        # leen, con todas sus etiquetas, los de la página.
+        labels = "".join(
+            f" JOIN dim_values d_{c} ON d_{c}.id = r.{c}_id" for c, _ in order if c in DIMENSION_POSITIONS
+        )
+        page = f"SELECT r.id FROM exam_results r{labels}" + (f" WHERE {where}" if where else "") + f"{order_by} LIMIT ?"
+        rows_from = rows_from.replace("exam_results r ", f"({page}) p CROSS JOIN exam_results r ON r.id = p.id ", 1)
+        where = ""
+        params.append(int(limit))
+    sql = f"SELECT {selected} FROM {rows_from}"  # noqa: S608
+    if where:
+        sql += f" WHERE {where}"
+    sql += order_by
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return sql, params
+
+
+# Construye el GROUP BY por tipo de examen: se agrupa por id y solo se une la etiqueta
+# de cada grupo. `extra` añade columnas agregadas al resultado.
+def _by_exam_type_query(table: str, where: str, extra: str = "") -> str:
+    sql = f"SELECT exam_type_id, SUM(num_passed) AS passed, SUM(num_failed) AS failed{extra} FROM {table}"  # noqa: S608
+    if where:
+        sql += f" WHERE {where}"
+    sql += " GROUP BY exam_type_id"
+    return f"""
+    SELECT d.value AS exam_type, g.*
+    FROM ({sql}) g
+    JOIN dim_values d ON d.id = g.exam_type_id
+    ORDER BY exam_type ASC
+    """  # noqa: S608
+
+
+# Consultas SQL (sentencia, parámetros) de fetch_view con límite: primera página de filas
+# (en el orden `order`) y totales por tipo de examen con recuento de filas.
+def view_queries(
+    filters: dict[str, Any],
+    limit: int,
+    order: Sequence[tuple[str, bool]] = ROWS_ORDER,
+    sort_index: str | None = None,
+) -> list[tuple[str, list[Any]]]:
+    where, params = _build_where(filters)
+    table, count_expr = _aggregate_source(filters)
+    return [
+        _rows_query(where, params, limit=limit, order=order, sort_index=sort_index),
+        (_by_exam_type_query(table, where, f", {count_expr} AS row_count"), list(params)),
+    ]
+
+
+# Resultado combinado de la vista principal: filas de detalle (o su primera página),
+# número total de filas, totales y totales por tipo de examen.
+@dataclass(frozen=True, slots=True)
+class ViewResult:
+    rows: RowPage
+    row_count: int
+    totals: dict[str, int]
+    by_exam_type: list[dict[str, Any]]
+
+
 # Encapsula el acceso a SQLite y operaciones de importación/consulta.
 class Database:
-    # Abre la conexión, prepara el directorio y asegura el esquema.
-    def __init__(self, db_path: Path) -> None:
+    # Abre la conexión y asegura el esquema. Las conexiones salen de `pool` (por defecto
+    # uno propio, configurado con `settings`): la instancia de escritura usa el escritor y
+    # las de solo lectura (consultas en segundo plano) toman prestado un lector, que puede
+    # cerrarse o interrumpirse desde otro hilo. `cache_entries`/`cache_bytes` acotan la
+    # caché de resultados (0 la desactiva). Con `profiler` se instrumentan las consultas y
+    # con `analytics` (ver services.analytics_engine) los totales que no cubren las tablas
+    # de agregados salen del motor en memoria.
+    def __init__(
+        self,
+        db_path: Path,
+        read_only: bool = False,
+        cache_entries: int = 256,
+        cache_bytes: int = 64 * 1024 * 1024,
+        settings: ConnectionSettings | None = None,
+        pool: ConnectionPool | None = None,
+        profiler: QueryProfiler | None = None,
+        analytics: AnalyticsEngine | None = None,
+    ) -> None:
         self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.read_only = read_only
+        self._owns_pool = pool is None
+        self.pool = pool or ConnectionPool(self.db_path, settings)
+        self._pending_periods: set[tuple[int, int]] = set()
+        self._cache = QueryCache(max_entries=cache_entries, max_bytes=cache_bytes)
+        self._generation = 0
+        self._dimension_ids: dict[str, dict[str, int]] | None = None
+        self._staging_ids = count(1)
+        self._deferred_periods: set[tuple[int, int]] | None = None
+        self.profiler = profiler
+        self._profiling = False
+        self.analytics = analytics
+        self._analytics_generation: tuple[int, int] | None = None
+
+        if read_only:
+            self._conn = self.pool.acquire_reader()
+            return
 
-        self._conn = sqlite3.connect(self.db_path)
-        self._conn.row_factory = sqlite3.Row
-        self._conn.execute("PRAGMA foreign_keys = ON;")
+        self._conn = self.pool.writer()
         self.initialize_schema()
 
-    # Cierra la conexión con la base de datos.
+    # Abre una instancia de solo lectura que comparte el pool de conexiones (y el profiler y
+    # el motor analítico) de esta.
+    def reader(self, cache_entries: int = 256, cache_bytes: int = 64 * 1024 * 1024) -> "Database":
+        return Database(
+            self.db_path,
+            read_only=True,
+            cache_entries=cache_entries,
+            cache_bytes=cache_bytes,
+            pool=self.pool,
+            profiler=self.profiler,
+            analytics=self.analytics,
+        )
+
+    # Cierra la conexión: un lector vuelve al pool; la instancia dueña del pool lo cierra.
     def close(self) -> None:
-        self._conn.close()
+        if self.read_only:
+            self.pool.release_reader(self._conn)
+        if self._owns_pool:
+            self.pool.close()
+
+    # Devuelve los ajustes de conexión y los PRAGMAs efectivos de esta conexión (para benchmarks).
+    def pragma_report(self) -> dict[str, Any]:
+        return self.pool.pragma_report(self._conn)
+
+    # Aborta la consulta en curso (seguro desde otro hilo); la consulta lanza OperationalError.
+    def interrupt(self) -> None:
+        self._conn.interrupt()
 
-    # Crea tablas/índices si no existen.
+    # Devuelve contadores de la caché de resultados (aciertos, fallos, expulsiones, memoria).
+    def cache_stats(self) -> dict[str, int]:
+        return self._cache.stats()
+
+    # Vacía la caché de resultados.
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    # Activa la instrumentación con `profiler` (None la desactiva).
+    def set_profiler(self, profiler: QueryProfiler | None) -> None:
+        self.profiler = profiler
+
+    # Responde a los totales con el motor analítico `analytics` (None vuelve a SQLite).
+    def set_analytics(self, analytics: AnalyticsEngine | None) -> None:
+        self.analytics = analytics
+        self._analytics_generation = None
+
+    # Devuelve el motor analítico para unos filtros, al día con los datos (lo sincroniza si
+    # cambiaron desde la última consulta, p. ej. tras una importación). None si no hay motor
+    # o si los filtros los responde una tabla de agregados (más rápida que recorrer columnas).
+    def _synced_analytics(self, filters: dict[str, Any]) -> AnalyticsEngine | None:
+        analytics = self.analytics
+        if analytics is None or _aggregate_source(filters)[0] != "exam_results":
+            return None
+        generation = self._data_generation()
+        if generation != self._analytics_generation:
+            analytics.sync(self)
+            self._analytics_generation = generation
+        return analytics
+
+    # Ejecuta una llamada instrumentada: anota el inicio de cada sentencia con el trace
+    # callback de sqlite3 y registra la llamada en el profiler. El tiempo de una sentencia
+    # llega hasta la siguiente (o el final de la llamada), así que incluye leer sus filas;
+    # de las sentencias SELECT lentas se guarda además su EXPLAIN QUERY PLAN.
+    def _profile_call(self, name: str, trace_statements: bool, call: Callable[[], Any]) -> Any:
+        profiler = self.profiler
+        assert profiler is not None
+        starts: list[tuple[float, str]] = []
+
+        # Las sentencias internas de triggers y tablas virtuales (FTS5) llegan con el prefijo
+        # "--": su tiempo se atribuye a la sentencia que las lanza.
+        def trace(sql: str) -> None:
+            if len(starts) < MAX_TRACED_STATEMENTS and not sql.startswith("--"):
+                starts.append((time.perf_counter(), sql))
+
+        if trace_statements:
+            self._conn.set_trace_callback(trace)
+        self._profiling = True
+        started_at = time.time()
+        start = time.perf_counter()
+        result: Any = None
+        error: str | None = None
+        try:
+            result = call()
+            return result
+        except BaseException as exc:
+            error = repr(exc)
+            raise
+        finally:
+            end = time.perf_counter()
+            self._profiling = False
+            if trace_statements:
+                self._conn.set_trace_callback(None)
+            ends = [t for t, _ in starts[1:]] + [end]
+            durations = [stop - begin for (begin, _), stop in zip(starts, ends)]
+            statements = tuple(sql for _, sql in starts)
+            profiler.record_call(
+                CallRecord(
+                    method=name,
+                    started_at=started_at,
+                    seconds=end - start,
+                    rows=_result_rows(result),
+                    statements=statements,
+                    error=error,
+                ),
+                durations,
+            )
+            for sql, seconds in zip(statements, durations):
+                if profiler.is_slow(seconds):
+                    profiler.record_slow(StatementRecord(name, sql, seconds, self._slow_plan(sql)))
+
+    # Plan de una sentencia lenta (solo consultas SELECT/WITH y si el profiler lo pide).
+    def _slow_plan(self, sql: str) -> tuple[str, ...]:
+        profiler = self.profiler
+        if profiler is None or not profiler.explain_slow:
+            return ()
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return ()
+        try:
+            return tuple(self.explain(sql))
+        except sqlite3.Error:
+            return ()
+
+    # Marca que los datos cambiaron desde esta conexión (invalida la caché).
+    def _bump_generation(self) -> None:
+        self._generation += 1
+
+    # Generación de datos: cambios propios + `data_version`, que SQLite incrementa cuando
+    # otra conexión confirma cambios (p. ej. una importación mientras se consulta).
+    def _data_generation(self) -> tuple[int, int]:
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        return self._generation, int(data_version)
+
+    # Crea tablas/índices si no existen, migra el esquema de texto anterior y rellena los
+    # agregados de bases de datos antiguas.
     def initialize_schema(self) -> None:
+        columns = {r[1] for r in self._conn.execute("PRAGMA table_info(exam_results)")}
+        if "province" in columns:
+            self._migrate_legacy_schema()
         self._conn.executescript(SCHEMA_SQL)
+        if "complete" not in {r[1] for r in self._conn.execute("PRAGMA table_info(imported_periods)")}:
+            self._conn.execute("ALTER TABLE imported_periods ADD COLUMN complete INTEGER NOT NULL DEFAULT 1")
         self._conn.commit()
+        self._sync_name_search()
+        self._discard_interrupted_imports()
+
+        has_rollups = self._conn.execute("SELECT 1 FROM exam_rollup LIMIT 1").fetchone() is not None
+        has_dimensions = self._conn.execute("SELECT 1 FROM dim_periods LIMIT 1").fetchone() is not None
+        if not has_rollups or not has_dimensions:
+            periods = self._conn.execute("SELECT DISTINCT year, month FROM exam_results").fetchall()
+        else:
+            # Periodos importados cuyos agregados no llegaron a calcularse (p. ej. el proceso
+            # murió dentro de bulk_load, que los aplaza hasta el final).
+            periods = self._conn.execute(
+                "SELECT year, month FROM imported_periods WHERE complete EXCEPT SELECT year, month FROM dim_periods"
+            ).fetchall()
+        if periods:
+            with self._conn:
+                self._refresh_rollups((int(y), int(m)) for y, m in periods)
+
+    # Descarta las importaciones que no llegaron a finish() (el proceso murió a medias): borra
+    # las filas de sus periodos y su registro, para que puedan volver a importarse. Una
+    # importación de otro proceso aún en curso falla al terminar (ver ImportSession.finish).
+    def _discard_interrupted_imports(self) -> None:
+        periods = self._conn.execute("SELECT year, month FROM imported_periods WHERE NOT complete").fetchall()
+        if not periods:
+            return
+        with self._conn:
+            self._conn.executemany("DELETE FROM exam_results WHERE year = ? AND month = ?", periods)
+            self._conn.executemany("DELETE FROM imported_periods WHERE year = ? AND month = ?", periods)
+            self._refresh_rollups((int(y), int(m)) for y, m in periods)
+
+    # Convierte exam_results del esquema con columnas de texto al esquema codificado en una
+    # única transacción y compacta el fichero.
+    def _migrate_legacy_schema(self) -> None:
+        try:
+            self._conn.executescript(f"BEGIN;\n{LEGACY_MIGRATION_SQL}\nCOMMIT;")
+        except sqlite3.Error as exc:
+            if self._conn.in_transaction:
+                self._conn.rollback()
+            raise DatabaseError(f"Could not migrate database schema: {exc}") from exc
+        self._conn.execute("VACUUM")
+
+    # Devuelve los diccionarios etiqueta -> id de cada campo codificado (cargados al primer uso).
+    def _load_dimension_ids(self) -> dict[str, dict[str, int]]:
+        if self._dimension_ids is None:
+            ids: dict[str, dict[str, int]] = {field: {} for field in DIMENSION_FIELDS}
+            for field, value, dim_id in self._conn.execute("SELECT field, value, id FROM dim_values"):
+                ids.setdefault(field, {})[value] = dim_id
+            self._dimension_ids = ids
+        return self._dimension_ids
+
+    # Descarta los ids en memoria (tras un rollback pueden no existir en dim_values).
+    def _forget_dimension_ids(self) -> None:
+        self._dimension_ids = None
+
+    # Sustituye las etiquetas de un lote por sus ids de dim_values, internando las nuevas
+    # dentro de la transacción actual.
+    def _encode_batch(self, batch: Sequence[Sequence[object]]) -> list[list[object]]:
+        ids = self._load_dimension_ids()
+        lookups = [(position, field, ids[field]) for field, position in DIMENSION_POSITIONS.items()]
+        encoded: list[list[object]] = []
+        for values in batch:
+            row = list(values)
+            for position, field, mapping in lookups:
+                label = str(row[position])
+                dim_id = mapping.get(label)
+                if dim_id is None:
+                    dim_id = self._intern(field, label)
+                    mapping[label] = dim_id
+                row[position] = dim_id
+            encoded.append(row)
+        return encoded
+
+    # Inserta una etiqueta nueva en dim_values (y los nombres de autoescuela en el índice de
+    # búsqueda) dentro de la transacción actual; devuelve su id.
+    def _intern(self, field: str, label: str) -> int:
+        dim_id = self._conn.execute("INSERT INTO dim_values (field, value) VALUES (?, ?)", (field, label)).lastrowid
+        if field == "school_name":
+            self._conn.execute(
+                "INSERT INTO school_name_search (rowid, name) VALUES (?, ?)",
+                (dim_id, normalize_search_text(label)),
+            )
+        return int(dim_id)
+
+    # Reconstruye el índice de búsqueda de nombres si no cubre todas las autoescuelas
+    # (bases de datos creadas antes de existir el índice o recién migradas).
+    def _sync_name_search(self) -> None:
+        names = self._conn.execute("SELECT COUNT(*) FROM dim_values WHERE field = 'school_name'").fetchone()[0]
+        indexed = self._conn.execute("SELECT COUNT(*) FROM school_name_search").fetchone()[0]
+        if names == indexed:
+            return
+        cur = self._conn.execute("SELECT id, value FROM dim_values WHERE field = 'school_name'")
+        with self._conn:
+            self._conn.execute("DELETE FROM school_name_search")
+            self._conn.executemany(
+                "INSERT INTO school_name_search (rowid, name) VALUES (?, ?)",
+                [(dim_id, normalize_search_text(value)) for dim_id, value in cur.fetchall()],
+            )
 
-    # Comprueba si un periodo (año/mes) ya fue importado.
+    # Crea una tabla temporal de staging (sin índices) para una sesión de importación.
+    def _create_staging_table(self) -> str:
+        table = f"temp.exam_results_staging_{next(self._staging_ids)}"
+        self._conn.execute(f"CREATE TABLE {table} ({LABEL_COLUMNS})")
+        return table
+
+    # Pasa una tabla de staging a exam_results dentro de la transacción actual: interna
+    # las etiquetas nuevas en bloque y copia la primera fila de cada clave en un único
+    # INSERT ... SELECT. Devuelve las filas insertadas.
+    def _load_staging_table(self, table: str) -> int:
+        conn = self._conn
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM dim_values").fetchone()[0]
+        for sql in _intern_labels_sql(table):
+            conn.execute(sql)
+        new_names = conn.execute(
+            "SELECT id, value FROM dim_values WHERE field = 'school_name' AND id > ?", (last_id,)
+        ).fetchall()
+        conn.executemany(
+            "INSERT INTO school_name_search (rowid, name) VALUES (?, ?)",
+            [(dim_id, normalize_search_text(value)) for dim_id, value in new_names],
+        )
+        self._forget_dimension_ids()
+
+        # Insertar en el orden de la clave única mantiene su índice casi secuencial.
+        first_rows = f"SELECT MIN(rowid) FROM {table} GROUP BY {', '.join(EXAM_KEY_COLUMNS)}"  # noqa: S608
+        key_order = ", ".join(f"d_{c}.id" if c in DIMENSION_POSITIONS else f"s.{c}" for c in EXAM_KEY_COLUMNS)
+        cur = conn.execute(_encoded_insert_sql(table, where=f"WHERE s.rowid IN ({first_rows}) ORDER BY {key_order}"))
+        self._bump_generation()
+        return cur.rowcount
+
+    @contextmanager
+    # Carga masiva: elimina los índices secundarios de exam_results y aplaza el recálculo
+    # de agregados; al salir reconstruye los índices (también los de BULK_SORT_INDEXES_SQL)
+    # y recalcula los periodos importados.
+    def bulk_load(self) -> Iterator[None]:
+        if self._deferred_periods is not None:
+            raise DatabaseError("Bulk load already in progress.")
+        self._deferred_periods = set()
+        with self._conn:
+            for index in SECONDARY_INDEXES:
+                self._conn.execute(f"DROP INDEX IF EXISTS {index}")
+        try:
+            yield
+        finally:
+            periods, self._deferred_periods = self._deferred_periods, None
+            self._conn.executescript(SCHEMA_SQL + BULK_SORT_INDEXES_SQL)
+            with self._conn:
+                self._refresh_rollups(sorted(periods))
+            self._bump_generation()
+
+    # Recalcula las tablas de agregados de los periodos dados y añade sus valores a las
+    # tablas de dimensión (dentro de la transacción actual). Durante bulk_load solo los anota.
+    def _refresh_rollups(self, periods: Iterable[tuple[int, int]]) -> None:
+        if self._deferred_periods is not None:
+            self._deferred_periods.update(periods)
+            return
+        for year, month in periods:
+            params = {"year": int(year), "month": int(month)}
+            for sql in ROLLUP_REFRESH_SQL:
+                self._conn.execute(sql, params)
+            for sql in DIMENSION_REFRESH_SQL:
+                self._conn.execute(sql, params)
+
+    # Devuelve el plan de ejecución (EXPLAIN QUERY PLAN) de una sentencia, una línea por paso.
+    def explain(self, sql: str, params: Sequence[Any] = ()) -> list[str]:
+        return [str(r[3]) for r in self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", list(params))]
+
+    # Ejecuta sentencias de esquema (p. ej. CREATE/DROP INDEX) en una única transacción.
+    def apply_ddl(self, statements: Iterable[str]) -> None:
+        with self._conn:
+            for sql in statements:
+                self._conn.execute(sql)
+        self._cache.clear()
+
+    # Actualiza las estadísticas del planificador (sqlite_stat1).
+    def analyze(self) -> None:
+        self._conn.execute("ANALYZE")
+        self._conn.commit()
+        self._cache.clear()
+
+    # Devuelve los nombres de los índices que empiezan por `prefix`.
+    def index_names(self, prefix: str = "") -> list[str]:
+        cur = self._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE ? ORDER BY name",
+            (f"{prefix}%",),
+        )
+        return [str(r[0]) for r in cur.fetchall()]
+
+    # Comprueba si un periodo (año/mes) ya fue importado o se está importando.
     def is_period_imported(self, year: int, month: int) -> bool:
         cur = self._conn.execute(
             "SELECT 1 FROM imported_periods WHERE year = ? AND month = ? LIMIT 1",
@@ -122,91 +1246,248 @@ class Database:
         )
         return cur.fetchone() is not None
 
-    # Devuelve los años disponibles en el dataset.
+    @_profiled()
+    # Devuelve los años disponibles en el dataset (desde la tabla de periodos).
     def distinct_years(self) -> list[int]:
-        cur = self._conn.execute("SELECT DISTINCT year FROM exam_results ORDER BY year DESC")
+        cur = self._conn.execute("SELECT DISTINCT year FROM dim_periods ORDER BY year DESC")
         return [int(r[0]) for r in cur.fetchall()]
 
+    @_profiled()
     # Devuelve los meses disponibles (filtrando por año opcionalmente).
     def distinct_months(self, year: int | None = None) -> list[int]:
         if year is None:
-            cur = self._conn.execute("SELECT DISTINCT month FROM exam_results ORDER BY month ASC")
+            cur = self._conn.execute("SELECT DISTINCT month FROM dim_periods ORDER BY month ASC")
         else:
             cur = self._conn.execute(
-                "SELECT DISTINCT month FROM exam_results WHERE year = ? ORDER BY month ASC",
+                "SELECT month FROM dim_periods WHERE year = ? ORDER BY month ASC",
                 (int(year),),
             )
         return [int(r[0]) for r in cur.fetchall()]
 
-    # Devuelve valores distintos para un campo permitido (para combos de filtros).
+    @_profiled()
+    # Devuelve valores distintos para un campo permitido (para combos de filtros), leídos
+    # del diccionario de etiquetas en uso por periodos importados.
     def distinct_values(self, field: str) -> list[str]:
         if field not in ALLOWED_DISTINCT_FIELDS:
             raise DatabaseError(f"Unsupported distinct field: {field}")
-        column = ALLOWED_DISTINCT_FIELDS[field]
-        cur = self._conn.execute(f"SELECT DISTINCT {column} FROM exam_results ORDER BY {column} ASC")  # noqa: S608
-        return [str(r[0]) for r in cur.fetchall() if r[0] is not None]
-
-    # Importa filas, evita duplicados y registra los periodos importados.
-    def import_exam_rows(self, rows: list[ExamRow], source_file: str | None = None) -> int:
-        if not rows:
-            raise DatabaseError("No data rows found in the selected file.")
+        cur = self._conn.execute(
+            "SELECT value FROM dim_values WHERE field = ? AND in_use = 1 ORDER BY value ASC",
+            (ALLOWED_DISTINCT_FIELDS[field],),
+        )
+        return [str(r[0]) for r in cur.fetchall()]
 
-        periods = {(r.year, r.month) for r in rows}
-        already = [(y, m) for (y, m) in periods if self.is_period_imported(y, m)]
+    # Reserva periodos para una importación en curso; falla si ya están importados.
+    def _claim_periods(self, periods: Iterable[tuple[int, int]]) -> None:
+        periods = list(periods)
+        already = [
+            (y, m) for (y, m) in periods if (y, m) in self._pending_periods or self.is_period_imported(y, m)
+        ]
         if already:
             period_str = ", ".join(f"{y}-{m:02d}" for (y, m) in sorted(already))
             raise DatabaseError(f"Period(s) already imported: {period_str}")
+        self._pending_periods.update(periods)
 
-        before = self._conn.total_changes
-        with self._conn:
-            self._conn.executemany(
-                """
-                INSERT OR IGNORE INTO exam_results (
-                  province, exam_center, school_code, school_name, section_code,
-                  month, year, exam_type, permit,
-                  num_passed, num_passed_1st, num_passed_2nd, num_passed_3rd_or_4th, num_passed_5plus,
-                  num_failed
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                [r.as_db_tuple() for r in rows],
-            )
+    # Libera periodos reservados por una importación finalizada o abortada.
+    def _release_periods(self, periods: Iterable[tuple[int, int]]) -> None:
+        self._pending_periods.difference_update(periods)
 
-            inserted = self._conn.total_changes - before
-            imported_at = _utc_now_iso()
-            for year, month in periods:
-                period_rows = sum(1 for r in rows if r.year == year and r.month == month)
-                self._conn.execute(
-                    """
-                    INSERT INTO imported_periods (year, month, imported_at, source_file, row_count)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (int(year), int(month), imported_at, source_file, int(period_rows)),
-                )
+    # Abre una sesión de importación por lotes (ver ImportSession).
+    def begin_import(
+        self,
+        source_file: str | None = None,
+        progress: Callable[[int], None] | None = None,
+        staged: bool = False,
+    ) -> ImportSession:
+        return ImportSession(self, source_file=source_file, progress=progress, staged=staged)
 
-        return int(inserted)
+    @_profiled(trace_statements=False)
+    # Importa lotes de tuplas en transacciones por lote (o vía staging con `staged`);
+    # deshace todo si algo falla.
+    def import_exam_batches(
+        self,
+        batches: Iterable[Sequence[tuple[object, ...]]],
+        source_file: str | None = None,
+        progress: Callable[[int], None] | None = None,
+        staged: bool = False,
+    ) -> ImportStats:
+        session = self.begin_import(source_file=source_file, progress=progress, staged=staged)
+        try:
+            for batch in batches:
+                session.add_batch(batch)
+            return session.finish()
+        except BaseException:
+            session.abort()
+            raise
+
+    # Importa filas, evita duplicados y registra los periodos importados.
+    def import_exam_rows(self, rows: Iterable[ExamRow], source_file: str | None = None) -> int:
+        batches = _chunked((r.as_db_tuple() for r in rows), DEFAULT_BATCH_SIZE)
+        return self.import_exam_batches(batches, source_file=source_file).inserted
 
+    @_profiled()
+    @_cached_query("rows")
     # Devuelve las filas detalladas para pintar la tabla principal.
     def fetch_rows(self, filters: dict[str, Any]) -> list[dict[str, Any]]:
+        return list(self.iter_rows(filters))
+
+    # Recorre las filas detalladas (en el orden `order`) con un cursor, sin materializar el
+    # resultado completo. Cada fila trae las columnas de ROW_COLUMNS (sin el id interno).
+    def iter_rows(
+        self,
+        filters: dict[str, Any],
+        order: Sequence[tuple[str, bool]] = ROWS_ORDER,
+    ) -> Iterator[dict[str, Any]]:
+        sort_index = self._sort_index(filters, order, rows=None)
+        sql, params = _rows_query(*_build_where(filters), order=order, sort_index=sort_index, columns=ROW_COLUMNS)
+        for r in self._conn.execute(sql, params):
+            yield dict(r)
+
+    @_profiled()
+    @_cached_query("rows_page")
+    # Devuelve una página de filas detalladas posteriores a `after` (paginación por clave,
+    # con la clave de row_sort_key para el mismo `order`), guardada por columnas.
+    def fetch_rows_page(
+        self,
+        filters: dict[str, Any],
+        after: Sequence[Any] | None = None,
+        limit: int = 256,
+        order: Sequence[tuple[str, bool]] = ROWS_ORDER,
+    ) -> RowPage:
+        sort_index = self._sort_index(filters, order, rows=limit)
+        sql, params = _rows_query(*_build_where(filters), after=after, limit=limit, order=order, sort_index=sort_index)
+        return RowPage(ROW_PAGE_COLUMNS, self._execute_tuples(sql, params).fetchall())
+
+    # Ejecuta una consulta con un cursor que devuelve tuplas (sin sqlite3.Row por fila).
+    def _execute_tuples(self, sql: str, params: Sequence[Any]) -> sqlite3.Cursor:
+        cur = self._conn.cursor()
+        cur.row_factory = None
+        return cur.execute(sql, params)
+
+    # Índice por el que leer las filas en el orden `order` si compensa frente a ordenar las
+    # filas filtradas: recorrerlo lee unas `rows · total / coincidentes` filas para obtener
+    # `rows` (todas las coincidentes si es None) y ordenar lee las coincidentes una vez.
+    # None para columnas sin índice (UNINDEXED_SORT_COLUMNS) o si el índice no existe (p. ej.
+    # durante bulk_load).
+    def _sort_index(self, filters: dict[str, Any], order: Sequence[tuple[str, bool]], rows: int | None) -> str | None:
+        if tuple(order) == tuple(ROWS_ORDER):
+            index: str | None = DEFAULT_ORDER_INDEX
+        else:
+            index = SORT_INDEXES.get(order[0][0])
+        if index is None:
+            return None
+        exists = self._conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index,))
+        if exists.fetchone() is None:
+            return None
+        if _normalize_filters(filters):
+            matches = self.count_rows(filters)
+            wanted = matches if rows is None else rows
+            if matches * matches < wanted * self.count_rows({}):
+                return None
+        return index
+
+    @_profiled()
+    @_cached_query("count")
+    # Cuenta las filas detalladas que cumplen los filtros.
+    def count_rows(self, filters: dict[str, Any]) -> int:
+        if (analytics := self._synced_analytics(filters)) is not None:
+            return analytics.count_rows(filters)
         where, params = _build_where(filters)
-        sql = """
-        SELECT
-          year, month, province, exam_center, school_code, school_name, section_code,
-          exam_type, permit,
-          num_passed, num_failed,
-          num_passed_1st, num_passed_2nd, num_passed_3rd_or_4th, num_passed_5plus
-        FROM exam_results
-        """
+        table, count_expr = _aggregate_source(filters)
+        sql = f"SELECT COALESCE({count_expr}, 0) FROM {table}"  # noqa: S608
         if where:
             sql += f" WHERE {where}"
-        sql += " ORDER BY year DESC, month DESC, province ASC, exam_center ASC, school_name ASC, exam_type ASC, permit ASC"
+        return int(self._conn.execute(sql, params).fetchone()[0])
 
-        cur = self._conn.execute(sql, params)
-        return [dict(r) for r in cur.fetchall()]
+    # Consultas SQL (sentencia, parámetros) que ejecuta fetch_view con `limit`, con el índice
+    # de orden que elige _sort_index (para mostrar el plan de la consulta que se mide).
+    def fetch_view_queries(
+        self,
+        filters: dict[str, Any],
+        limit: int,
+        order: Sequence[tuple[str, bool]] = ROWS_ORDER,
+    ) -> list[tuple[str, list[Any]]]:
+        return view_queries(filters, limit, order, self._sort_index(filters, order, rows=limit))
+
+    @_profiled()
+    @_cached_query("view")
+    # Devuelve filas, recuento, totales y totales por tipo de examen con una sola pasada
+    # sobre los datos filtrados. Con `limit` las filas son la primera página (servida por
+    # índice) y los agregados salen de un único GROUP BY (o del motor analítico cuando
+    # ninguna tabla de agregados responde a los filtros); sin límite, los agregados se
+    # acumulan mientras se recorre el cursor de detalle. Las filas siguen el orden `order`.
+    def fetch_view(
+        self,
+        filters: dict[str, Any],
+        limit: int | None = None,
+        order: Sequence[tuple[str, bool]] = ROWS_ORDER,
+    ) -> ViewResult:
+        if limit is None:
+            sort_index = self._sort_index(filters, order, rows=None)
+            return self._fetch_view_streaming(*_build_where(filters), order=order, sort_index=sort_index)
+
+        (rows_sql, rows_params), (groups_sql, groups_params) = self.fetch_view_queries(filters, limit, order)
+        rows = RowPage(ROW_PAGE_COLUMNS, self._execute_tuples(rows_sql, rows_params).fetchall())
 
-    # Devuelve totales agregados de aprobados/suspensos para los filtros.
+        if (analytics := self._synced_analytics(filters)) is not None:
+            row_count, totals, by_exam_type = analytics.fetch_view_totals(filters)
+            return ViewResult(rows=rows, row_count=row_count, totals=totals, by_exam_type=by_exam_type)
+
+        by_exam_type: list[dict[str, Any]] = []
+        passed = failed = row_count = 0
+        for r in self._conn.execute(groups_sql, groups_params):
+            by_exam_type.append({"exam_type": r["exam_type"], "passed": r["passed"], "failed": r["failed"]})
+            passed += int(r["passed"] or 0)
+            failed += int(r["failed"] or 0)
+            row_count += int(r["row_count"])
+
+        return ViewResult(
+            rows=rows,
+            row_count=row_count,
+            totals={"passed": passed, "failed": failed},
+            by_exam_type=by_exam_type,
+        )
+
+    # Variante de fetch_view sin límite: un único recorrido del cursor de detalle.
+    def _fetch_view_streaming(
+        self,
+        where: str,
+        params: list[Any],
+        order: Sequence[tuple[str, bool]] = ROWS_ORDER,
+        sort_index: str | None = None,
+    ) -> ViewResult:
+        sql, params = _rows_query(where, params, order=order, sort_index=sort_index)
+        exam_type_at, passed_at, failed_at = map(ROW_PAGE_COLUMNS.index, ("exam_type", "num_passed", "num_failed"))
+        rows = self._execute_tuples(sql, params).fetchall()
+        groups: dict[str, list[int]] = {}
+        for row in rows:
+            group = groups.setdefault(row[exam_type_at], [0, 0])
+            group[0] += row[passed_at]
+            group[1] += row[failed_at]
+
+        by_exam_type = [
+            {"exam_type": exam_type, "passed": passed, "failed": failed}
+            for exam_type, (passed, failed) in sorted(groups.items())
+        ]
+        return ViewResult(
+            rows=RowPage(ROW_PAGE_COLUMNS, rows),
+            row_count=len(rows),
+            totals={
+                "passed": sum(g["passed"] for g in by_exam_type),
+                "failed": sum(g["failed"] for g in by_exam_type),
+            },
+            by_exam_type=by_exam_type,
+        )
+
+    @_profiled()
+    @_cached_query("totals")
+    # Devuelve totales agregados de aprobados/suspensos para los filtros (desde el agregado
+    # más pequeño que los pueda responder o, sin agregado, desde el motor analítico si hay).
     def fetch_totals(self, filters: dict[str, Any]) -> dict[str, int]:
+        if (analytics := self._synced_analytics(filters)) is not None:
+            return analytics.fetch_totals(filters)
         where, params = _build_where(filters)
-        sql = "SELECT SUM(num_passed) AS passed, SUM(num_failed) AS failed FROM exam_results"
+        table, _ = _aggregate_source(filters)
+        sql = f"SELECT SUM(num_passed) AS passed, SUM(num_failed) AS failed FROM {table}"  # noqa: S608
         if where:
             sql += f" WHERE {where}"
         cur = self._conn.execute(sql, params)
@@ -215,19 +1496,42 @@ class Database:
             return {"passed": 0, "failed": 0}
         return {"passed": int(row["passed"] or 0), "failed": int(row["failed"] or 0)}
 
-    # Devuelve totales agrupados por tipo de examen para la gráfica.
+    @_profiled()
+    @_cached_query("by_exam_type")
+    # Devuelve totales agrupados por tipo de examen para la gráfica (desde agregados si es
+    # posible; si no, desde el motor analítico si hay).
     def fetch_totals_by_exam_type(self, filters: dict[str, Any]) -> list[dict[str, Any]]:
+        if (analytics := self._synced_analytics(filters)) is not None:
+            return analytics.fetch_totals_by_exam_type(filters)
         where, params = _build_where(filters)
-        sql = """
-        SELECT
-          exam_type,
-          SUM(num_passed) AS passed,
-          SUM(num_failed) AS failed
-        FROM exam_results
-        """
-        if where:
-            sql += f" WHERE {where}"
-        sql += " GROUP BY exam_type ORDER BY exam_type ASC"
+        table, _ = _aggregate_source(filters)
+        sql = _by_exam_type_query(table, where)
 
         cur = self._conn.execute(sql, params)
-        return [dict(r) for r in cur.fetchall()]
+        return [{"exam_type": r["exam_type"], "passed": r["passed"], "failed": r["failed"]} for r in cur.fetchall()]
+
+    # Id de la última fila de exam_results (0 si está vacía).
+    def max_fact_id(self) -> int:
+        return int(self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM exam_results").fetchone()[0])
+
+    # Cuenta las filas de exam_results con id hasta `up_to_id`.
+    def count_facts(self, up_to_id: int) -> int:
+        cur = self._conn.execute("SELECT COUNT(*) FROM exam_results WHERE id <= ?", (int(up_to_id),))
+        return int(cur.fetchone()[0])
+
+    # Recorre por lotes las filas de exam_results con id posterior a `after_id`, en orden
+    # de id, como tuplas con las columnas FACT_COLUMNS.
+    def iter_fact_batches(
+        self,
+        after_id: int = 0,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Iterator[list[tuple[int, ...]]]:
+        sql = f"SELECT {', '.join(FACT_COLUMNS)} FROM exam_results WHERE id > ? ORDER BY id"  # noqa: S608
+        cur = self._execute_tuples(sql, (int(after_id),))
+        while batch := cur.fetchmany(batch_size):
+            yield batch
+
+    # Devuelve las etiquetas de dim_values como (id, campo, valor).
+    def dimension_labels(self) -> list[tuple[int, str, str]]:
+        cur = self._execute_tuples("SELECT id, field, value FROM dim_values", ())
+        return [(int(dim_id), str(field), str(value)) for dim_id, field, value in cur]
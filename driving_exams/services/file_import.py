@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from PyQt6 import QtCore
+
+from services.csv_importer import detect_encoding, iter_exam_batches
+from services.database import Database, DatabaseError
+
+
+# Excepción lanzada dentro de la importación cuando se cancela (se deshace como cualquier fallo).
+class ImportCancelled(Exception):
+    pass
+
+
+# Estado compartido entre la GUI y el hilo de importación (protegido por `lock`).
+class _ImportState:
+    # Inicializa el estado sin importación en curso.
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.cancel = threading.Event()
+        self.running = False
+        self.db: Database | None = None
+
+
+# Trabajador que vive en el hilo de importación. La conexión de escritura de la GUI solo
+# puede usarse desde su hilo, así que importa con su propia instancia de escritura, abierta
+# en este hilo al primer uso y cerrada al terminar el hilo.
+class _ImportWorker(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(object, str)
+    failed = QtCore.pyqtSignal(str)
+
+    # Guarda la base de datos de la que se toman la ruta, los ajustes y el profiler.
+    def __init__(self, db: Database, state: _ImportState) -> None:
+        super().__init__()
+        self._db_path = db.db_path
+        self._settings = db.pool.settings
+        self._profiler = db.profiler
+        self._state = state
+
+    # Devuelve la instancia de escritura del hilo, abriéndola al primer uso.
+    def _writer(self) -> Database:
+        state = self._state
+        if state.db is None:
+            db = Database(self._db_path, cache_entries=0, settings=self._settings, profiler=self._profiler)
+            with state.lock:
+                state.db = db
+        return state.db
+
+    @QtCore.pyqtSlot(str)
+    # Importa un fichero y emite sus estadísticas y su codificación (o el error).
+    def run(self, path: str) -> None:
+        state = self._state
+        try:
+            db = self._writer()
+            encoding = detect_encoding(path)
+            stats = db.import_exam_batches(
+                iter_exam_batches(path, encoding=encoding),
+                source_file=path,
+                progress=self._report_progress,
+            )
+        except ImportCancelled:
+            return
+        except sqlite3.OperationalError as exc:
+            if not state.cancel.is_set():
+                self.failed.emit(str(exc))
+            return
+        except (ValueError, DatabaseError) as exc:
+            self.failed.emit(str(exc))
+            return
+        except Exception as exc:  # noqa: BLE001
+            self.failed.emit(f"Unexpected error: {exc!r}")
+            return
+        finally:
+            with state.lock:
+                state.running = False
+
+        self.finished.emit(stats, encoding)
+
+    # Emite el progreso tras cada lote; si se pidió cancelar, aborta la importación.
+    def _report_progress(self, rows_read: int) -> None:
+        if self._state.cancel.is_set():
+            raise ImportCancelled()
+        self.progress.emit(rows_read)
+
+    @QtCore.pyqtSlot()
+    # Cierra la instancia de escritura (se llama desde el propio hilo, al terminar).
+    def close(self) -> None:
+        state = self._state
+        with state.lock:
+            db, state.db = state.db, None
+        if db is not None:
+            db.close()
+
+
+# Importa ficheros CSV/TXT de la DGT en un hilo aparte, con progreso (filas leídas). Solo
+# admite una importación a la vez: otra no puede entrar en el registro de periodos de la
+# que está en curso.
+class FileImporter(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(object, str)
+    failed = QtCore.pyqtSignal(str)
+    _requested = QtCore.pyqtSignal(str)
+
+    # Arranca el hilo de importación; importa en la base de datos de `db` (ver _ImportWorker).
+    def __init__(self, db: Database, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._state = _ImportState()
+        self._thread = QtCore.QThread(self)
+        self._worker = _ImportWorker(db, self._state)
+        self._worker.moveToThread(self._thread)
+        self._requested.connect(self._worker.run)
+        # finished se emite desde el propio hilo: la conexión de escritura se cierra en él.
+        self._thread.finished.connect(self._worker.close, QtCore.Qt.ConnectionType.DirectConnection)
+        self._worker.progress.connect(self.progress)
+        self._worker.finished.connect(self.finished)
+        self._worker.failed.connect(self.failed)
+        self._thread.start()
+
+    # Indica si hay una importación en curso.
+    def is_running(self) -> bool:
+        with self._state.lock:
+            return self._state.running
+
+    # Encola la importación de `path`; devuelve False si ya hay otra en curso.
+    def start(self, path: str) -> bool:
+        with self._state.lock:
+            if self._state.running:
+                return False
+            self._state.running = True
+            self._state.cancel.clear()
+        self._requested.emit(path)
+        return True
+
+    # Cancela la importación en curso (se deshace entera) y detiene el hilo.
+    def shutdown(self) -> None:
+        with self._state.lock:
+            self._state.cancel.set()
+            if self._state.running and self._state.db is not None:
+                self._state.db.interrupt()
+        self._thread.quit()
+        self._thread.wait()
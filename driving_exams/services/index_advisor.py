@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import itertools
+import re
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from services.database import Database
+
+
+# Filtros que entiende _build_where (los que puede producir la ventana principal).
+FILTER_KEYS = ("year", "month", "province", "exam_center", "school_code", "exam_type", "permit", "school_name_contains")
+
+# Columna de igualdad de cada filtro; la búsqueda por nombre usa su propio índice FTS.
+_FILTER_COLUMNS = {
+    "year": "year",
+    "month": "month",
+    "province": "province_id",
+    "exam_center": "exam_center_id",
+    "school_code": "school_code_id",
+    "exam_type": "exam_type_id",
+    "permit": "permit_id",
+}
+
+# Orden de las columnas en un índice propuesto: primero las más selectivas y al final el
+# periodo, para que la página de filas (ORDER BY year DESC, month DESC) salga del índice.
+_COLUMN_ORDER = (
+    "school_code_id",
+    "exam_center_id",
+    "province_id",
+    "permit_id",
+    "exam_type_id",
+    "year",
+    "month",
+)
+
+# Tablas sobre las que se proponen índices y columnas que los hacen cubrientes para los
+# totales por tipo de examen. Solo exam_results: las tablas de agregados son pequeñas,
+# recorrerlas es el plan previsto y se reconstruyen en cada importación, así que un índice
+# sobre ellas solo encarecería la importación.
+_COVERING_COLUMNS = {
+    "exam_results": ("exam_type_id", "num_passed", "num_failed"),
+}
+
+# Alias de tabla usados en las consultas de detalle.
+_TABLE_ALIASES = {"r": "exam_results"}
+
+# Prefijo de los índices creados por el asesor (para poder eliminarlos).
+ADVISED_INDEX_PREFIX = "idx_advised_"
+
+# Paso de plan que recorre una tabla completa (sin búsqueda por índice).
+_SCAN_STEP = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX \w+)?$")
+
+
+@dataclass(frozen=True, slots=True)
+# Medida de una combinación de filtros: latencia de fetch_view y plan de sus consultas.
+class ComboTiming:
+    filters: tuple[str, ...]
+    seconds: float
+    plan: tuple[str, ...]
+
+    @property
+    # Tablas de datos que el plan recorre completas.
+    def scanned_tables(self) -> tuple[str, ...]:
+        tables = []
+        for step in self.plan:
+            match = _SCAN_STEP.match(step)
+            if match:
+                table = _TABLE_ALIASES.get(match.group(1), match.group(1))
+                if table in _COVERING_COLUMNS and table not in tables:
+                    tables.append(table)
+        return tuple(tables)
+
+
+@dataclass(frozen=True, slots=True)
+# Índice propuesto y combinaciones de filtros que lo motivan.
+class IndexRecommendation:
+    table: str
+    columns: tuple[str, ...]
+    combos: tuple[tuple[str, ...], ...]
+
+    @property
+    def name(self) -> str:
+        short = "_".join(c.removesuffix("_id") for c in self.columns)
+        return f"{ADVISED_INDEX_PREFIX}{self.table}_{short}"
+
+    @property
+    def sql(self) -> str:
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table} ({', '.join(self.columns)})"
+
+
+@dataclass(frozen=True, slots=True)
+# Resultado del asesor: medidas antes (y después, si se aplicó), propuestas e índices creados.
+class AdvisorReport:
+    sample: dict[str, Any]
+    before: list[ComboTiming]
+    recommendations: list[IndexRecommendation]
+    after: list[ComboTiming] | None = None
+    created: tuple[str, ...] = ()
+
+
+# Elige un valor representativo de cada filtro a partir de los combos de la base de datos.
+def sample_filters(db: Database) -> dict[str, Any]:
+    sample: dict[str, Any] = {}
+    years = db.distinct_years()
+    if years:
+        sample["year"] = years[0]
+        months = db.distinct_months(years[0])
+        if months:
+            sample["month"] = months[-1]
+    for key in ("province", "exam_center", "school_code", "exam_type", "permit"):
+        values = db.distinct_values(key)
+        if values:
+            sample[key] = values[len(values) // 2]
+    names = db.distinct_values("school_name")
+    if names:
+        name = names[len(names) // 2]
+        sample["school_name_contains"] = name[len(name) // 2 :][:4]
+    return sample
+
+
+# Enumera las combinaciones de filtros (la vacía incluida) de hasta `max_filters` claves.
+def filter_combinations(keys: Sequence[str], max_filters: int) -> list[tuple[str, ...]]:
+    combos: list[tuple[str, ...]] = []
+    for size in range(0, max_filters + 1):
+        combos.extend(itertools.combinations(keys, size))
+    return combos
+
+
+# Mide cada combinación: mejor tiempo de `repeat` ejecuciones de fetch_view (con caché
+# desactivada) y plan de sus consultas.
+def measure(
+    db: Database,
+    sample: dict[str, Any],
+    combos: Sequence[tuple[str, ...]],
+    repeat: int = 3,
+    page_size: int = 256,
+) -> list[ComboTiming]:
+    db.clear_cache()
+    timings: list[ComboTiming] = []
+    for combo in combos:
+        filters = {key: sample[key] for key in combo}
+        plan: list[str] = []
+        for sql, params in db.fetch_view_queries(filters, page_size):
+            plan.extend(db.explain(sql, params))
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            db.fetch_view(filters, limit=page_size)
+            best = min(best, time.perf_counter() - start)
+            db.clear_cache()
+        timings.append(ComboTiming(filters=combo, seconds=best, plan=tuple(plan)))
+    return timings
+
+
+# Propone un índice por (tabla, columnas de igualdad) para las combinaciones cuyo plan
+# recorre una tabla completa. Un candidato cuyas columnas son prefijo de otro más ancho se
+# fusiona con él; se priorizan por tiempo total de las combinaciones afectadas.
+def recommend(timings: Sequence[ComboTiming], max_indexes: int = 6) -> list[IndexRecommendation]:
+    candidates: dict[tuple[str, tuple[str, ...]], list[ComboTiming]] = {}
+    for timing in timings:
+        equality = [_FILTER_COLUMNS[key] for key in timing.filters if key in _FILTER_COLUMNS]
+        if not equality:
+            continue
+        keys = tuple(sorted(equality, key=_COLUMN_ORDER.index))
+        for table in timing.scanned_tables:
+            candidates.setdefault((table, keys), []).append(timing)
+
+    merged: dict[tuple[str, tuple[str, ...]], list[ComboTiming]] = {}
+    for table, keys in sorted(candidates, key=lambda candidate: len(candidate[1]), reverse=True):
+        target = next(
+            (other for other in merged if other[0] == table and other[1][: len(keys)] == keys),
+            (table, keys),
+        )
+        merged.setdefault(target, []).extend(candidates[(table, keys)])
+
+    ranked: list[tuple[float, IndexRecommendation]] = []
+    for (table, keys), affected in merged.items():
+        covering = tuple(c for c in _COVERING_COLUMNS[table] if c not in keys)
+        if table == "exam_results":
+            covering = tuple(c for c in ("year", "month") if c not in keys) + covering
+        recommendation = IndexRecommendation(
+            table=table,
+            columns=keys + covering,
+            combos=tuple(t.filters for t in affected),
+        )
+        ranked.append((sum(t.seconds for t in affected), recommendation))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return [rec for _, rec in ranked[:max_indexes]]
+
+
+# Crea los índices propuestos y actualiza las estadísticas del planificador (ANALYZE).
+def apply_recommendations(db: Database, recommendations: Sequence[IndexRecommendation]) -> tuple[str, ...]:
+    db.apply_ddl(rec.sql for rec in recommendations)
+    db.analyze()
+    return tuple(rec.name for rec in recommendations)
+
+
+# Elimina los índices creados por el asesor; devuelve sus nombres.
+def drop_advised_indexes(db: Database) -> list[str]:
+    names = db.index_names(ADVISED_INDEX_PREFIX)
+    db.apply_ddl(f"DROP INDEX IF EXISTS {name}" for name in names)
+    return names
+
+
+# Mide todas las combinaciones de hasta `max_filters` filtros, propone índices y, con
+# `apply`, los crea, ejecuta ANALYZE y vuelve a medir.
+def advise(
+    db: Database,
+    max_filters: int = 2,
+    repeat: int = 3,
+    apply: bool = False,
+    max_indexes: int = 6,
+) -> AdvisorReport:
+    sample = sample_filters(db)
+    keys = [key for key in FILTER_KEYS if key in sample]
+    combos = filter_combinations(keys, max_filters)
+    before = measure(db, sample, combos, repeat=repeat)
+    recommendations = recommend(before, max_indexes=max_indexes)
+    if not apply:
+        return AdvisorReport(sample=sample, before=before, recommendations=recommendations)
+
+    created = apply_recommendations(db, recommendations)
+    after = measure(db, sample, combos, repeat=repeat)
+    return AdvisorReport(
+        sample=sample,
+        before=before,
+        recommendations=recommendations,
+        after=after,
+        created=created,
+    )
+
+
+# Describe el informe como líneas de texto para la consola.
+def format_report(report: AdvisorReport) -> list[str]:
+    lines = [f"Sample filters: {report.sample}", ""]
+    after = {t.filters: t for t in report.after or []}
+    header = f"{'filters':<45} {'before ms':>10}"
+    if report.after is not None:
+        header += f" {'after ms':>10} {'speedup':>8}"
+    lines.append(header + "  full scans")
+    for timing in report.before:
+        label = ", ".join(timing.filters) or "(none)"
+        line = f"{label:<45} {timing.seconds * 1000:>10.2f}"
+        scans = timing.scanned_tables
+        if timing.filters in after:
+            new = after[timing.filters]
+            speedup = timing.seconds / new.seconds if new.seconds > 0 else float("inf")
+            line += f" {new.seconds * 1000:>10.2f} {speedup:>7.1f}x"
+            scans = new.scanned_tables
+        lines.append(f"{line}  {', '.join(scans) or '-'}")
+
+    lines.append("")
+    if not report.recommendations:
+        lines.append("No index recommendations: every filtered combination is served by an index.")
+    for rec in report.recommendations:
+        status = "created" if rec.name in report.created else "recommended"
+        lines.append(f"{status}: {rec.sql};  -- {len(rec.combos)} combination(s)")
+    return lines
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+
+# Límites superiores (ms) de los cubos de los histogramas de latencia; el último cubo
+# recoge todo lo que supere el mayor límite.
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000)
+
+# Literales de una sentencia expandida (cadenas y números) que se sustituyen por '?' para
+# agrupar en un mismo histograma las ejecuciones de una misma sentencia.
+_SQL_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_SPACES = re.compile(r"\s+")
+
+
+# Devuelve la forma de una sentencia sin literales ni espacios repetidos.
+def normalize_sql(sql: str) -> str:
+    return _SQL_SPACES.sub(" ", _SQL_LITERAL.sub("?", sql)).strip()
+
+
+# Histograma de latencias por cubos fijos, con recuento, suma, extremos y filas devueltas.
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total_seconds", "min_seconds", "max_seconds", "rows")
+
+    # Crea un histograma vacío.
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.min_seconds = float("inf")
+        self.max_seconds = 0.0
+        self.rows = 0
+
+    # Añade una medida.
+    def add(self, seconds: float, rows: int = 0) -> None:
+        ms = seconds * 1000.0
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if ms <= bound), len(LATENCY_BUCKETS_MS))
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.min_seconds = min(self.min_seconds, seconds)
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.rows += rows
+
+    # Estima el percentil `q` (0-1) en ms como el límite superior de su cubo (o el máximo).
+    def percentile_ms(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = max(1, round(q * self.count))
+        seen = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(float(bound), self.max_seconds * 1000.0)
+        return self.max_seconds * 1000.0
+
+    # Devuelve el histograma como diccionario serializable a JSON.
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "rows": self.rows,
+            "total_ms": self.total_seconds * 1000.0,
+            "mean_ms": self.total_seconds * 1000.0 / self.count if self.count else 0.0,
+            "min_ms": self.min_seconds * 1000.0 if self.count else 0.0,
+            "max_ms": self.max_seconds * 1000.0,
+            "p50_ms": self.percentile_ms(0.50),
+            "p95_ms": self.percentile_ms(0.95),
+            "p99_ms": self.percentile_ms(0.99),
+            "buckets_ms": {
+                **{f"<={bound}": n for bound, n in zip(LATENCY_BUCKETS_MS, self.counts)},
+                f">{LATENCY_BUCKETS_MS[-1]}": self.counts[-1],
+            },
+        }
+
+
+@dataclass(frozen=True, slots=True)
+# Llamada instrumentada a un método de Database: duración, filas devueltas (insertadas en
+# las importaciones) y sentencias ejecutadas, con sus parámetros ya sustituidos.
+class CallRecord:
+    method: str
+    started_at: float
+    seconds: float
+    rows: int
+    statements: tuple[str, ...]
+    error: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+# Sentencia lenta: tiempo desde que empezó hasta la siguiente sentencia o el final de la
+# llamada (incluye leer sus filas) y plan de ejecución, si se capturó.
+class StatementRecord:
+    method: str
+    sql: str
+    seconds: float
+    plan: tuple[str, ...]
+
+
+# Recoge las medidas de una o varias instancias de Database (es seguro entre hilos):
+# histogramas por método y por sentencia, últimas llamadas y sentencias lentas.
+class QueryProfiler:
+    # Configura el umbral de sentencia lenta, si se captura su EXPLAIN QUERY PLAN y cuántas
+    # llamadas y sentencias lentas se conservan.
+    def __init__(self, slow_ms: float = 100.0, explain_slow: bool = True, max_records: int = 500) -> None:
+        self.slow_ms = slow_ms
+        self.explain_slow = explain_slow
+        self._lock = threading.Lock()
+        self._methods: dict[str, LatencyHistogram] = {}
+        self._statements: dict[str, LatencyHistogram] = {}
+        self._calls: deque[CallRecord] = deque(maxlen=max_records)
+        self._slow: deque[StatementRecord] = deque(maxlen=max_records)
+        self._created = time.time()
+
+    # Indica si una sentencia supera el umbral de lentitud.
+    def is_slow(self, seconds: float) -> bool:
+        return seconds * 1000.0 >= self.slow_ms
+
+    # Registra una llamada y el tiempo de cada una de sus sentencias.
+    def record_call(self, call: CallRecord, statement_seconds: list[float]) -> None:
+        with self._lock:
+            self._methods.setdefault(call.method, LatencyHistogram()).add(call.seconds, call.rows)
+            for sql, seconds in zip(call.statements, statement_seconds):
+                self._statements.setdefault(normalize_sql(sql), LatencyHistogram()).add(seconds)
+            self._calls.append(call)
+
+    # Registra una sentencia lenta.
+    def record_slow(self, statement: StatementRecord) -> None:
+        with self._lock:
+            self._slow.append(statement)
+
+    # Descarta todas las medidas.
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+            self._statements.clear()
+            self._calls.clear()
+            self._slow.clear()
+            self._created = time.time()
+
+    # Devuelve los histogramas por método de Database.
+    def method_histograms(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {name: hist.to_dict() for name, hist in sorted(self._methods.items())}
+
+    # Devuelve los histogramas por sentencia (normalizada), de mayor a menor tiempo total.
+    def statement_histograms(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            ranked = sorted(self._statements.items(), key=lambda item: item[1].total_seconds, reverse=True)
+            return {sql: hist.to_dict() for sql, hist in ranked}
+
+    # Devuelve las últimas sentencias lentas (la más reciente al final).
+    def slow_statements(self) -> list[StatementRecord]:
+        with self._lock:
+            return list(self._slow)
+
+    # Devuelve las últimas llamadas registradas (la más reciente al final).
+    def recent_calls(self) -> list[CallRecord]:
+        with self._lock:
+            return list(self._calls)
+
+    # Devuelve todas las medidas como diccionario serializable a JSON.
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "since": datetime.fromtimestamp(self._created, timezone.utc).isoformat(timespec="seconds"),
+            "slow_ms": self.slow_ms,
+            "methods": self.method_histograms(),
+            "statements": self.statement_histograms(),
+            "slow_statements": [asdict(s) for s in self.slow_statements()],
+            "calls": [asdict(c) for c in self.recent_calls()],
+        }
+
+    # Guarda las medidas en un fichero JSON para analizarlas fuera de la aplicación.
+    def dump(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.snapshot(), indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        return path
+
+    # Resumen de una línea para la barra de estado: llamadas, p50/p95 y método más lento.
+    def summary_line(self) -> str:
+        with self._lock:
+            merged = LatencyHistogram()
+            for hist in self._methods.values():
+                for i, n in enumerate(hist.counts):
+                    merged.counts[i] += n
+                merged.count += hist.count
+                merged.max_seconds = max(merged.max_seconds, hist.max_seconds)
+            slowest = max(self._methods.items(), key=lambda item: item[1].max_seconds, default=None)
+            slow_count = len(self._slow)
+        if slowest is None:
+            return "DB calls: 0"
+        name, hist = slowest
+        return (
+            f"DB calls: {merged.count} | p50 {merged.percentile_ms(0.5):.1f} ms | "
+            f"p95 {merged.percentile_ms(0.95):.1f} ms | slowest {name} {hist.max_seconds * 1000.0:.1f} ms | "
+            f"slow SQL: {slow_count}"
+        )
+
+    # Describe las medidas como líneas de texto (panel de depuración).
+    def report_lines(self, max_statements: int = 15) -> list[str]:
+        lines = [f"{'method':<28} {'calls':>7} {'rows':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>9}"]
+        for name, hist in self.method_histograms().items():
+            lines.append(
+                f"{name:<28} {hist['count']:>7} {hist['rows']:>9} {hist['p50_ms']:>8.1f} "
+                f"{hist['p95_ms']:>8.1f} {hist['max_ms']:>9.1f}"
+            )
+        lines += ["", f"{'total ms':>9} {'calls':>7} {'p95 ms':>8}  statement"]
+        for sql, hist in list(self.statement_histograms().items())[:max_statements]:
+            lines.append(f"{hist['total_ms']:>9.1f} {hist['count']:>7} {hist['p95_ms']:>8.1f}  {sql}")
+        slow = self.slow_statements()
+        if slow:
+            lines += ["", f"Slow statements (>= {self.slow_ms:g} ms):"]
+            for statement in reversed(slow[-max_statements:]):
+                lines.append(f"{statement.seconds * 1000.0:9.1f} ms  {statement.method}: {statement.sql}")
+                lines.extend(f"{'':14}{step}" for step in statement.plan)
+        return lines
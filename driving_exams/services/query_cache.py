@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import dataclasses
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+# Elementos que se miden para estimar el tamaño de listas largas.
+_SIZE_SAMPLE = 64
+
+
+# Estima el tamaño en bytes de un resultado (listas/dicts/tuplas de valores simples y
+# dataclasses como ViewResult, campo a campo); los objetos con `nbytes` (p. ej. RowPage)
+# dan su propio tamaño. En listas largas se extrapola a partir de una muestra de los
+# primeros elementos.
+def estimate_size(value: Any) -> int:
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return size + sum(estimate_size(getattr(value, field.name)) for field in dataclasses.fields(value))
+    if isinstance(value, dict):
+        return size + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return size
+        sample = value[:_SIZE_SAMPLE]
+        sample_size = sum(estimate_size(item) for item in sample)
+        return size + sample_size * len(value) // len(sample)
+    return size
+
+
+# Caché LRU acotada por número de entradas y por memoria estimada. Cada entrada pertenece
+# a una "generación" de datos: al cambiar la generación se descartan todas.
+class QueryCache:
+    # Configura los límites; max_bytes <= 0 desactiva la caché.
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation: Hashable = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    # Indica si la caché puede almacenar entradas.
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    # Fija la generación de datos actual; si cambia, invalida todas las entradas.
+    def set_generation(self, generation: Hashable) -> None:
+        with self._lock:
+            if generation == self._generation:
+                return
+            self._generation = generation
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+                self._bytes = 0
+
+    # Devuelve (encontrado, valor) y marca la entrada como usada recientemente.
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    # Guarda un valor y expulsa las entradas menos usadas hasta respetar los límites.
+    def put(self, key: Hashable, value: Any, size: int | None = None) -> None:
+        if not self.enabled:
+            return
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    # Vacía la caché (los contadores se conservan).
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # Devuelve contadores y ocupación para ajustar el tamaño de la caché.
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from PyQt6 import QtCore
+
+from services.connection import ConnectionPool
+from services.database import ROWS_ORDER, Database, DatabaseError, ViewResult
+from services.instrumentation import QueryProfiler
+
+if TYPE_CHECKING:
+    from services.analytics_engine import AnalyticsEngine
+
+
+# Estado compartido entre la GUI y el hilo de consultas (protegido por `lock`).
+class _RequestState:
+    # Inicializa los identificadores de petición.
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latest = 0
+        self.running: int | None = None
+        self.loading = False
+        self.paging = False
+        self.db: Database | None = None
+
+    # Indica si una petición ya fue sustituida por otra más reciente.
+    def is_stale(self, request_id: int) -> bool:
+        with self.lock:
+            return request_id != self.latest
+
+
+# Trabajador que vive en el hilo de consultas y usa su propia conexión de lectura.
+class _QueryWorker(QtCore.QObject):
+    finished = QtCore.pyqtSignal(int, object, object, object)
+    failed = QtCore.pyqtSignal(int, str)
+    page_ready = QtCore.pyqtSignal(object, object)
+    page_failed = QtCore.pyqtSignal(object, str)
+
+    # Guarda la ruta de la DB (y el pool del que tomar el lector, si se comparte); la
+    # conexión se abre en el propio hilo al primer uso.
+    def __init__(
+        self,
+        db_path: Path,
+        state: _RequestState,
+        page_size: int,
+        pool: ConnectionPool | None,
+        profiler: QueryProfiler | None,
+        analytics: AnalyticsEngine | None,
+    ) -> None:
+        super().__init__()
+        self._db_path = db_path
+        self._pool = pool
+        self._profiler = profiler
+        self._analytics = analytics
+        self._state = state
+        self._page_size = page_size
+
+    # Devuelve el lector del hilo, abriéndolo al primer uso (con `state.lock` tomado).
+    def _reader(self) -> Database:
+        state = self._state
+        if state.db is None:
+            state.db = Database(
+                self._db_path,
+                read_only=True,
+                pool=self._pool,
+                profiler=self._profiler,
+                analytics=self._analytics,
+            )
+        return state.db
+
+    @QtCore.pyqtSlot()
+    # Carga el motor analítico (si hay) con el lector del hilo, para que la primera consulta
+    # que lo use no espere a la carga. Si falla, esa consulta lo vuelve a intentar.
+    def load_analytics(self) -> None:
+        state = self._state
+        with state.lock:
+            if self._analytics is None:
+                return
+            db = self._reader()
+            state.loading = True
+        try:
+            self._analytics.sync(db)
+        except (sqlite3.Error, DatabaseError):
+            # Interrumpida al cerrar o fallida: la consulta que use el motor vuelve a cargarlo.
+            return
+        finally:
+            with state.lock:
+                state.loading = False
+
+    # Ejecuta la consulta combinada de una petición salvo que haya quedado obsoleta.
+    @QtCore.pyqtSlot(int, object, object)
+    def run(self, request_id: int, filters: dict[str, Any], order: tuple[tuple[str, bool], ...]) -> None:
+        state = self._state
+        with state.lock:
+            if request_id != state.latest:
+                return
+            db = self._reader()
+            state.running = request_id
+
+        try:
+            view = db.fetch_view(filters, limit=self._page_size, order=order)
+        except sqlite3.OperationalError as exc:
+            if not state.is_stale(request_id):
+                self.failed.emit(request_id, str(exc))
+            return
+        except Exception as exc:  # noqa: BLE001
+            self.failed.emit(request_id, repr(exc))
+            return
+        finally:
+            with state.lock:
+                state.running = None
+
+        self.finished.emit(request_id, filters, order, view)
+
+    # Lee una página de filas de la tabla (ver Database.fetch_rows_page). Las páginas no
+    # sustituyen a las peticiones de la vista ni las interrumpen: `token` lo interpreta quien
+    # la pidió para descartar las que ya no necesite.
+    @QtCore.pyqtSlot(object, object, object, object, int)
+    def run_page(
+        self,
+        token: object,
+        filters: dict[str, Any],
+        after: tuple[Any, ...] | None,
+        order: tuple[tuple[str, bool], ...],
+        limit: int,
+    ) -> None:
+        state = self._state
+        with state.lock:
+            db = self._reader()
+            state.paging = True
+        try:
+            rows = db.fetch_rows_page(filters, after=after, limit=limit, order=order)
+        except (sqlite3.Error, DatabaseError) as exc:
+            self.page_failed.emit(token, str(exc))
+            return
+        finally:
+            with state.lock:
+                state.paging = False
+
+        self.page_ready.emit(token, rows)
+
+
+# Ejecuta las consultas de la vista principal en un hilo aparte. Una petición nueva
+# sustituye a la que esté en curso interrumpiendo su consulta SQLite.
+class QueryExecutor(QtCore.QObject):
+    finished = QtCore.pyqtSignal(int, object, object, object)
+    failed = QtCore.pyqtSignal(int, str)
+    page_ready = QtCore.pyqtSignal(object, object)
+    page_failed = QtCore.pyqtSignal(object, str)
+    _requested = QtCore.pyqtSignal(int, object, object)
+    _page_requested = QtCore.pyqtSignal(object, object, object, object, int)
+    _load_requested = QtCore.pyqtSignal()
+
+    # Arranca el hilo de consultas con su trabajador. Con `pool`, el lector se toma prestado
+    # del pool de la conexión de escritura (ver Database.pool); con `profiler`, sus
+    # consultas se instrumentan; con `analytics`, los totales que no cubren los agregados
+    # salen del motor en memoria (ver services.analytics_engine).
+    def __init__(
+        self,
+        db_path: Path,
+        page_size: int = 256,
+        parent: QtCore.QObject | None = None,
+        pool: ConnectionPool | None = None,
+        profiler: QueryProfiler | None = None,
+        analytics: AnalyticsEngine | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._state = _RequestState()
+        self._thread = QtCore.QThread(self)
+        self._worker = _QueryWorker(Path(db_path), self._state, page_size, pool, profiler, analytics)
+        self._worker.moveToThread(self._thread)
+        self._requested.connect(self._worker.run)
+        self._load_requested.connect(self._worker.load_analytics)
+        self._page_requested.connect(self._worker.run_page)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.failed.connect(self._on_failed)
+        self._worker.page_ready.connect(self.page_ready)
+        self._worker.page_failed.connect(self.page_failed)
+        self._thread.start()
+
+    # Encola una petición (filtros y orden de las filas, ver rows_order) y devuelve su
+    # identificador; interrumpe la que esté en curso.
+    def submit(self, filters: dict[str, Any], order: Sequence[tuple[str, bool]] = ROWS_ORDER) -> int:
+        with self._state.lock:
+            self._state.latest += 1
+            request_id = self._state.latest
+            if self._state.running is not None and self._state.db is not None:
+                self._state.db.interrupt()
+        self._requested.emit(request_id, dict(filters), tuple(order))
+        return request_id
+
+    # Encola la lectura de una página de filas (`limit` filas tras la clave `after`, ver
+    # Database.fetch_rows_page); el resultado llega por page_ready/page_failed con `token`.
+    def fetch_page(
+        self,
+        token: object,
+        filters: dict[str, Any],
+        after: tuple[Any, ...] | None,
+        order: Sequence[tuple[str, bool]],
+        limit: int,
+    ) -> None:
+        self._page_requested.emit(token, dict(filters), after, tuple(order), int(limit))
+
+    # Encola la carga del motor analítico detrás de las peticiones ya enviadas.
+    def load_analytics(self) -> None:
+        self._load_requested.emit()
+
+    # Detiene el hilo y cierra (o devuelve al pool) su conexión.
+    def shutdown(self) -> None:
+        with self._state.lock:
+            self._state.latest += 1
+            busy = self._state.running is not None or self._state.loading or self._state.paging
+            if busy and self._state.db is not None:
+                self._state.db.interrupt()
+        self._thread.quit()
+        self._thread.wait()
+        if self._state.db is not None:
+            self._state.db.close()
+            self._state.db = None
+
+    # Reenvía solo los resultados (filtros, orden, ViewResult) de la petición más reciente.
+    def _on_finished(
+        self,
+        request_id: int,
+        filters: dict[str, Any],
+        order: tuple[tuple[str, bool], ...],
+        view: ViewResult,
+    ) -> None:
+        if not self._state.is_stale(request_id):
+            self.finished.emit(request_id, filters, order, view)
+
+    # Reenvía solo los errores de la petición más reciente.
+    def _on_failed(self, request_id: int, message: str) -> None:
+        if not self._state.is_stale(request_id):
+            self.failed.emit(request_id, message)
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from PyQt6 import QtCore
+from PyQt6.QtGui import QImage
+
+from services.database import Database
+from services.reports import ExportCancelled, export_pdf_report
+
+
+@dataclass(frozen=True, slots=True)
+# Datos de una exportación: destino, filtros, orden de filas y totales de la vista,
+# columnas de la tabla (título, clave de fila) y qué partes incluir. La gráfica se captura
+# antes, en la GUI.
+class PdfExportRequest:
+    pdf_path: Path
+    filters: dict[str, Any]
+    order: tuple[tuple[str, bool], ...]
+    totals: dict[str, int]
+    columns: tuple[tuple[str, str], ...]
+    chart_image: QImage | None
+    include_table: bool
+    include_chart: bool
+
+
+# Estado compartido entre la GUI y el hilo de exportación (protegido por `lock`).
+class _ExportState:
+    # Inicializa el estado sin exportación en curso.
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.cancel = threading.Event()
+        self.running = False
+        self.db: Database | None = None
+
+
+# Trabajador que vive en el hilo de exportación: lee las filas con un cursor de un lector
+# del pool y las dibuja página a página.
+class _ExportWorker(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(str, int)
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+
+    # Guarda la base de datos de la que se toman lectores y el estado compartido.
+    def __init__(self, db: Database, state: _ExportState) -> None:
+        super().__init__()
+        self._db = db
+        self._state = state
+
+    @QtCore.pyqtSlot(object)
+    # Ejecuta una exportación y emite su resultado (terminada, cancelada o fallida).
+    def run(self, request: PdfExportRequest) -> None:
+        state = self._state
+        try:
+            reader = self._db.reader(cache_entries=0)
+        except Exception as exc:  # noqa: BLE001
+            with state.lock:
+                state.running = False
+            self.failed.emit(repr(exc))
+            return
+        rows = _table_rows(reader, request)
+        with state.lock:
+            state.db = reader
+        try:
+            drawn = export_pdf_report(
+                pdf_path=request.pdf_path,
+                filters=request.filters,
+                totals=request.totals,
+                table_headers=[title for title, _ in request.columns],
+                table_rows=rows,
+                chart_image=request.chart_image,
+                include_table=request.include_table,
+                include_chart=request.include_chart,
+                progress=self.progress.emit,
+                is_cancelled=state.cancel.is_set,
+            )
+        except ExportCancelled:
+            self.cancelled.emit()
+            return
+        except sqlite3.OperationalError as exc:
+            if state.cancel.is_set():
+                self.cancelled.emit()
+            else:
+                self.failed.emit(str(exc))
+            return
+        except Exception as exc:  # noqa: BLE001
+            self.failed.emit(repr(exc))
+            return
+        finally:
+            with state.lock:
+                state.db = None
+                state.running = False
+            # Cierra el cursor (si la exportación no llegó al final) antes de devolver el lector.
+            rows.close()
+            reader.close()
+
+        self.finished.emit(str(request.pdf_path), drawn)
+
+
+# Filas de la tabla del reporte en el orden de sus columnas (y en el de la tabla), leídas
+# del cursor de detalle.
+def _table_rows(db: Database, request: PdfExportRequest) -> Iterator[list[Any]]:
+    if not request.include_table:
+        return
+    keys = [key for _, key in request.columns]
+    for row in db.iter_rows(request.filters, order=request.order):
+        yield [row[key] for key in keys]
+
+
+# Exporta reportes PDF en un hilo aparte, con progreso (filas dibujadas) y cancelación.
+# Solo admite una exportación a la vez.
+class ReportExporter(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(str, int)
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+    _requested = QtCore.pyqtSignal(object)
+
+    # Arranca el hilo de exportación; los lectores salen del pool de `db` (ver Database.reader).
+    def __init__(self, db: Database, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._state = _ExportState()
+        self._thread = QtCore.QThread(self)
+        self._worker = _ExportWorker(db, self._state)
+        self._worker.moveToThread(self._thread)
+        self._requested.connect(self._worker.run)
+        self._worker.progress.connect(self.progress)
+        self._worker.finished.connect(self.finished)
+        self._worker.failed.connect(self.failed)
+        self._worker.cancelled.connect(self.cancelled)
+        self._thread.start()
+
+    # Indica si hay una exportación en curso.
+    def is_running(self) -> bool:
+        with self._state.lock:
+            return self._state.running
+
+    # Encola una exportación; devuelve False si ya hay otra en curso.
+    def start(self, request: PdfExportRequest) -> bool:
+        with self._state.lock:
+            if self._state.running:
+                return False
+            self._state.running = True
+            self._state.cancel.clear()
+        self._requested.emit(request)
+        return True
+
+    # Pide cancelar la exportación en curso: interrumpe la consulta del cursor o, si ya no
+    # hay consulta activa, se detiene en el siguiente salto de página.
+    def cancel(self) -> None:
+        with self._state.lock:
+            self._state.cancel.set()
+            if self._state.db is not None:
+                self._state.db.interrupt()
+
+    # Cancela la exportación en curso y detiene el hilo.
+    def shutdown(self) -> None:
+        self.cancel()
+        self._thread.quit()
+        self._thread.wait()
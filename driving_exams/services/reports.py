@@ -1,11 +1,44 @@
 from __future__ import annotations
 
+import itertools
+from collections.abc import Callable, Iterable, Sequence
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 from PyQt6.QtCore import QRect, Qt
-from PyQt6.QtGui import QFont, QImage, QPainter, QPdfWriter, QPen
+from PyQt6.QtGui import QFont, QFontMetrics, QImage, QPainter, QPainterPath, QPdfWriter, QPen
+
+
+# Excepción lanzada cuando se cancela una exportación en curso (el PDF parcial se borra).
+class ExportCancelled(Exception):
+    pass
+
+
+# Caché de textos recortados con elidedText por (ancho, fuente, texto): en las tablas se
+# repiten mucho los valores de provincia, centro, tipo de examen y permiso. Al llenarse se
+# vacía entera.
+class ElidedTextCache:
+    # Configura el número máximo de entradas.
+    def __init__(self, max_entries: int = 100_000) -> None:
+        self.max_entries = max_entries
+        self._entries: dict[tuple[int, str, str], str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # Devuelve `text` recortado a `width` con las métricas de la fuente `font_key`.
+    def elide(self, metrics: QFontMetrics, font_key: str, text: str, width: int) -> str:
+        key = (width, font_key, text)
+        elided = self._entries.get(key)
+        if elided is not None:
+            self.hits += 1
+            return elided
+        self.misses += 1
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        elided = metrics.elidedText(text, Qt.TextElideMode.ElideRight, width)
+        self._entries[key] = elided
+        return elided
 
 
 # Convierte el dict de filtros en líneas legibles para el reporte.
@@ -29,23 +62,68 @@ def _filters_to_lines(filters: dict[str, Any]) -> list[str]:
     return ["Filters: " + " | ".join(parts)] if parts else ["Filters: (none)"]
 
 
-# Genera un PDF con resumen, tabla y/o gráfica según la selección.
+# Genera un PDF con resumen, tabla y/o gráfica según la selección. Las filas pueden venir
+# de un iterador (p. ej. un cursor): se dibujan página a página sin guardarlas. `progress`
+# recibe las filas dibujadas al terminar cada página e `is_cancelled` se consulta en cada
+# salto de página; si devuelve True se borra el PDF parcial y se lanza ExportCancelled.
+# Devuelve el número de filas dibujadas.
 def export_pdf_report(
     pdf_path: Path,
     filters: dict[str, Any],
     totals: dict[str, int],
-    table_headers: list[str],
-    table_rows: list[list[str]],
+    table_headers: Sequence[str],
+    table_rows: Iterable[Sequence[Any]],
     chart_image: QImage | None,
     include_table: bool,
     include_chart: bool,
-) -> None:
+    progress: Callable[[int], None] | None = None,
+    is_cancelled: Callable[[], bool] | None = None,
+) -> int:
     pdf_path.parent.mkdir(parents=True, exist_ok=True)
 
     writer = QPdfWriter(str(pdf_path))
     writer.setResolution(300)
 
     painter = QPainter(writer)
+    completed = False
+    try:
+        drawn = _draw_report(
+            writer,
+            painter,
+            filters,
+            totals,
+            table_headers,
+            table_rows,
+            chart_image,
+            include_table,
+            include_chart,
+            progress,
+            is_cancelled,
+        )
+        completed = True
+        return drawn
+    finally:
+        painter.end()
+        if not completed:
+            # Libera el escritor (cierra el fichero) antes de borrar el PDF parcial.
+            del painter, writer
+            pdf_path.unlink(missing_ok=True)
+
+
+# Dibuja el reporte completo en `painter` (ver export_pdf_report).
+def _draw_report(
+    writer: QPdfWriter,
+    painter: QPainter,
+    filters: dict[str, Any],
+    totals: dict[str, int],
+    table_headers: Sequence[str],
+    table_rows: Iterable[Sequence[Any]],
+    chart_image: QImage | None,
+    include_table: bool,
+    include_chart: bool,
+    progress: Callable[[int], None] | None,
+    is_cancelled: Callable[[], bool] | None,
+) -> int:
     painter.setRenderHint(QPainter.RenderHint.Antialiasing)
     painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
 
@@ -108,7 +186,10 @@ def export_pdf_report(
         painter.drawImage(QRect(x0, y, scaled.width(), scaled.height()), scaled)
         y += scaled.height() + 20
 
-    if include_table and table_headers and table_rows:
+    rows = iter(table_rows) if include_table else iter(())
+    first_row = next(rows, None)
+    drawn = 0
+    if table_headers and first_row is not None:
         painter.setFont(small_font)
         pen = QPen()
         painter.setPen(pen)
@@ -138,35 +219,76 @@ def export_pdf_report(
             )
         header_h = max(row_h, header_max_text_h + (cell_pad_y * 2))
 
-        # Dibuja una fila de la tabla (cabecera o datos) con padding.
-        def draw_row(values: list[str], y_pos: int, row_height: int, is_header: bool = False) -> None:
-            painter.setFont(body_font if is_header else small_font)
-            metrics = painter.fontMetrics()
-            for col, text in enumerate(values):
-                rect = QRect(col_x_positions[col], y_pos, col_widths[col], row_height)
-                painter.drawRect(rect)
-                text_rect = rect.adjusted(cell_pad_x, cell_pad_y, -cell_pad_x, -cell_pad_y)
-                if is_header:
-                    painter.drawText(text_rect, header_flags, str(text))
+        # Caja de texto de cada columna (x, ancho) dentro de su celda.
+        text_boxes = [(x + cell_pad_x, max(0, w - cell_pad_x * 2)) for x, w in zip(col_x_positions, col_widths)]
+        grid_right = col_x_positions[-1] + col_widths[-1]
+        painter.setFont(small_font)
+        small_metrics = painter.fontMetrics()
+        small_key = small_font.key()
+        elided_cache = ElidedTextCache()
+        # Bordes horizontales de las filas dibujadas en la página actual.
+        row_edges: list[int] = []
+
+        # Dibuja la cabecera de la tabla en `y_pos` y vuelve a la fuente de las filas.
+        def draw_header(y_pos: int) -> None:
+            painter.setFont(body_font)
+            text_h = header_h - cell_pad_y * 2
+            for (text_x, text_w), text in zip(text_boxes, table_headers):
+                painter.drawText(text_x, y_pos + cell_pad_y, text_w, text_h, header_flags, str(text))
+            painter.setFont(small_font)
+            row_edges.extend((y_pos, y_pos + header_h))
+
+        # Línea base del texto centrado verticalmente en una fila de datos: el texto ya
+        # recortado se dibuja en un punto, sin maquetarlo dentro de un rectángulo.
+        baseline = cell_pad_y + (row_h - cell_pad_y * 2 - small_metrics.height()) // 2 + small_metrics.ascent()
+
+        # Dibuja el texto de una fila de datos (recortado y cacheado por columna).
+        def draw_cells(values: Sequence[Any], y_pos: int) -> None:
+            text_y = y_pos + baseline
+            for (text_x, text_w), value in zip(text_boxes, values):
+                if value is None or value == "":
                     continue
+                painter.drawText(text_x, text_y, elided_cache.elide(small_metrics, small_key, str(value), text_w))
+            row_edges.append(y_pos + row_h)
 
-                elided = metrics.elidedText(str(text), Qt.TextElideMode.ElideRight, text_rect.width())
-                painter.drawText(text_rect, align_vcenter_left, elided)
+        # Dibuja la rejilla de la tabla de la página actual como un único path.
+        def flush_grid() -> None:
+            if len(row_edges) < 2:
+                row_edges.clear()
+                return
+            path = QPainterPath()
+            for edge in row_edges:
+                path.moveTo(x0, edge)
+                path.lineTo(grid_right, edge)
+            for x in (*col_x_positions, grid_right):
+                path.moveTo(x, row_edges[0])
+                path.lineTo(x, row_edges[-1])
+            painter.drawPath(path)
+            row_edges.clear()
 
         if y + header_h > page_h - margin:
             writer.newPage()
             y = margin
 
-        draw_row(table_headers, y, header_h, is_header=True)
+        draw_header(y)
         y += header_h
 
-        for row in table_rows:
+        for row in itertools.chain((first_row,), rows):
             if y + row_h > page_h - margin:
+                flush_grid()
+                if progress is not None:
+                    progress(drawn)
+                if is_cancelled is not None and is_cancelled():
+                    raise ExportCancelled
                 writer.newPage()
                 y = margin
-                draw_row(table_headers, y, header_h, is_header=True)
+                draw_header(y)
                 y += header_h
-            draw_row(row, y, row_h, is_header=False)
+            draw_cells(row, y)
             y += row_h
+            drawn += 1
+        flush_grid()
 
-    painter.end()
+    if progress is not None:
+        progress(drawn)
+    return drawn
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+# Rango de los enteros que caben en una columna array('i').
+_INT_MIN = -(2**31)
+_INT_MAX = 2**31 - 1
+
+
+# Guarda una columna de forma compacta: enteros en array('i'); etiquetas como tupla de
+# cadenas internadas (las repetidas comparten objeto); el resto, como tupla.
+def _compact_column(values: Sequence[Any]) -> Sequence[Any]:
+    if all(type(v) is int and _INT_MIN <= v <= _INT_MAX for v in values):
+        return array("i", values)
+    if all(type(v) is str for v in values):
+        return tuple(map(sys.intern, values))
+    return tuple(values)
+
+
+# Página de filas de detalle guardada por columnas: cada columna es un array('i') o una
+# tupla de cadenas internadas, en lugar de un dict por fila. Es inmutable, de modo que la
+# caché de consultas puede compartirla.
+class RowPage:
+    __slots__ = ("columns", "_positions", "_data", "_length")
+
+    # Construye la página a partir de filas (secuencias con los valores en el orden de
+    # `columns`, p. ej. tuplas o sqlite3.Row).
+    def __init__(self, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+        self.columns = tuple(columns)
+        self._positions = {name: i for i, name in enumerate(self.columns)}
+        rows = list(rows)
+        self._length = len(rows)
+        if rows:
+            self._data = tuple(_compact_column(values) for values in zip(*rows))
+        else:
+            self._data = tuple(() for _ in self.columns)
+
+    # Número de filas de la página.
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    # Memoria de la página en bytes (para la caché de consultas): los array('i') con su
+    # buffer, las tuplas de cada columna y cada cadena distinta una vez (aunque esté
+    # internada y la compartan otras páginas).
+    def nbytes(self) -> int:
+        size = sys.getsizeof(self) + sys.getsizeof(self.columns) + sys.getsizeof(self._positions)
+        size += sys.getsizeof(self._data)
+        for values in self._data:
+            size += sys.getsizeof(values)
+            if isinstance(values, tuple):
+                size += sum(sys.getsizeof(v) for v in set(values))
+        return size
+
+    # Posición de una columna por nombre (KeyError si no existe).
+    def position(self, column: str) -> int:
+        return self._positions[column]
+
+    # Valor de la fila `row` en la columna de posición `column`.
+    def value(self, row: int, column: int) -> Any:
+        return self._data[column][row]
+
+    # Texto a mostrar de la celda (cadena vacía para NULL).
+    def text(self, row: int, column: int) -> str:
+        value = self._data[column][row]
+        if type(value) is str:
+            return value
+        return "" if value is None else str(value)
+
+    # Valores de la fila `row` en las columnas dadas por nombre (p. ej. la clave de paginación).
+    def key(self, row: int, columns: Iterable[str]) -> tuple[Any, ...]:
+        return tuple(self._data[self._positions[c]][row] for c in columns)
+
+    # Fila `row` como dict columna -> valor.
+    def row_dict(self, row: int) -> dict[str, Any]:
+        return {name: self._data[i][row] for i, name in enumerate(self.columns)}
+
+    # Recorre las filas como dicts.
+    def dicts(self) -> Iterable[dict[str, Any]]:
+        return (self.row_dict(i) for i in range(self._length))
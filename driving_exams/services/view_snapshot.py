@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+# Versión del formato del fichero; los snapshots de otra versión se ignoran.
+SNAPSHOT_VERSION = 1
+
+# Claves de filtro que se guardan en el snapshot (las mismas que acepta Database).
+SNAPSHOT_FILTER_KEYS = (
+    "year",
+    "month",
+    "province",
+    "exam_center",
+    "exam_type",
+    "permit",
+    "school_code",
+    "school_name_contains",
+)
+
+
+@dataclass(frozen=True, slots=True)
+# Última vista mostrada: filtros, número de filas, totales y datos de la gráfica por tipo
+# de examen. Se guarda al cerrar y se muestra al arrancar mientras llega la consulta real.
+class ViewSnapshot:
+    filters: dict[str, Any]
+    row_count: int
+    totals: dict[str, int]
+    by_exam_type: list[dict[str, Any]]
+    saved_at: float = field(default_factory=time.time)
+
+
+# Ruta del snapshot de una base de datos: junto a ella, con sufijo `.view.json`.
+def snapshot_path(db_path: Path) -> Path:
+    db_path = Path(db_path)
+    return db_path.with_name(db_path.stem + ".view.json")
+
+
+# Lee un snapshot; devuelve None si no existe, es de otra versión o está dañado (el
+# arranque nunca debe fallar por él).
+def load_snapshot(path: Path) -> ViewSnapshot | None:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+        filters = {k: v for k, v in data["filters"].items() if k in SNAPSHOT_FILTER_KEYS and v is not None}
+        return ViewSnapshot(
+            filters=filters,
+            row_count=int(data["row_count"]),
+            totals={"passed": int(data["totals"]["passed"]), "failed": int(data["totals"]["failed"])},
+            by_exam_type=[
+                {"exam_type": str(g["exam_type"]), "passed": int(g["passed"] or 0), "failed": int(g["failed"] or 0)}
+                for g in data["by_exam_type"]
+            ],
+            saved_at=float(data.get("saved_at", 0.0)),
+        )
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+
+# Guarda el snapshot de forma atómica (fichero temporal + rename) para no dejar un JSON a
+# medias si la aplicación se cierra durante la escritura.
+def save_snapshot(path: Path, snapshot: ViewSnapshot) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({"version": SNAPSHOT_VERSION, **asdict(snapshot)}, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
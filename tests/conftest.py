@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import random
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+# El código de la app se importa como `services.*` (igual que al ejecutar driving_exams).
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "driving_exams"))
+
+from services.database import Database  # noqa: E402
+
+PROVINCES = {
+    "Madrid": ("Madrid centro 1", "Madrid centro 2"),
+    "Álava": ("Vitoria",),
+    "A Coruña": ("Coruña 1", "Santiago"),
+}
+
+# Nombres con acentos, `%` y `_` literales y prefijos comunes, para la búsqueda por nombre.
+SCHOOL_NAMES = (
+    "AUTOESCUELA PEÑÓN",
+    "AUTOESCUELA PENON 2",
+    "AUTO 100% SEGURA",
+    "CAR_SCHOOL",
+    "CARSCHOOL",
+    "ÁGUILA",
+    "AUTOESCUELA LA ÑORA",
+    "ZETA",
+)
+
+EXAM_TYPES = ("TEORICO", "DESTREZA", "CIRCULACION")
+
+PERIODS = ((2023, 11), (2023, 12), (2024, 1), (2024, 2))
+
+
+# Filas de prueba (orden de ExamRow.as_db_tuple) de un periodo: recuentos pequeños para
+# que haya muchos empates y el id tenga que desempatar.
+def period_rows(year: int, month: int, seed: int = 0) -> list[tuple[object, ...]]:
+    rng = random.Random(year * 100 + month + seed)
+    rows = []
+    for province, centers in PROVINCES.items():
+        for center in centers:
+            for number, name in enumerate(SCHOOL_NAMES):
+                for exam_type in EXAM_TYPES:
+                    if rng.random() < 0.3:
+                        continue
+                    counts = [rng.randint(0, 3) for _ in range(4)]
+                    rows.append(
+                        (
+                            province,
+                            center,
+                            f"SC{number:03d}",
+                            name,
+                            str(rng.randint(1, 2)),
+                            month,
+                            year,
+                            exam_type,
+                            rng.choice(("B", "A2")),
+                            sum(counts),
+                            *counts,
+                            rng.randint(0, 4),
+                        )
+                    )
+    return rows
+
+
+# Base de datos de prueba con PERIODS importados fila a fila o, con el parámetro "bulk",
+# con bulk_load (que además crea los índices de orden que solo existen tras una carga masiva).
+@pytest.fixture(params=["rows", "bulk"])
+def db(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[Database]:
+    database = Database(tmp_path / "exams.db", cache_entries=0)
+    if request.param == "bulk":
+        with database.bulk_load():
+            for year, month in PERIODS:
+                database.import_exam_batches([period_rows(year, month)])
+    else:
+        for year, month in PERIODS:
+            database.import_exam_batches([period_rows(year, month)])
+    yield database
+    database.close()
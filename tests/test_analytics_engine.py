@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from conftest import PERIODS, period_rows
+
+from services.database import Database
+
+pytest.importorskip("numpy")
+
+from services.analytics_engine import AnalyticsEngine  # noqa: E402
+
+# Búsquedas por nombre con `%` y `_` (comodines de LIKE en ambos lados) y acentos.
+NEEDLES = ("penon", "PEÑ", "100%", "%", "_", "car_s", "car%school", "a%n", "o_a", "_z", "zz", "n 2")
+
+
+@pytest.mark.parametrize("needle", NEEDLES)
+def test_name_search_matches_sql(db: Database, needle: str) -> None:
+    engine = AnalyticsEngine()
+    engine.sync(db)
+    for filters in ({"school_name_contains": needle}, {"school_name_contains": needle, "year": 2024}):
+        assert engine.count_rows(filters) == db.count_rows(filters), filters
+        assert engine.fetch_totals(filters) == db.fetch_totals(filters), filters
+        assert engine.fetch_totals_by_exam_type(filters) == db.fetch_totals_by_exam_type(filters), filters
+
+
+# Un borrado por debajo del último id cargado (descartar una importación a medias) no cambia
+# el id máximo: el motor debe recargarse igualmente.
+def test_sync_reloads_after_discarded_import(tmp_path: Path) -> None:
+    path = tmp_path / "exams.db"
+    db = Database(path, cache_entries=0)
+    engine = AnalyticsEngine()
+    session = db.begin_import()
+    session.add_batch(period_rows(*PERIODS[0]))
+    db.import_exam_batches([period_rows(*PERIODS[1])])
+    engine.sync(db)
+    assert engine.rows == len(period_rows(*PERIODS[0])) + len(period_rows(*PERIODS[1]))
+    db.close()
+
+    db = Database(path, cache_entries=0)
+    try:
+        assert not db.is_period_imported(*PERIODS[0])
+        engine.sync(db)
+        assert engine.rows == db.count_rows({}) == len(period_rows(*PERIODS[1]))
+        assert engine.fetch_totals({"school_name_contains": "a"}) == db.fetch_totals({"school_name_contains": "a"})
+    finally:
+        db.close()
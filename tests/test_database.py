@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+from conftest import PERIODS, period_rows
+
+from services.database import ROW_COLUMNS, Database, DatabaseError, row_sort_key, rows_order
+
+FILTER_SETS = (
+    {},
+    {"year": 2024},
+    {"year": 2023, "month": 12},
+    {"province": "Madrid"},
+    {"exam_center": "Santiago", "exam_type": "TEORICO"},
+    {"school_name_contains": "penon"},
+)
+
+ORDERS = (
+    rows_order(),
+    *(rows_order(column, descending) for column in ROW_COLUMNS for descending in (False, True)),
+)
+
+
+# Filas que cumplen los filtros, sin paginar, ordenadas en Python según `order` (ordenación
+# estable de la última columna a la primera).
+def _sorted_reference(db: Database, filters: dict[str, Any], order: tuple[tuple[str, bool], ...]) -> list[dict]:
+    rows = list(db.fetch_rows_page(filters, limit=1_000_000, order=rows_order()).dicts())
+    for column, descending in reversed(order):
+        rows.sort(key=lambda row: row[column], reverse=descending)
+    return rows
+
+
+# Recorre todas las páginas de `limit` filas con paginación por clave.
+def _paged(db: Database, filters: dict[str, Any], order: tuple[tuple[str, bool], ...], limit: int) -> list[dict]:
+    rows: list[dict] = []
+    after = None
+    while True:
+        page = db.fetch_rows_page(filters, after=after, limit=limit, order=order)
+        rows.extend(page.dicts())
+        if len(page) < limit:
+            return rows
+        after = row_sort_key(page, len(page) - 1, order)
+
+
+@pytest.mark.parametrize("filters", FILTER_SETS, ids=lambda f: ",".join(f) or "none")
+def test_keyset_paging_matches_sorted_rows(db: Database, filters: dict[str, Any]) -> None:
+    for order in ORDERS:
+        expected = _sorted_reference(db, filters, order)
+        assert expected, filters
+        assert _paged(db, filters, order, limit=7) == expected, order
+        assert list(db.fetch_rows_page(filters, limit=len(expected) + 1, order=order).dicts()) == expected, order
+
+
+def test_view_first_page_matches_paging(db: Database) -> None:
+    for order in (rows_order(), rows_order("school_name", True), rows_order("num_passed_5plus")):
+        view = db.fetch_view({"year": 2024}, limit=10, order=order)
+        assert list(view.rows.dicts()) == _sorted_reference(db, {"year": 2024}, order)[:10]
+
+
+def test_row_dicts_leave_out_id(db: Database) -> None:
+    filters = {"province": "Álava"}
+    rows = db.fetch_rows(filters)
+    assert rows
+    assert all(list(row) == ROW_COLUMNS for row in rows)
+    assert list(db.iter_rows(filters)) == rows
+    expected = [{column: row[column] for column in ROW_COLUMNS} for row in _sorted_reference(db, filters, rows_order())]
+    assert rows == expected
+
+
+# Simula un proceso que muere a mitad de importación: el primer lote queda escrito y el
+# periodo registrado como incompleto, pero la sesión no llega a finish() ni a abort().
+def test_reopen_discards_incomplete_periods(tmp_path: Path) -> None:
+    path = tmp_path / "exams.db"
+    db = Database(path, cache_entries=0)
+    db.import_exam_batches([period_rows(*PERIODS[0])])
+    totals = db.fetch_totals({})
+    rows = db.count_rows({})
+
+    session = db.begin_import(source_file="interrupted.txt")
+    session.add_batch(period_rows(*PERIODS[1]))
+    assert db.is_period_imported(*PERIODS[1])
+    assert db.count_rows({}) == rows
+    db.close()
+
+    db = Database(path, cache_entries=0)
+    try:
+        assert not db.is_period_imported(*PERIODS[1])
+        assert db.is_period_imported(*PERIODS[0])
+        assert db.count_rows({}) == rows
+        assert db.fetch_totals({}) == totals
+        assert [row["month"] for row in db.iter_rows({})] == [PERIODS[0][1]] * rows
+        stats = db.import_exam_batches([period_rows(*PERIODS[1])])
+        assert stats.inserted == len(period_rows(*PERIODS[1]))
+    finally:
+        db.close()
+
+
+def test_abort_and_finish_update_period_markers(tmp_path: Path) -> None:
+    db = Database(tmp_path / "exams.db", cache_entries=0)
+    try:
+        session = db.begin_import()
+        session.add_batch(period_rows(*PERIODS[0]))
+        session.abort()
+        assert not db.is_period_imported(*PERIODS[0])
+        assert db.count_rows({}) == 0
+
+        db.import_exam_batches([period_rows(*PERIODS[0])])
+        with pytest.raises(DatabaseError):
+            db.import_exam_batches([period_rows(*PERIODS[0])])
+    finally:
+        db.close()
+
+    db = Database(tmp_path / "exams.db", cache_entries=0)
+    try:
+        assert db.is_period_imported(*PERIODS[0])
+        assert db.count_rows({}) == len(period_rows(*PERIODS[0]))
+    finally:
+        db.close()